@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Vasanam — fill in normalized search columns for existing segments
+Segments stored before migrations 004/006/007 have no text_latin / phonetic_key /
+context columns or MinHash signatures, so the phonetic, trigram and phrase
+indexes can't see them and --dedup can't match against them.
+This walks the catalogue movie by movie (context joins each cue with the
+next, so a movie's cues are needed in order), normalizes them with the same
+code the ingest scripts use, and writes back only rows whose columns are
+missing or different. Re-running it is cheap: an up-to-date movie writes
+nothing.
+
+Incremental re-ingestion (--incremental) does the same for any movie it
+touches; this script is for everything else.
+
+Usage:
+  python3 scripts/backfill-normalized.py
+  python3 scripts/backfill-normalized.py --workers 8
+  python3 scripts/backfill-normalized.py --limit 20 --dry-run     # just count/preview
+
+Requirements:
+  pip install supabase
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from supabase import create_client
+
+from vasanam.metrics import METRICS, export
+from vasanam.dedup import sign_row
+from vasanam.normalize import normalize_rows, with_context
+from vasanam.segments import NORM_COLUMNS, fill_normalized, norm_updates, paged
+
+SUPABASE_URL = os.environ.get("SUPABASE_URL") or os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
+SUPABASE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")
+
+
+def movie_ids(supabase, limit: int | None):
+    for i, movie in enumerate(paged(lambda lo, hi: supabase.table("vasanam_movies")
+                                    .select("id").order("id").range(lo, hi))):
+        if limit is not None and i >= limit:
+            return
+        yield movie["id"]
+
+
+def backfill_movie(supabase, movie_id: str, dry_run: bool = False) -> tuple[int, list[dict]]:
+    """Returns (segments seen, updates needed) for one movie; writes unless dry_run"""
+    columns = "id,content_hash,text,start_ms,duration_ms," + ",".join(NORM_COLUMNS)
+    with METRICS.timer("db.fetch_segments"):
+        stored = list(paged(lambda lo, hi: supabase.table("vasanam_segments")
+                            .select(columns).eq("movie_id", movie_id)
+                            .order("start_ms").order("id").range(lo, hi)))
+    with METRICS.timer("normalize"):
+        wanted = [sign_row(row) for row in with_context(normalize_rows(
+            [{"text": r["text"], "start_ms": r["start_ms"], "duration_ms": r["duration_ms"]} for r in stored]
+        ))]
+    # Keyed by id rather than content hash: every stored row gets its own values
+    updates = norm_updates({r["id"]: {**r, "content_hash": r["id"]} for r in stored},
+                           {r["id"]: w for r, w in zip(stored, wanted)})
+    if updates and not dry_run:
+        fill_normalized(supabase, updates)
+    return len(stored), updates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill normalized search columns on existing segments")
+    parser.add_argument("--workers", type=int, default=4, help="Movies processed at once (default: 4)")
+    parser.add_argument("--limit", type=int, help="Stop after this many movies")
+    parser.add_argument("--dry-run", action="store_true", help="Normalize and preview, but write nothing")
+    parser.add_argument("--metrics-json", help="Write a JSON run report (per-stage timings, counters) here")
+    args = parser.parse_args()
+
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        print("ERROR: Set SUPABASE_URL and SUPABASE_SERVICE_KEY env vars")
+        sys.exit(1)
+    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+    print(f"\n🔤 Backfilling normalized search columns"
+          + (f" (first {args.limit:,} movies)" if args.limit else "")
+          + (" — dry run" if args.dry_run else ""))
+    movies = segments = updated = 0
+    previewed = False
+    with ThreadPoolExecutor(max_workers=max(args.workers, 1)) as pool:
+        for seen, updates in pool.map(lambda m: backfill_movie(supabase, m, args.dry_run),
+                                      movie_ids(supabase, args.limit)):
+            movies += 1
+            segments += seen
+            updated += len(updates)
+            if args.dry_run and updates and not previewed:
+                previewed = True
+                for u in updates[:5]:
+                    print(f"   {u['text_latin'][:40]!r} / {u['phonetic_key'][:40]!r} → {(u['context_latin'] or '')[:50]!r}")
+            print(f"   … {movies:,} movies, {segments:,} segments, {updated:,} to update", end="\r")
+
+    print(f"\n✅ {'Would update' if args.dry_run else 'Updated'} {updated:,} of {segments:,} segments")
+    export(args.metrics_json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Vasanam — offline ingestion benchmark with local service stand-ins
+Drives the real ingest code paths at increasing catalogue sizes without
+touching OpenSubtitles, YouTube, Gemini or a hosted Supabase project:
+
+  parse      parse_srt + classify_languages on synthetic SRTs (CPU only)
+  opensubs   ingest_movie() against a local HTTP stub of the OpenSubtitles
+             API (login / subtitles / download / gzip file links)
+  gemini     stream_transcript() on a fake Gemini client returning canned
+             JSON, feeding upsert_to_supabase()
+
+Segments are written to an in-memory PostgREST stand-in by default
+(--db memory, measures our code alone), or to a local Supabase stack
+(--db supabase, e.g. `supabase start`, using SUPABASE_URL /
+SUPABASE_SERVICE_KEY). Reports segments/sec, p50/p99 per-movie latency
+and peak RSS per scale, plus the slowest stages from vasanam.metrics.
+
+Usage:
+  python3 scripts/bench-ingest.py                                 # 10,100,1000 movies
+  python3 scripts/bench-ingest.py --scales 10,100,1000,10000 --workers 8
+  python3 scripts/bench-ingest.py --only opensubs --segments 2500 --json bench.json
+
+Requirements:
+  pip install requests supabase google-genai   (imported by the ingest scripts)
+"""
+
+import argparse
+import gzip
+import importlib.util
+import itertools
+import json
+import os
+import random
+import resource
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+from vasanam.lang import classify_languages, OPENSUBTITLES_ENGLISH_THRESHOLD
+from vasanam.metrics import METRICS
+from vasanam.normalize import normalize_rows, with_context
+from vasanam.retry import Upstream
+from vasanam.segments import make_segment_writer
+from vasanam.srt import parse_srt
+
+SCRIPTS = Path(__file__).parent
+WORDS = ["naan", "oru", "thadava", "sonna", "nooru", "maadhiri", "enna", "da", "machan",
+         "இது", "என்", "வழி", "தனி", "police", "sir", "thalaivar", "semma", "mass"]
+
+
+def load_script(name: str):
+    """Import a hyphenated script (e.g. ingest-gemini.py) as a module"""
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"), SCRIPTS / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ─── Synthetic data ────────────────────────────────────────────────────────
+def fmt(ms: int) -> str:
+    return f"{ms // 3_600_000:02}:{ms // 60_000 % 60:02}:{ms // 1000 % 60:02},{ms % 1000:03}"
+
+
+def make_lines(n: int, rng: random.Random) -> list[tuple[int, int, str]]:
+    t = 0
+    lines = []
+    for _ in range(n):
+        t += rng.randint(500, 4000)
+        duration = rng.randint(800, 4000)
+        lines.append((t, duration, " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 10)))))
+        t += duration
+    return lines
+
+
+def make_srt(n: int, seed: int) -> bytes:
+    rng = random.Random(seed)
+    out = []
+    for i, (start, duration, text) in enumerate(make_lines(n, rng), 1):
+        out.append(f"{i}\n{fmt(start)} --> {fmt(start + duration)}\n{text}\n")
+    return "\n".join(out).encode("utf-8")
+
+
+def make_transcript(n: int, seed: int) -> str:
+    rng = random.Random(seed)
+    segments = [{"start_seconds": start / 1000, "end_seconds": (start + duration) / 1000, "text": text}
+                for start, duration, text in make_lines(n, rng)]
+    return "```json\n" + json.dumps(segments, ensure_ascii=False, indent=1) + "\n```"
+
+
+def make_movies(n: int) -> list[dict]:
+    return [{
+        "title": f"Bench Movie {i}",
+        "year": 1990 + i % 35,
+        "imdb_id": f"tt{9_000_000 + i:07d}",
+        "youtube_video_id": f"bench{i:06d}",  # 11 chars, like a real ID
+        "actors": ["Bench Actor"],
+        "director": "Bench Director",
+    } for i in range(n)]
+
+
+# ─── OpenSubtitles stub ────────────────────────────────────────────────────
+class OpenSubtitlesStub:
+    """Local HTTP server speaking just enough of the OpenSubtitles v1 API"""
+
+    def __init__(self, segments: int, latency: float = 0.0, distinct_files: int = 16):
+        self.latency = latency
+        # Served round-robin by file_id; generated up front so the stub's own
+        # CPU doesn't land inside the measured run
+        self.files = [gzip.compress(make_srt(segments, seed), compresslevel=6) for seed in range(distinct_files)]
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, body: bytes, content_type: str = "application/json"):
+                if stub.latency:
+                    time.sleep(stub.latency)
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if self.path.endswith("/login"):
+                    self._send(json.dumps({"token": "bench-token"}).encode())
+                elif self.path.endswith("/download"):
+                    link = f"http://{self.headers['Host']}/files/{payload['file_id']}.srt.gz"
+                    self._send(json.dumps({"link": link}).encode())
+                else:
+                    self.send_error(404)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path.endswith("/subtitles"):
+                    query = parse_qs(url.query)
+                    imdb = int(query["imdb_id"][0])
+                    lang = query["languages"][0]
+                    file_id = imdb * 10 + (1 if lang == "ta" else 2)
+                    data = [{"attributes": {"language": lang, "download_count": 100,
+                                            "files": [{"file_id": file_id}]}}]
+                    self._send(json.dumps({"data": data}).encode())
+                elif url.path.startswith("/files/"):
+                    file_id = int(url.path.split("/")[-1].split(".")[0])
+                    self._send(stub.files[file_id % len(stub.files)], "application/gzip")
+                else:
+                    self.send_error(404)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}/api/v1"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# ─── Fake Gemini client ────────────────────────────────────────────────────
+class FakeGemini:
+    """Mimics the google-genai calls stream_transcript() makes"""
+
+    def __init__(self, segments: int, chunk_chars: int = 2048, latency: float = 0.0):
+        self.segments = segments
+        self.chunk_chars = chunk_chars
+        self.latency = latency
+        active = SimpleNamespace(value="ACTIVE")
+        self.files = SimpleNamespace(
+            upload=lambda file, config=None: SimpleNamespace(name="files/bench", uri="bench://", state=active),
+            get=lambda name: SimpleNamespace(name=name, uri="bench://", state=active),
+            delete=lambda name: None,
+        )
+        self.models = SimpleNamespace(generate_content_stream=self._stream)
+        self.seed = itertools.count()
+
+    def _stream(self, model, contents, config=None):
+        text = make_transcript(self.segments, next(self.seed))
+        for i in range(0, len(text), self.chunk_chars):
+            if self.latency:
+                time.sleep(self.latency)
+            yield SimpleNamespace(text=text[i:i + self.chunk_chars])
+
+
+# ─── In-memory PostgREST stand-in ──────────────────────────────────────────
+class MemoryTable:
+    """Builder chain of the supabase client; requests are JSON-encoded like the
+    real client would send them, then dropped, so memory stays flat at any scale"""
+
+    def __init__(self, db: "MemorySupabase", name: str):
+        self.db = db
+        self.name = name
+        self.payload = None
+
+    def select(self, columns="*"):
+        return self
+
+    def insert(self, rows):
+        self.payload = rows
+        return self
+
+    def upsert(self, row, on_conflict=None):
+        self.payload = row
+        return self
+
+    def delete(self):
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def in_(self, column, values):
+        self.payload = list(values)
+        return self
+
+    def order(self, column):
+        return self
+
+    def range(self, start, end):
+        return self
+
+    def execute(self):
+        body = json.dumps(self.payload, ensure_ascii=False).encode("utf-8") if self.payload is not None else b""
+        METRICS.count("bench.request_bytes", len(body))
+        if self.name == "vasanam_movies" and isinstance(self.payload, dict):
+            with self.db.lock:
+                movie_id = self.db.movies.setdefault(self.payload["youtube_video_id"], str(uuid.uuid4()))
+            return SimpleNamespace(data=[{**self.payload, "id": movie_id}])
+        # Segment inserts echo nothing back; selects see an empty table
+        return SimpleNamespace(data=[])
+
+
+class MemorySupabase:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.movies: dict[str, str] = {}
+
+    def table(self, name: str) -> MemoryTable:
+        return MemoryTable(self, name)
+
+    def rpc(self, name, params):
+        raise NotImplementedError("--db memory has no RPCs; benchmark full reloads only")
+
+
+# ─── Runs ──────────────────────────────────────────────────────────────────
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+
+
+def drive(movies: list[dict], workers: int, ingest) -> dict:
+    """Run ingest(movie) -> segment count over all movies; collect latencies"""
+    latencies = []
+    lock = threading.Lock()
+
+    def one(movie):
+        start = time.perf_counter()
+        segments = ingest(movie)
+        with lock:
+            latencies.append(time.perf_counter() - start)
+        return segments
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        total = sum(pool.map(one, movies))
+    elapsed = time.perf_counter() - start
+    return {
+        "movies": len(movies),
+        "segments": total,
+        "seconds": round(elapsed, 3),
+        "segments_per_s": round(total / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def bench_parse(movies: list[dict], segments: int, workers: int) -> dict:
+    def ingest(movie):
+        content = make_srt(segments, int(movie["imdb_id"][2:]))
+        cues = parse_srt(content)
+        classify_languages([c.text for c in cues], OPENSUBTITLES_ENGLISH_THRESHOLD)
+        list(with_context(normalize_rows([{"text": c.text, "start_ms": c.start_ms, "duration_ms": c.duration_ms}
+                                          for c in cues])))
+        return len(cues)
+    return drive(movies, workers, ingest)
+
+
+def bench_opensubs(movies: list[dict], segments: int, workers: int, supabase, write) -> dict:
+    opensubs = load_script("ingest-opensubtitles")
+    stub = OpenSubtitlesStub(segments)
+    opensubs.OS_BASE = stub.url
+    client = opensubs.OpenSubtitlesClient("bench", "bench", "bench-key",
+                                          upstream=Upstream("os", concurrency=workers * 2),
+                                          pool_size=max(workers * 2, 4))
+    client.login()
+
+    def ingest(movie):
+        result = opensubs.ingest_movie(supabase, client, movie, write=write)
+        return result["segments"]
+    try:
+        return drive(movies, workers, ingest)
+    finally:
+        client.close()
+        stub.close()
+
+
+def bench_gemini(movies: list[dict], segments: int, workers: int, supabase, write) -> dict:
+    gemini = load_script("ingest-gemini")
+    client = FakeGemini(segments)
+
+    def ingest(movie):
+        uploaded = client.files.upload(file=None)
+        stream = gemini.stream_transcript(client, uploaded, "audio/ogg")
+        url = f"https://www.youtube.com/watch?v={movie['youtube_video_id']}"
+        result = gemini.upsert_to_supabase(supabase, movie, url, stream, write=write)
+        return result["segments"]
+    return drive(movies, workers, ingest)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline ingestion benchmark with local service stand-ins")
+    parser.add_argument("--scales", default="10,100,1000",
+                        help="Comma-separated movie counts to run (default: 10,100,1000)")
+    parser.add_argument("--segments", type=int, default=1500, help="Segments per movie (default: 1500)")
+    parser.add_argument("--workers", type=int, default=4, help="Movies ingested in parallel (default: 4)")
+    parser.add_argument("--only", choices=["parse", "opensubs", "gemini"], action="append",
+                        help="Run only these benchmarks (repeatable)")
+    parser.add_argument("--db", choices=["memory", "supabase"], default="memory",
+                        help="Write to an in-memory stand-in or a local Supabase stack (default: memory)")
+    parser.add_argument("--writer", choices=["rest", "copy"], default="rest",
+                        help="Segment writer for --db supabase (default: rest)")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"),
+                        help="Direct Postgres connection string for --writer copy")
+    parser.add_argument("--json", help="Also write the results here as JSON")
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    benches = args.only or ["parse", "opensubs", "gemini"]
+
+    if args.db == "supabase":
+        from supabase import create_client
+        url, key = os.environ.get("SUPABASE_URL"), os.environ.get("SUPABASE_SERVICE_KEY")
+        if not url or not key:
+            raise SystemExit("❌ --db supabase needs SUPABASE_URL and SUPABASE_SERVICE_KEY (see `supabase status`)")
+        supabase = create_client(url, key)
+    else:
+        supabase = MemorySupabase()
+    write = make_segment_writer(supabase, args.writer if args.db == "supabase" else "rest", args.database_url)
+
+    # The ingest code prints a progress line per step; keep the report readable
+    results = []
+    print(f"{'bench':<10} {'movies':>7} {'segments':>10} {'seconds':>9} {'seg/s':>10} "
+          f"{'p50 ms':>9} {'p99 ms':>9} {'peak RSS':>9}")
+    for bench, scale in itertools.product(benches, scales):
+        movies = make_movies(scale)
+        METRICS.reset()
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, "w")
+        try:
+            if bench == "parse":
+                row = bench_parse(movies, args.segments, args.workers)
+            elif bench == "opensubs":
+                row = bench_opensubs(movies, args.segments, args.workers, supabase, write)
+            else:
+                row = bench_gemini(movies, args.segments, args.workers, supabase, write)
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+        row = {"bench": bench, **row, "stages": METRICS.report()["stages"]}
+        results.append(row)
+        print(f"{bench:<10} {row['movies']:>7} {row['segments']:>10,} {row['seconds']:>9.2f} "
+              f"{row['segments_per_s']:>10,.0f} {row['p50_ms']:>9.1f} {row['p99_ms']:>9.1f} "
+              f"{row['peak_rss_mb']:>7.0f}MB")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\n📊 Results written to {args.json}")
+    print("\nPeak RSS is the process high-water mark, so it only grows across rows.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Vasanam — SRT parser micro-benchmark
+Compares the streaming parser in scripts/vasanam/srt.py against the original
+split-based parse_srt() on synthetic subtitle files.
+
+Usage:
+  python3 scripts/bench-srt-parser.py                 # 5,000 cues, LF endings
+  python3 scripts/bench-srt-parser.py --cues 20000 --crlf --repeat 10
+"""
+
+import argparse
+import io
+import random
+import re
+import time
+import tracemalloc
+
+from vasanam.srt import iter_srt, parse_srt
+
+WORDS = ["naan", "oru", "thadava", "sonna", "nooru", "thadava", "sonna", "maadhiri",
+         "enna", "da", "machan", "இது", "என்", "வழி", "தனி", "வழி", "Hello", "sir", "police"]
+
+
+# ── Original parser (as shipped before the streaming rewrite) ─────────────────
+def legacy_parse_srt(content: str) -> list[dict]:
+    segments = []
+    blocks = re.split(r'\n\n+', content.strip())
+    for block in blocks:
+        lines = block.strip().split('\n')
+        if len(lines) < 3:
+            continue
+        timecode_line = None
+        text_lines = []
+        for i, line in enumerate(lines):
+            if '-->' in line:
+                timecode_line = line
+                text_lines = lines[i+1:]
+                break
+        if not timecode_line or not text_lines:
+            continue
+        try:
+            parts = timecode_line.split(' --> ')
+            start_ms = legacy_srt_time_to_ms(parts[0].strip())
+            end_ms = legacy_srt_time_to_ms(parts[1].strip().split(' ')[0])
+            text = ' '.join(text_lines).strip()
+            text = re.sub(r'<[^>]+>', '', text)
+            text = re.sub(r'\([^)]*\)|\[[^\]]*\]', '', text).strip()
+            if text and len(text) > 2:
+                segments.append({
+                    'text': text,
+                    'start_ms': start_ms,
+                    'duration_ms': max(end_ms - start_ms, 1000),
+                })
+        except Exception:
+            continue
+    return segments
+
+
+def legacy_srt_time_to_ms(time_str: str) -> int:
+    time_str = time_str.replace(',', '.')
+    parts = time_str.split(':')
+    return int((int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])) * 1000)
+
+
+# ── Synthetic input ───────────────────────────────────────────────────────────
+def fmt(ms: int) -> str:
+    h, rem = divmod(ms, 3_600_000)
+    m, rem = divmod(rem, 60_000)
+    s, ms = divmod(rem, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
+
+
+def make_srt(cues: int, crlf: bool, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    out = []
+    t = 0
+    for i in range(1, cues + 1):
+        t += rng.randint(800, 2500)
+        dur = rng.randint(600, 4000)
+        lines = [" ".join(rng.choices(WORDS, k=rng.randint(2, 8))) for _ in range(rng.randint(1, 2))]
+        if rng.random() < 0.1:
+            lines[0] = "<i>" + lines[0] + "</i>"
+        if rng.random() < 0.05:
+            lines.append("[Music]")
+        out.append(f"{i}\n{fmt(t)} --> {fmt(t + dur)}\n" + "\n".join(lines) + "\n")
+        t += dur
+    doc = "\n".join(out)
+    return doc.replace("\n", "\r\n") if crlf else doc
+
+
+def count_lazily(content: bytes) -> range:
+    """Consume cues without keeping them — the flat-memory streaming case"""
+    return range(sum(1 for _ in iter_srt(io.BytesIO(content))))
+
+
+def measure(fn, content, repeat: int) -> tuple[float, int, int]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(content)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    result = fn(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SRT parsers")
+    parser.add_argument("--cues", type=int, default=5000, help="Cues per synthetic file (default: 5000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs; best is reported (default: 5)")
+    parser.add_argument("--crlf", action="store_true", help="Use CRLF line endings")
+    args = parser.parse_args()
+
+    content = make_srt(args.cues, args.crlf)
+    print(f"📄 {args.cues:,} cues, {len(content.encode()) / 1024:.0f} KB, {'CRLF' if args.crlf else 'LF'}")
+    print(f"   {'parser':<12} {'best ms':>10} {'peak KB':>10} {'cues':>8}")
+    for name, fn in [("legacy", legacy_parse_srt), ("streaming", parse_srt)]:
+        best, peak, count = measure(fn, content, args.repeat)
+        print(f"   {name:<12} {best * 1000:>10.1f} {peak / 1024:>10.0f} {count:>8,}")
+
+    # Streaming straight from bytes, as ingest-opensubtitles.py does
+    best, peak, count = measure(parse_srt, content.encode(), args.repeat)
+    print(f"   {'stream/bytes':<12} {best * 1000:>10.1f} {peak / 1024:>10.0f} {count:>8,}")
+    best, peak, count = measure(count_lazily, content.encode(), args.repeat)
+    print(f"   {'stream/lazy':<12} {best * 1000:>10.1f} {peak / 1024:>10.0f} {count:>8,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Vasanam — build the prebuilt search index file
+Exports vasanam_movies + vasanam_segments into one memory-mappable inverted
+index (scripts/vasanam/searchindex.py): sorted term dictionary, delta/varint
+postings, and a movie metadata table. SearchIndex answers ranked queries
+from it in about a millisecond with no database round-trip, so hot queries
+can be served from a local or edge-shipped copy. Rebuild it after ingesting.
+
+Segments linked as duplicates (--dedup link, migration 007) are left out,
+as search leaves them out.
+
+Usage:
+  python3 scripts/build-search-index.py                          # → vasanam-search.vsix
+  python3 scripts/build-search-index.py --output /srv/vasanam/search.vsix --workers 8
+  python3 scripts/build-search-index.py --database-url $DATABASE_URL   # stream over a direct connection
+  python3 scripts/build-search-index.py --query "en vazhi thani vazhi"  # build, then try a query
+
+Requirements:
+  pip install supabase              (or "psycopg[binary]" with --database-url)
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from vasanam.metrics import METRICS, export
+from vasanam.searchindex import IndexWriter, SearchIndex
+from vasanam.segments import paged
+
+SUPABASE_URL = os.environ.get("SUPABASE_URL") or os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
+SUPABASE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")
+DEFAULT_OUTPUT = "vasanam-search.vsix"
+MOVIE_COLUMNS = ("id", "title", "year", "youtube_video_id", "poster_url", "actors", "director")
+SEGMENT_COLUMNS = ("id", "movie_id", "text", "start_ms", "duration_ms", "language", "phonetic_key")
+
+
+def rest_source(limit: int | None, workers: int):
+    """(movies, per-movie segment lists) over the Supabase REST API"""
+    from supabase import create_client
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        print("ERROR: Set SUPABASE_URL and SUPABASE_SERVICE_KEY env vars (or pass --database-url)")
+        sys.exit(1)
+    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    with METRICS.timer("db.fetch_movies"):
+        movies = list(paged(lambda lo, hi: supabase.table("vasanam_movies")
+                            .select(",".join(MOVIE_COLUMNS)).order("id").range(lo, hi)))[:limit]
+
+    def segments(movie_id: str) -> list[dict]:
+        with METRICS.timer("db.fetch_segments"):
+            return list(paged(lambda lo, hi: supabase.table("vasanam_segments")
+                              .select(",".join(SEGMENT_COLUMNS)).eq("movie_id", movie_id)
+                              .is_("duplicate_of", "null").order("start_ms").order("id").range(lo, hi)))
+
+    pool = ThreadPoolExecutor(max_workers=max(workers, 1))
+    return movies, pool.map(segments, (m["id"] for m in movies))
+
+
+def copy_source(database_url: str, limit: int | None):
+    """(movies, per-movie segment lists) over a direct Postgres connection"""
+    try:
+        import psycopg
+        from psycopg.rows import dict_row
+    except ImportError:
+        raise SystemExit('❌ --database-url needs psycopg 3: pip install "psycopg[binary]"')
+    conn = psycopg.connect(database_url, row_factory=dict_row)
+    movies = conn.execute(f"SELECT {', '.join(MOVIE_COLUMNS)} FROM vasanam_movies ORDER BY id"
+                          + (" LIMIT %s" if limit else ""), (limit,) if limit else ()).fetchall()
+    for m in movies:
+        m["id"] = str(m["id"])
+
+    def segments():
+        # One server-side cursor over everything, split into movies as it streams
+        with conn.cursor(name="vasanam_index_export") as cur:
+            cur.itersize = 20_000
+            cur.execute(f"""
+                SELECT {', '.join('s.' + c for c in SEGMENT_COLUMNS)}
+                FROM vasanam_segments s
+                WHERE s.duplicate_of IS NULL AND s.movie_id = ANY(%s)
+                ORDER BY s.movie_id, s.start_ms, s.id
+            """, ([m["id"] for m in movies],))
+            batch, current = [], None
+            for row in cur:
+                row["id"], row["movie_id"] = str(row["id"]), str(row["movie_id"])
+                if row["movie_id"] != current and batch:
+                    yield batch
+                    batch = []
+                current = row["movie_id"]
+                batch.append(row)
+            if batch:
+                yield batch
+        conn.close()
+
+    return movies, segments()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the prebuilt Vasanam search index file")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help=f"Index file to write (default: {DEFAULT_OUTPUT})")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"),
+                        help="Read over a direct Postgres connection instead of REST (default: $DATABASE_URL)")
+    parser.add_argument("--workers", type=int, default=4, help="Movies fetched at once over REST (default: 4)")
+    parser.add_argument("--limit", type=int, help="Only index the first N movies")
+    parser.add_argument("--query", action="append", default=[], help="After building, run this query (repeatable)")
+    parser.add_argument("--metrics-json", help="Write a JSON run report (per-stage timings, counters) here")
+    args = parser.parse_args()
+
+    source = "Postgres" if args.database_url else "Supabase REST"
+    print(f"\n🗂️  Building search index from {source}"
+          + (f" (first {args.limit:,} movies)" if args.limit else ""))
+    start = time.perf_counter()
+    if args.database_url:
+        movies, batches = copy_source(args.database_url, args.limit)
+    else:
+        movies, batches = rest_source(args.limit, args.workers)
+
+    writer = IndexWriter()
+    for movie in movies:
+        writer.add_movie(movie)
+    for i, rows in enumerate(batches, 1):
+        with METRICS.timer("index.add"):
+            for row in rows:
+                writer.add_segment(row)
+        print(f"   … {i:,}/{len(movies):,} movies, {writer.n_docs:,} segments", end="\r")
+
+    tmp = args.output + ".tmp"
+    with METRICS.timer("index.write"):
+        size = writer.write(tmp)
+    os.replace(tmp, args.output)  # readers holding the old file keep their mapping
+    METRICS.count("index.segments", writer.n_docs)
+    METRICS.count("index.terms", len(writer.postings))
+    print(f"\n✅ {args.output}: {writer.n_docs:,} segments, {len(writer.postings):,} terms, "
+          f"{size / 1024 / 1024:.1f} MB in {time.perf_counter() - start:.1f}s")
+
+    if args.query:
+        with SearchIndex(args.output) as index:
+            for q in args.query:
+                t = time.perf_counter()
+                results = index.search(q, limit=5)
+                print(f"\n🔎 {q!r} — {len(results)} results in {(time.perf_counter() - t) * 1000:.2f} ms")
+                for r in results:
+                    print(f"   {r['rank']:.3f}  {r['movie_title']} ({r['movie_year']}) "
+                          f"@{r['start_ms'] // 1000}s  {r['text'][:60]}")
+    export(args.metrics_json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Vasanam — compute vectors for segments that don't have one yet
+Fills vasanam_segments.embedding (migration 009) for new or changed segments
+only: rows with a NULL embedding are walked in id order, embedded on CPU
+across a process pool (scripts/vasanam/embed.py), and written back in
+batches. Re-running it is cheap — an up-to-date table fetches one empty page.
+
+Ingest with --embed does the same for each movie it writes; this script is
+for the backlog and for re-embedding after the column is reset to NULL.
+
+Usage:
+  python3 scripts/embed-segments.py
+  python3 scripts/embed-segments.py --workers 8 --batch 1000
+  python3 scripts/embed-segments.py --limit 10000 --metrics-json embed.json
+
+Requirements:
+  pip install supabase
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from supabase import create_client
+
+from vasanam.embed import BATCH_SIZE, DIM, embed_pending
+from vasanam.segments import PAGE_SIZE
+from vasanam.metrics import export
+
+SUPABASE_URL = os.environ.get("SUPABASE_URL") or os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
+SUPABASE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embed segments that have no vector yet")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Embedding processes (default: one per CPU)")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE,
+                        help=f"Rows per fetch/write, at most {PAGE_SIZE} (default: {BATCH_SIZE})")
+    parser.add_argument("--limit", type=int, help="Stop after this many segments")
+    parser.add_argument("--movie-id", help="Only this movie's segments")
+    parser.add_argument("--metrics-json", help="Write a JSON run report (per-stage timings, counters) here")
+    args = parser.parse_args()
+
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        print("ERROR: Set SUPABASE_URL and SUPABASE_SERVICE_KEY env vars")
+        sys.exit(1)
+    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+    workers = max(args.workers, 1)
+    print(f"\n🧭 Embedding pending segments ({DIM}-d, {workers} processes)"
+          + (f", first {args.limit:,}" if args.limit else ""))
+    start = time.perf_counter()
+
+    def progress(seen: int, written: int):
+        rate = seen / max(time.perf_counter() - start, 1e-9)
+        print(f"   … {seen:,} fetched, {written:,} embedded ({rate:,.0f}/s)", end="\r")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        written = embed_pending(supabase, args.movie_id, pool=pool, workers=workers,
+                                limit=args.limit, batch_size=args.batch, progress=progress)
+
+    print(f"\n✅ Embedded {written:,} segments in {time.perf_counter() - start:.1f}s")
+    export(args.metrics_json)
+
+
+if __name__ == "__main__":
+    main()
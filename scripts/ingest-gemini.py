@@ -8,6 +8,16 @@ Usage:
   python3 scripts/ingest-gemini.py --url "https://youtube.com/watch?v=xFMJWJVLJxQ" --title "VIP" --year 2014
   python3 scripts/ingest-gemini.py --batch          # run all 5 seed URLs
   python3 scripts/ingest-gemini.py --url URL --dry-run  # transcribe only, skip Supabase
+  python3 scripts/ingest-gemini.py --url URL ... --chunk-minutes 10 --concurrency 8  # long films
+  python3 scripts/ingest-gemini.py --batch --download-workers 3 --write-workers 1     # tune stage pools
+  python3 scripts/ingest-gemini.py --url URL ... --vad         # also cut silence before upload
+  python3 scripts/ingest-gemini.py --batch --resume            # continue an interrupted batch
+  python3 scripts/ingest-gemini.py --manifest clips.jsonl --shard 1/4   # one of 4 machines
+  python3 scripts/ingest-gemini.py --batch --compact --dedup link   # phrase windows, link copies
+
+Transcripts are cached under ~/.cache/vasanam (VASANAM_CACHE_DIR) by video ID and
+audio hash, so a --dry-run preview can be re-run live without new Gemini calls.
+--no-cache forces a fresh download and transcription.
 
 Requirements:
   pip install google-generativeai supabase yt-dlp
@@ -22,12 +32,22 @@ Environment (auto-loaded from config/environments/production.json):
 import os
 import sys
 import json
-import time
+import hashlib
 import argparse
+import asyncio
+import bisect
 import tempfile
+import shutil
 import subprocess
 import re
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from itertools import chain
 from pathlib import Path
+from typing import Iterable, Iterator
 
 # ─── Load credentials from production.json ─────────────────────────────────
 def load_credentials():
@@ -54,6 +74,19 @@ from google import genai
 from google.genai import types as genai_types
 from supabase import create_client
 
+from vasanam.cache import DiskCache, DEFAULT_CACHE_DIR
+from vasanam.journal import Journal, DEFAULT_JOURNAL_PATH
+from vasanam.jsonstream import JsonArrayStream
+from vasanam.lang import detect_language, GEMINI_ENGLISH_THRESHOLD
+from vasanam.manifest import load_manifest, parse_shard, ManifestError
+from vasanam.metrics import METRICS, export, profiled
+from vasanam.compact import compact_cues
+from vasanam.dedup import MODES as DEDUP_MODES, Deduper, sign_row
+from vasanam.embed import embed_pending
+from vasanam.normalize import normalize_row, with_context
+from vasanam.retry import get_upstream
+from vasanam.segments import execute, make_segment_writer
+
 # ─── Seed batch: 5 approved YouTube scene clips ────────────────────────────
 SEED_BATCH = [
     {
@@ -103,6 +136,13 @@ SEED_BATCH = [
     },
 ]
 
+GEMINI_MODEL = "gemini-2.0-flash"
+
+# Long audio is transcribed in overlapping windows so no single response hits
+# max_output_tokens; the overlap keeps lines at a boundary intact in one window.
+CHUNK_SECONDS = 10 * 60
+CHUNK_OVERLAP_SECONDS = 15
+
 TANGLISH_PROMPT = """You are transcribing Tamil movie dialogue audio.
 
 TASK: Transcribe every spoken word in this audio as Tanglish.
@@ -148,8 +188,12 @@ def find_yt_dlp() -> str:
     return "yt-dlp"  # fallback — will raise FileNotFoundError with good message
 
 
-def download_audio(url: str, output_dir: str) -> str | None:
-    """Download audio from YouTube URL using yt-dlp"""
+def download_audio(url: str, output_dir: str, transcode: bool = True) -> str | None:
+    """Download audio from YouTube URL using yt-dlp
+    
+    With transcode=False the best audio stream is kept as-is, for callers
+    that re-encode it themselves (see preprocess_audio).
+    """
     print(f"  📥 Downloading audio from: {url}")
     
     output_template = os.path.join(output_dir, "%(id)s.%(ext)s")
@@ -169,8 +213,8 @@ def download_audio(url: str, output_dir: str) -> str | None:
     ]
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-        if result.returncode != 0:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300) if transcode else None
+        if result is None or result.returncode != 0:
             # Fallback: download best audio without conversion (no ffmpeg needed)
             cmd_fallback = [
                 yt_dlp_bin,
@@ -183,7 +227,7 @@ def download_audio(url: str, output_dir: str) -> str | None:
             ]
             result2 = subprocess.run(cmd_fallback, capture_output=True, text=True, timeout=300)
             if result2.returncode != 0:
-                print(f"  ❌ yt-dlp failed: {result.stderr.strip() or result2.stderr.strip()}")
+                print(f"  ❌ yt-dlp failed: {(result.stderr.strip() if result else '') or result2.stderr.strip()}")
                 return None
     except subprocess.TimeoutExpired:
         print("  ❌ Download timed out after 5 minutes")
@@ -208,51 +252,303 @@ def download_audio(url: str, output_dir: str) -> str | None:
     return audio_path
 
 
-def transcribe_with_gemini(audio_path: str, api_key: str) -> list[dict]:
-    """Upload audio to Gemini and transcribe as Tanglish"""
-    print(f"  🧠 Sending to Gemini 2.0 Flash for Tanglish transcription...")
+def probe_duration(audio_path: str) -> float | None:
+    """Audio length in seconds via ffprobe, or None if ffprobe isn't available"""
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", audio_path],
+            capture_output=True, text=True, timeout=60,
+        )
+        return float(result.stdout.strip())
+    except (FileNotFoundError, subprocess.TimeoutExpired, ValueError):
+        return None
+
+
+def split_audio(audio_path: str, output_dir: str, chunk_seconds: float, overlap_seconds: float) -> list[tuple[str, float]]:
+    """Cut audio into overlapping windows; returns [(path, offset_seconds), ...]
     
-    client = genai.Client(api_key=api_key)
+    Window k covers [k*chunk, k*chunk + chunk + overlap). Short audio (or no
+    ffmpeg) comes back as a single window at offset 0.
+    """
+    duration = probe_duration(audio_path)
+    if duration is None:
+        print("  ⚠️  ffprobe not found — transcribing as a single request")
+        return [(audio_path, 0.0)]
+    if duration <= chunk_seconds + overlap_seconds:
+        return [(audio_path, 0.0)]
     
-    # Upload file to Gemini Files API
-    print(f"  📤 Uploading audio file to Gemini Files API...")
-    mime_type_map = {
-        '.mp3': 'audio/mpeg',
-        '.m4a': 'audio/mp4',
-        '.webm': 'audio/webm',
-        '.opus': 'audio/ogg',
-        '.ogg': 'audio/ogg',
-        '.wav': 'audio/wav',
-        '.flac': 'audio/flac',
-        '.aac': 'audio/aac',
-    }
+    os.makedirs(output_dir, exist_ok=True)
+    ext = Path(audio_path).suffix
+    chunks = []
+    offset = 0.0
+    while offset < duration:
+        chunk_path = os.path.join(output_dir, f"chunk{len(chunks):03d}{ext}")
+        cmd = [
+            "ffmpeg", "-v", "error", "-y",
+            "-ss", f"{offset:.3f}", "-t", f"{chunk_seconds + overlap_seconds:.3f}",
+            "-i", audio_path,
+            "-vn", "-c", "copy",  # audio frames are short — stream copy cuts cleanly enough
+            chunk_path,
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+        if result.returncode != 0:
+            print(f"  ⚠️  ffmpeg split failed ({result.stderr.strip()[:200]}) — transcribing as a single request")
+            return [(audio_path, 0.0)]
+        chunks.append((chunk_path, offset))
+        offset += chunk_seconds
+    return chunks
+
+
+@dataclass
+class AudioPrep:
+    """How audio is shrunk before upload — Gemini only needs intelligible speech"""
+    codec: str = "opus"          # "opus", "flac" or "off" (upload the download as-is)
+    bitrate_kbps: int = 24       # opus only; FLAC is lossless
+    vad: bool = False            # cut long non-speech spans
+    min_silence: float = 2.0     # seconds of quiet before a span is cut
+    noise_db: float = -35.0      # silencedetect threshold
+    pad: float = 0.3             # speech kept on either side of each cut
+
+
+class TimeMap:
+    """Map timestamps in VAD-trimmed audio back to the original video
+    
+    Stores the (trimmed_start, original_start) of every kept span; a time in
+    the trimmed audio belongs to the last span starting at or before it.
+    An empty map is the identity.
+    """
+    def __init__(self, spans: list[tuple[float, float]] | None = None):
+        self.trimmed = [t for t, _ in spans or []]
+        self.original = [o for _, o in spans or []]
+    
+    def to_original(self, t: float) -> float:
+        i = bisect.bisect_right(self.trimmed, t) - 1
+        if i < 0:
+            return t
+        return self.original[i] + (t - self.trimmed[i])
+    
+    def remap(self, seg: dict) -> dict:
+        if not self.trimmed:
+            return seg
+        start = float(seg["start_seconds"])
+        end = float(seg["end_seconds"])
+        # Keep a segment's length even if it runs across a cut
+        mapped = self.to_original(start)
+        return {**seg, "start_seconds": round(mapped, 3), "end_seconds": round(mapped + max(end - start, 0.0), 3)}
+
+
+SILENCE_RE = re.compile(r"silence_(start|end): (-?[\d.]+)")
+
+
+def detect_speech(audio_path: str, duration: float, prep: AudioPrep) -> list[tuple[float, float]] | None:
+    """Energy-based VAD via ffmpeg silencedetect; returns kept (start, end) spans"""
+    cmd = [
+        "ffmpeg", "-v", "info", "-nostats", "-i", audio_path,
+        "-af", f"silencedetect=noise={prep.noise_db}dB:d={prep.min_silence}",
+        "-f", "null", "-",
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    
+    spans = []
+    cursor = 0.0  # None while inside a silence
+    for kind, value in SILENCE_RE.findall(result.stderr):
+        t = float(value)
+        if kind == "start":
+            if cursor is not None and t > cursor:
+                spans.append((max(cursor - prep.pad, 0.0), min(t + prep.pad, duration)))
+            cursor = None
+        elif kind == "end":
+            cursor = t
+    if cursor is not None:  # audio ends on speech, not in a silence
+        spans.append((max(cursor - prep.pad, 0.0), duration))
+    
+    # Padding can make neighbours touch; merge them and drop empty spans
+    merged = []
+    for start, end in spans:
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def preprocess_audio(audio_path: str, output_dir: str, prep: AudioPrep) -> tuple[str, TimeMap]:
+    """Downmix to 16 kHz mono speech audio, optionally cutting silence
+    
+    Returns (path, timemap). Falls back to the original file with an identity
+    map when preprocessing is off or ffmpeg isn't usable.
+    """
+    if prep.codec == "off":
+        return audio_path, TimeMap()
+    duration = probe_duration(audio_path)
+    if duration is None:
+        print("  ⚠️  ffprobe not found — uploading audio as downloaded")
+        return audio_path, TimeMap()
+    
+    filters = []
+    timemap = TimeMap()
+    if prep.vad:
+        spans = detect_speech(audio_path, duration, prep)
+        kept = sum(end - start for start, end in spans or [])
+        if spans and kept < duration * 0.95:
+            expr = "+".join(f"between(t,{start:.3f},{end:.3f})" for start, end in spans)
+            filters += [f"aselect='{expr}'", "asetpts=N/SR/TB"]
+            trimmed = 0.0
+            table = []
+            for start, end in spans:
+                table.append((trimmed, start))
+                trimmed += end - start
+            timemap = TimeMap(table)
+            print(f"  🔇 Cut {duration - kept:.0f}s of silence ({len(spans)} speech spans kept)")
+    
+    os.makedirs(output_dir, exist_ok=True)
+    if prep.codec == "flac":
+        out_path = os.path.join(output_dir, "speech.flac")
+        codec_args = ["-c:a", "flac", "-sample_fmt", "s16"]
+    else:
+        out_path = os.path.join(output_dir, "speech.ogg")
+        codec_args = ["-c:a", "libopus", "-b:a", f"{prep.bitrate_kbps}k", "-application", "voip"]
+    cmd = [
+        "ffmpeg", "-v", "error", "-y", "-i", audio_path, "-vn",
+        *(["-af", ",".join(filters)] if filters else []),
+        "-ac", "1", "-ar", "16000", *codec_args, out_path,
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=1800)
+    except (FileNotFoundError, subprocess.TimeoutExpired) as e:
+        print(f"  ⚠️  Preprocessing failed ({e}) — uploading audio as downloaded")
+        return audio_path, TimeMap()
+    if result.returncode != 0:
+        print(f"  ⚠️  Preprocessing failed ({result.stderr.strip()[:200]}) — uploading audio as downloaded")
+        return audio_path, TimeMap()
+    
+    before = os.path.getsize(audio_path) / (1024 * 1024)
+    after = os.path.getsize(out_path) / (1024 * 1024)
+    print(f"  🎚️  Preprocessed to 16 kHz mono {prep.codec}: {before:.1f} MB → {after:.1f} MB")
+    return out_path, timemap
+
+
+class ChunkMerger:
+    """Re-offset per-window timestamps and drop the duplicates from overlaps
+    
+    Each overlap is split at its midpoint: a window keeps only segments that
+    start between its neighbours' cut points. A line straddling the cut can
+    still show up in both windows with slightly different times, so an
+    identical text starting within a couple of seconds of one already kept is
+    dropped too. Works segment by segment, in any arrival order.
+    """
+    def __init__(self, offsets: list[float], overlap_seconds: float):
+        self.bounds = []
+        for i, offset in enumerate(offsets):
+            lo = offset + overlap_seconds / 2 if i > 0 else float("-inf")
+            hi = offsets[i + 1] + overlap_seconds / 2 if i + 1 < len(offsets) else float("inf")
+            self.bounds.append((offset, lo, hi))
+        self.kept: dict[str, list[float]] = {}
+        self.lock = threading.Lock()  # windows are transcribed on different threads
+    
+    def accept(self, window: int, seg: dict) -> dict | None:
+        offset, lo, hi = self.bounds[window]
+        try:
+            start = float(seg.get("start_seconds", 0)) + offset
+            end = float(seg.get("end_seconds", seg.get("start_seconds", 0))) + offset
+        except (TypeError, ValueError):
+            return None
+        if not lo <= start < hi:
+            return None
+        key = str(seg.get("text", "")).strip().lower()
+        with self.lock:
+            starts = self.kept.setdefault(key, [])
+            if any(abs(start - other) < 2.0 for other in starts):
+                return None
+            starts.append(start)
+        return {**seg, "start_seconds": round(start, 3), "end_seconds": round(end, 3)}
+
+
+MIME_TYPES = {
+    '.mp3': 'audio/mpeg',
+    '.m4a': 'audio/mp4',
+    '.webm': 'audio/webm',
+    '.opus': 'audio/ogg',
+    '.ogg': 'audio/ogg',
+    '.wav': 'audio/wav',
+    '.flac': 'audio/flac',
+    '.aac': 'audio/aac',
+}
+
+
+def upload_audio(client, audio_path: str, label: str = ""):
+    """Upload one audio file to the Gemini Files API; returns (file, mime_type)"""
+    print(f"  📤 {label}Uploading audio file to Gemini Files API...")
     ext = Path(audio_path).suffix.lower()
-    mime_type = mime_type_map.get(ext, 'audio/mpeg')
+    mime_type = MIME_TYPES.get(ext, 'audio/mpeg')
     
-    with open(audio_path, 'rb') as f:
-        uploaded_file = client.files.upload(
-            file=f,
-            config=genai_types.UploadFileConfig(mime_type=mime_type)
-        )
-    print(f"  ⏳ Waiting for file processing...")
+    def upload():
+        # Reopened per attempt: a retried upload must start from byte 0
+        with open(audio_path, 'rb') as f:
+            return client.files.upload(
+                file=f,
+                config=genai_types.UploadFileConfig(mime_type=mime_type)
+            )
+    uploaded_file = get_upstream("gemini").call(upload)
+    return uploaded_file, mime_type
+
+
+async def wait_until_active(client, uploaded_file, label: str = "", max_wait: float = 300):
+    """Poll until Gemini finishes processing the upload, backing off exponentially
     
-    # Wait for file to be ready
-    max_wait = 120
-    waited = 0
+    Returns the ACTIVE file, or None if processing failed or timed out.
+    """
+    delay = 1.0
+    waited = 0.0
     while uploaded_file.state.value == "PROCESSING" and waited < max_wait:
-        time.sleep(3)
-        waited += 3
-        uploaded_file = client.files.get(name=uploaded_file.name)
+        await asyncio.sleep(delay)
+        waited += delay
+        delay = min(delay * 2, 15.0)
+        METRICS.count("gemini.polls")
+        uploaded_file = await asyncio.to_thread(get_upstream("gemini").call, client.files.get,
+                                                name=uploaded_file.name)
     
     if uploaded_file.state.value != "ACTIVE":
-        print(f"  ❌ File processing failed: {uploaded_file.state}")
-        return []
+        print(f"  ❌ {label}File processing failed: {uploaded_file.state}")
+        await asyncio.to_thread(delete_upload, client, uploaded_file)
+        return None
+    print(f"  ✅ {label}File ready after {waited:.0f}s")
+    return uploaded_file
+
+
+def delete_upload(client, uploaded_file):
+    try:
+        client.files.delete(name=uploaded_file.name)
+    except Exception:
+        pass
+
+
+def stream_transcript(client, uploaded_file, mime_type: str, label: str = "") -> Iterator[dict]:
+    """Transcribe an ACTIVE upload as Tanglish, yielding segments as they stream in
     
-    print(f"  ✅ File ready. Running transcription...")
+    The generator's return value is True only if the whole JSON array arrived.
+    """
+    print(f"  🧠 {label}Running Gemini 2.0 Flash Tanglish transcription...")
     
-    try:
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
+    # Objects are parsed out of the stream as soon as they close, so markdown
+    # fences are skipped and a truncated response keeps every finished segment.
+    parser = JsonArrayStream()
+    count = 0
+    error = False
+    gemini = get_upstream("gemini")
+    
+    def open_stream():
+        # The request is only sent on the first next(), so pull the first
+        # chunk here: a 429/503 at that point is retried like any other call
+        stream = iter(client.models.generate_content_stream(
+            model=GEMINI_MODEL,
             contents=[
                 genai_types.Part.from_uri(
                     file_uri=uploaded_file.uri,
@@ -264,59 +560,55 @@ def transcribe_with_gemini(audio_path: str, api_key: str) -> list[dict]:
                 temperature=0.1,   # Low temp for accurate transcription
                 max_output_tokens=32768,  # Long compilations need more tokens
             )
-        )
-        
-        # Clean up uploaded file
-        client.files.delete(name=uploaded_file.name)
-        
-        text = response.text.strip()
-        
-        # Parse JSON response — strip markdown code blocks if present
-        text = re.sub(r'^```(?:json)?\n?', '', text, flags=re.MULTILINE)
-        text = re.sub(r'\n?```$', '', text, flags=re.MULTILINE)
-        text = text.strip()
-        
-        segments = json.loads(text)
-        print(f"  ✅ Transcribed {len(segments)} dialogue segments")
-        return segments
-        
-    except json.JSONDecodeError as e:
-        raw = response.text if response.text else 'empty'
-        print(f"  ❌ JSON parse error: {e}")
-        print(f"     Raw response (first 500 chars): {raw[:500]}")
-        # Try to salvage partial JSON array
-        try:
-            match = re.search(r'\[.*?\]', raw, re.DOTALL)
-            if match:
-                return json.loads(match.group())
-        except Exception:
-            pass
-        return []
+        ))
+        return next(stream, None), stream
+    
+    try:
+        # One concurrency slot for the whole stream, not just its first chunk
+        with gemini.slot():
+            first, stream = gemini.call(open_stream, acquire=False)
+            for chunk in (stream if first is None else chain([first], stream)):
+                for seg in parser.feed(chunk.text or ""):
+                    count += 1
+                    yield seg
     except Exception as e:
-        print(f"  ❌ Gemini error: {e}")
-        return []
+        print(f"  ❌ {label}Gemini error: {e}")
+        METRICS.count("gemini.generate.errors")
+        error = True
+    finally:
+        # Clean up uploaded file
+        delete_upload(client, uploaded_file)
+    
+    if parser.started and not parser.closed:
+        print(f"  ⚠️  {label}Response ended mid-array — kept {count} complete segments")
+    if parser.skipped:
+        print(f"  ⚠️  {label}Skipped {parser.skipped} malformed entries")
+    print(f"  ✅ {label}Transcribed {count} dialogue segments")
+    return parser.closed and not error
 
 
-def detect_language(text: str) -> str:
-    tamil_re = re.compile(r'[\u0B80-\u0BFF]')
-    if tamil_re.search(text):
-        return 'tamil'
-    english_ratio = len(re.findall(r'[a-zA-Z]', text)) / max(len(text), 1)
-    if english_ratio > 0.85:
-        return 'english'
-    return 'tanglish'
+def extract_video_id(youtube_url: str) -> str | None:
+    match = re.search(r'(?:v=|youtu\.be/)([a-zA-Z0-9_-]{11})', youtube_url)
+    return match.group(1) if match else None
 
 
-def upsert_to_supabase(supabase, movie_info: dict, youtube_url: str, segments: list[dict]) -> dict:
-    """Upsert movie + segments to Supabase"""
+def upsert_to_supabase(supabase, movie_info: dict, youtube_url: str, segments: Iterable[dict],
+                       incremental: bool = False, write=None, dedup: Deduper | None = None,
+                       compact: bool = False, embed: bool = False) -> dict:
+    """Upsert movie + segments to Supabase
     
-    # Extract video ID from URL
-    video_id_match = re.search(r'(?:v=|youtu\.be/)([a-zA-Z0-9_-]{11})', youtube_url)
-    if not video_id_match:
-        print(f"  ❌ Could not extract video ID from URL: {youtube_url}")
-        return {"success": False, "segments": 0}
+    `segments` may be a live iterator (see IngestPipeline); rows are then
+    written as they arrive instead of after the whole transcript is in.
+    With `compact`, consecutive phrases are merged into speaker-turn windows
+    (vasanam/compact.py); with `dedup`, near-duplicates of other movies'
+    segments are skipped or linked on the way (vasanam/dedup.py). With
+    `embed`, the rows written get vectors afterwards (vasanam/embed.py).
+    """
     
-    youtube_video_id = video_id_match.group(1)
+    youtube_video_id = extract_video_id(youtube_url)
+    if not youtube_video_id:
+        print(f"  ❌ Could not extract video ID from URL: {youtube_url}")
+        return {"success": False, "segments": 0, "error": "no video ID in URL"}
     
     # Upsert movie
     movie_data = {
@@ -328,66 +620,438 @@ def upsert_to_supabase(supabase, movie_info: dict, youtube_url: str, segments: l
         "director": movie_info.get("director"),
     }
     
-    result = supabase.table("vasanam_movies").upsert(
-        movie_data,
-        on_conflict="youtube_video_id"
-    ).execute()
+    with METRICS.timer("db.movie_upsert"):
+        result = execute(supabase.table("vasanam_movies").upsert(
+            movie_data,
+            on_conflict="youtube_video_id"
+        ))
     
     if not result.data:
         print(f"  ❌ Failed to upsert movie record")
-        return {"success": False, "segments": 0}
+        return {"success": False, "segments": 0, "error": "movie upsert failed"}
     
     movie_id = result.data[0]["id"]
     print(f"  📝 Movie upserted: {movie_info['title']} (id: {movie_id})")
     
-    if not segments:
+    if isinstance(segments, list) and not segments:
         print(f"  ⚠️  No segments to insert")
-        return {"success": True, "segments": 0}
-    
-    # Delete existing segments for this movie
-    supabase.table("vasanam_segments").delete().eq("movie_id", movie_id).execute()
+        return {"success": True, "segments": 0, "movie_id": movie_id}
     
     # Convert segments format: {start_seconds, end_seconds, text} → {start_ms, duration_ms, text}
-    rows = []
-    for seg in segments:
-        text = seg.get("text", "").strip()
-        if not text or len(text) < 3:
-            continue
+    count = 0
+    def to_rows():
+        nonlocal count
+        for seg in segments:
+            text = str(seg.get("text", "")).strip()
+            if not text or len(text) < 3:
+                continue
+            try:
+                start_ms = int(float(seg.get("start_seconds", 0)) * 1000)
+                end_ms = int(float(seg.get("end_seconds", start_ms / 1000 + 3)) * 1000)
+            except (TypeError, ValueError):
+                continue
+            count += 1
+            with METRICS.timer("detect_language"):
+                language = detect_language(text, GEMINI_ENGLISH_THRESHOLD)
+            yield {
+                "text": text,
+                "start_ms": start_ms,
+                "duration_ms": max(end_ms - start_ms, 500),
+                "language": language,
+            }
+    
+    def normalized(rows):
+        # Rows stream one at a time here; normalize_row() memoizes per word
+        for row in rows:
+            with METRICS.timer("normalize"):
+                sign_row(normalize_row(row))
+            yield row
+    
+    # Full reload or diff against what's already stored; a streamed transcript
+    # is inserted batch by batch as it arrives
+    write = write or make_segment_writer(supabase)
+    # with_context() holds each row back until the next cue arrives
+    rows = with_context(normalized(compact_cues(to_rows()) if compact else to_rows()))
+    if isinstance(segments, list):
+        rows = list(rows)
+        if dedup:
+            rows = dedup.apply(movie_id, rows)
+    elif dedup:
+        rows = dedup.filter(movie_id, rows)
+    with METRICS.timer("db.write"):  # includes waiting on a streamed transcript
+        written = write(movie_id, rows, incremental=incremental)
+    METRICS.count("segments", count)
+    if embed and count:
+        embed_pending(supabase, movie_id)
+    
+    if count == 0:
+        print(f"  ❌ No usable segments — existing segments left untouched")
+        return {"success": False, "segments": 0, "error": "no usable segments"}
+    if incremental:
+        print(f"  ✅ Synced {count} segments — +{written['inserted']} / -{written['deleted']}, "
+              f"{written['unchanged']} unchanged")
+    else:
+        print(f"  ✅ Inserted {written['inserted']} segments into Supabase")
+    return {"success": True, "segments": count, "movie_id": movie_id}
+
+
+def with_sample(segments: Iterable[dict], n: int = 5, label: str = "") -> Iterator[dict]:
+    """Pass segments through, printing the first few as they arrive"""
+    for i, seg in enumerate(segments):
+        if i == 0:
+            print(f"\n  📋 {label}Sample transcription (first {n} segments):")
+        if i < n:
+            print(f"     [{float(seg.get('start_seconds', 0)):.1f}s → {float(seg.get('end_seconds', 0)):.1f}s] {seg.get('text', '')}")
+        yield seg
+
+
+# ─── Transcript cache ──────────────────────────────────────────────────────
+# Two levels, both in the shared DiskCache:
+#   transcript:<video_id>:<config>    → {"audio_sha": ...}   (skips yt-dlp)
+#   transcript-audio:<audio_sha>:<config> → [segments]        (skips Gemini)
+# <config> digests the model, prompt, windowing and preprocessing, so changing any of them
+# misses instead of serving stale segments. No TTL — size/LRU eviction only.
+
+def transcript_config(chunk_seconds: float, overlap_seconds: float, prep: AudioPrep) -> str:
+    spec = json.dumps([GEMINI_MODEL, TANGLISH_PROMPT, chunk_seconds, overlap_seconds, asdict(prep)])
+    return hashlib.sha256(spec.encode("utf-8")).hexdigest()[:16]
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# ─── Async pipeline ────────────────────────────────────────────────────────
+# Each clip flows download → preprocess → split; each window flows upload → wait-for-ACTIVE
+# → transcribe; each clip's merged segments stream into a writer. Every stage
+# has its own worker pool, so clip N+1 downloads while clip N is transcribing.
+DEFAULT_WORKERS = {"download": 2, "preprocess": 2, "upload": 2, "wait": 8, "transcribe": 4, "write": 2}
+_END = object()
+
+
+class IncompleteTranscript(Exception):
+    """A window of the clip failed, so its transcript must not replace the stored one"""
+
+
+@dataclass
+class ClipJob:
+    index: int
+    url: str
+    movie_info: dict
+    label: str = ""
+    video_id: str | None = None
+    audio_sha: str | None = None
+    tmpdir: str | None = None
+    audio_path: str | None = None
+    timemap: TimeMap = field(default_factory=TimeMap)
+    merger: ChunkMerger | None = None
+    remaining: int = 0
+    failed: bool = False  # a window errored, so the transcript is incomplete — don't cache it
+    segments: list = field(default_factory=list)
+    sink: queue.Queue = field(default_factory=queue.Queue)  # merged segments → writer thread
+    result: dict | None = None
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+    
+    @property
+    def key(self) -> str:
+        """Journal key — the video ID, or the raw URL if it has none"""
+        return self.video_id or self.url
+
+
+@dataclass
+class WindowJob:
+    clip: ClipJob
+    window: int
+    path: str
+    label: str
+    file: object = None
+    mime_type: str = ""
+    ok: bool = False  # set once the window's transcript streamed to completion
+    finished: bool = False  # counted against its clip's remaining windows
+
+
+class IngestPipeline:
+    def __init__(self, api_key: str, supabase=None, write=None, dry_run: bool = False,
+                 incremental: bool = False, chunk_seconds: float = CHUNK_SECONDS,
+                 overlap_seconds: float = CHUNK_OVERLAP_SECONDS, workers: dict | None = None,
+                 cache: DiskCache | None = None, prep: AudioPrep | None = None,
+                 journal: Journal | None = None, dedup: Deduper | None = None, compact: bool = False,
+                 embed: bool = False):
+        self.client = genai.Client(api_key=api_key)
+        self.cache = cache
+        self.journal = journal
+        self.prep = prep or AudioPrep()
+        self.config = transcript_config(chunk_seconds, overlap_seconds, self.prep)
+        self.supabase = supabase
+        self.write = write
+        self.dry_run = dry_run
+        self.incremental = incremental
+        self.dedup = dedup
+        self.compact = compact
+        self.embed = embed
+        self.chunk_seconds = chunk_seconds
+        self.overlap_seconds = overlap_seconds
+        self.workers = {**DEFAULT_WORKERS, **(workers or {})}
+        # Start the Gemini AIMD limit at what the stage workers could issue at
+        # once; 429s halve it, so the upload/transcribe stages back off together
+        get_upstream("gemini", concurrency=self.workers["upload"] + self.workers["transcribe"])
+    
+    async def run(self, jobs: Iterable[ClipJob]) -> list[ClipJob]:
+        """Run jobs (consumed lazily) to completion; returns them with .result set"""
+        stages = {
+            "download": self._download,
+            "preprocess": self._preprocess,
+            "upload": self._upload,
+            "wait": self._wait_active,
+            "transcribe": self._transcribe,
+            "write": self._write,
+        }
+        self.queues = {name: asyncio.Queue() for name in stages}
+        # Writers block on their clip's segment queue inside a thread, so the
+        # default executor must be large enough that transcription never starves.
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=sum(max(n, 1) for n in self.workers.values()))
+        )
+        tasks = [
+            asyncio.create_task(self._worker(name, handler))
+            for name, handler in stages.items()
+            for _ in range(max(self.workers[name], 1))
+        ]
+        # Bound the clips in flight (and their temp audio) so a long manifest
+        # streams through instead of being downloaded all at once
+        self.slots = asyncio.Semaphore(sum(max(self.workers[name], 1) for name in ("download", "transcribe", "write")))
+        fed = []
+        for job in jobs:
+            await self.slots.acquire()
+            fed.append(job)
+            self.queues["download"].put_nowait(job)
+        await asyncio.gather(*(job.done.wait() for job in fed))
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return fed
+    
+    async def _worker(self, stage: str, handler):
+        queue_ = self.queues[stage]
+        while True:
+            item = await queue_.get()
+            try:
+                await handler(item)
+            except Exception as e:
+                print(f"  ❌ {item.label}{stage} failed: {e}")
+                if isinstance(item, WindowJob):
+                    self._window_done(item)
+                else:
+                    self._finish(item, {"success": False, "segments": 0, "error": f"{stage}: {e}"})
+            finally:
+                queue_.task_done()
+    
+    async def _download(self, job: ClipJob):
+        print(f"\n🎬 {job.label}Processing: {job.movie_info['title']} ({job.movie_info['year']})")
+        print(f"   URL: {job.url}")
+        if self.journal:
+            self.journal.begin(job.key)
+        if self.cache is not None and job.video_id:
+            entry = await asyncio.to_thread(self.cache.get_json, f"transcript:{job.video_id}:{self.config}")
+            if entry and await self._replay(job, entry["audio_sha"]):
+                return
         
-        start_ms = int(float(seg.get("start_seconds", 0)) * 1000)
-        end_ms = int(float(seg.get("end_seconds", start_ms / 1000 + 3)) * 1000)
-        duration_ms = max(end_ms - start_ms, 500)
+        job.tmpdir = tempfile.mkdtemp(prefix="vasanam-")
+        with METRICS.timer("yt_dlp"):
+            audio_path = await asyncio.to_thread(download_audio, job.url, job.tmpdir,
+                                                 transcode=self.prep.codec == "off")
+        if not audio_path:
+            print(f"  ❌ Skipping {job.movie_info['title']} — download failed")
+            self._finish(job, {"success": False, "segments": 0, "error": "download failed"})
+            return
+        METRICS.count("yt_dlp.bytes", os.path.getsize(audio_path))
+        if self.journal:
+            self.journal.stage(job.key, "downloaded", audio=Path(audio_path).name,
+                               bytes=os.path.getsize(audio_path))
+        
+        if self.cache is not None:
+            # Same audio under another video ID (re-uploads, mirrors) still hits
+            job.audio_sha = await asyncio.to_thread(file_sha256, audio_path)
+            if await self._replay(job, job.audio_sha):
+                return
         
-        rows.append({
-            "movie_id": movie_id,
-            "text": text,
-            "start_ms": start_ms,
-            "duration_ms": duration_ms,
-            "language": detect_language(text),
-        })
-    
-    # Batch insert in chunks of 500
-    BATCH_SIZE = 500
-    total_inserted = 0
-    for i in range(0, len(rows), BATCH_SIZE):
-        batch = rows[i:i + BATCH_SIZE]
-        supabase.table("vasanam_segments").insert(batch).execute()
-        total_inserted += len(batch)
-    
-    print(f"  ✅ Inserted {total_inserted} segments into Supabase")
-    return {"success": True, "segments": total_inserted}
+        job.audio_path = audio_path
+        self.queues["preprocess"].put_nowait(job)
+    
+    async def _preprocess(self, job: ClipJob):
+        with METRICS.timer("preprocess"):
+            audio_path, job.timemap = await asyncio.to_thread(preprocess_audio, job.audio_path,
+                                                              os.path.join(job.tmpdir, "speech"), self.prep)
+        with METRICS.timer("split"):
+            chunks = await asyncio.to_thread(split_audio, audio_path, os.path.join(job.tmpdir, "chunks"),
+                                             self.chunk_seconds, self.overlap_seconds)
+        if len(chunks) > 1:
+            print(f"  ✂️  {job.label}Split into {len(chunks)} windows of {self.chunk_seconds / 60:g} min "
+                  f"(+{self.overlap_seconds:g}s overlap)")
+        job.merger = ChunkMerger([offset for _, offset in chunks], self.overlap_seconds)
+        job.remaining = len(chunks)
+        for window, (path, _) in enumerate(chunks):
+            label = f"{job.label}[{window + 1}/{len(chunks)}] " if len(chunks) > 1 else job.label
+            self.queues["upload"].put_nowait(WindowJob(job, window, path, label))
+        self.queues["write"].put_nowait(job)
+    
+    async def _replay(self, job: ClipJob, audio_sha: str) -> bool:
+        """Serve a clip's transcript from the cache; False on a miss"""
+        segments = await asyncio.to_thread(self.cache.get_json, f"transcript-audio:{audio_sha}:{self.config}")
+        if segments is None:
+            return False
+        METRICS.count("gemini.cache_hits")
+        print(f"  📦 {job.label}Cached transcript ({len(segments)} segments) — skipping download and Gemini")
+        job.audio_sha = audio_sha
+        if self.journal:
+            self.journal.stage(job.key, "transcribed", audio_sha=audio_sha, segments=len(segments), cached=True)
+        for seg in segments:
+            job.sink.put(seg)
+        job.sink.put(_END)
+        self.queues["write"].put_nowait(job)
+        return True
+    
+    def _store(self, job: ClipJob):
+        if job.video_id:
+            self.cache.put_json(f"transcript:{job.video_id}:{self.config}", {"audio_sha": job.audio_sha})
+        segments = sorted(job.segments, key=lambda s: float(s.get("start_seconds", 0)))
+        self.cache.put_json(f"transcript-audio:{job.audio_sha}:{self.config}", segments)
+    
+    async def _upload(self, window: WindowJob):
+        with METRICS.timer("gemini.upload"):
+            window.file, window.mime_type = await asyncio.to_thread(upload_audio, self.client, window.path, window.label)
+        METRICS.count("gemini.upload_bytes", os.path.getsize(window.path))
+        self.queues["wait"].put_nowait(window)
+    
+    async def _wait_active(self, window: WindowJob):
+        with METRICS.timer("gemini.wait_active"):
+            window.file = await wait_until_active(self.client, window.file, window.label)
+        if window.file is None:
+            self._window_done(window)
+            return
+        self.queues["transcribe"].put_nowait(window)
+    
+    async def _transcribe(self, window: WindowJob):
+        clip = window.clip
+        def run():
+            segments = stream_transcript(self.client, window.file, window.mime_type, window.label)
+            start = time.perf_counter()
+            first = True
+            while True:
+                try:
+                    seg = next(segments)
+                except StopIteration as done:
+                    window.ok = bool(done.value)
+                    return
+                if first:
+                    METRICS.observe("gemini.first_segment", time.perf_counter() - start)
+                    first = False
+                merged = clip.merger.accept(window.window, seg)
+                if merged:
+                    merged = clip.timemap.remap(merged)
+                    clip.segments.append(merged)
+                    clip.sink.put(merged)
+        try:
+            with METRICS.timer("gemini.generate"):
+                await asyncio.to_thread(run)
+        finally:
+            self._window_done(window)
+    
+    def _window_done(self, window: WindowJob):
+        # A window that raises mid-transcribe gets here from both _transcribe and _worker
+        if window.finished:
+            return
+        window.finished = True
+        clip = window.clip
+        if not window.ok:
+            clip.failed = True
+        clip.remaining -= 1
+        if clip.remaining == 0:
+            # Dry runs cache too, so a preview can be promoted to a live write for free
+            if self.cache is not None and clip.audio_sha and not clip.failed and clip.segments:
+                try:
+                    self._store(clip)
+                except Exception as e:
+                    print(f"  ⚠️  {clip.label}Could not cache transcript: {e}")
+            if self.journal:
+                self.journal.stage(clip.key, "transcribed", audio_sha=clip.audio_sha,
+                                   segments=len(clip.segments), complete=not clip.failed)
+            clip.sink.put(_END)
+    
+    async def _write(self, job: ClipJob):
+        title = job.movie_info["title"]
+        segments = with_sample(iter(job.sink.get, _END), label=job.label)
+        if self.dry_run:
+            count = await asyncio.to_thread(lambda: sum(1 for _ in segments))
+            if count:
+                print(f"\n  🔍 {job.label}Dry run complete — {count} segments, not saving to DB")
+            else:
+                print(f"  ❌ Skipping {title} — transcription produced no output")
+            self._finish(job, {"success": count > 0, "segments": count, "dry_run": True})
+            return
+        
+        def complete(segments):
+            # A failed window means the transcript is missing lines: fail the
+            # write, which takes back what it inserted and deletes nothing
+            yield from segments
+            if job.failed:
+                raise IncompleteTranscript
+
+        # The writer consumes the transcript while windows are still streaming in
+        try:
+            result = await asyncio.to_thread(upsert_to_supabase, self.supabase, job.movie_info, job.url,
+                                             complete(segments), incremental=self.incremental,
+                                             write=self.write, dedup=self.dedup, compact=self.compact,
+                                             embed=self.embed)
+        except IncompleteTranscript:
+            print(f"  ❌ {job.label}Transcription of {title} is incomplete — kept the stored segments, discarded the new ones")
+            self._finish(job, {"success": False, "segments": 0, "error": "incomplete transcript"})
+            return
+        if not result.get("success"):
+            print(f"  ❌ Skipping {title} — transcription produced no output")
+        elif self.journal:
+            self.journal.done(job.key, movie_id=result.get("movie_id"), written=result["segments"])
+        self._finish(job, result)
+    
+    def _finish(self, job: ClipJob, result: dict):
+        if job.done.is_set():
+            return
+        job.result = result
+        METRICS.count("clips.ok" if result.get("success") else "clips.failed")
+        if self.journal and not result.get("success"):
+            self.journal.fail(job.key, result.get("error", "failed"))
+        if job.tmpdir:
+            shutil.rmtree(job.tmpdir, ignore_errors=True)
+        job.segments = []
+        job.merger = None
+        job.done.set()
+        self.slots.release()
 
 
-def process_single(url: str, title: str, year: int, title_tamil: str = None,
-                   actors: list = None, director: str = None, dry_run: bool = False):
-    """Process a single YouTube URL"""
+def run_pipeline(items: Iterable[dict], dry_run: bool = False, incremental: bool = False,
+                 writer: str = "rest", database_url: str = None, chunk_seconds: float = CHUNK_SECONDS,
+                 overlap_seconds: float = CHUNK_OVERLAP_SECONDS, workers: dict | None = None,
+                 cache: DiskCache | None = None, prep: AudioPrep | None = None,
+                 journal: Journal | None = None, journal_mode: str | None = None,
+                 dedup: str = "off", compact: bool = False, embed: bool = False) -> list[dict]:
+    """Run clips ({url, title, year, ...}) through the pipeline; one result per item
     
+    `items` may be a lazy iterator (e.g. a manifest); it is consumed as
+    pipeline slots free up.
+    
+    With a journal and journal_mode ("resume" / "retry-failed"), clips the
+    journal rules out are not run and come back marked "skipped".
+    """
     api_key = os.environ.get("GEMINI_API_KEY")
     if not api_key:
         print("❌ GEMINI_API_KEY not set")
         sys.exit(1)
     
-    supabase = None
+    supabase = write = deduper = None
     if not dry_run:
         supa_url = os.environ.get("SUPABASE_URL")
         supa_key = os.environ.get("SUPABASE_SERVICE_KEY")
@@ -395,84 +1059,85 @@ def process_single(url: str, title: str, year: int, title_tamil: str = None,
             print("❌ SUPABASE_URL and SUPABASE_SERVICE_KEY required (or use --dry-run)")
             sys.exit(1)
         supabase = create_client(supa_url, supa_key)
+        write = make_segment_writer(supabase, writer, database_url)
+        if dedup != "off":
+            deduper = Deduper(supabase, dedup)
     
-    movie_info = {
-        "title": title,
-        "title_tamil": title_tamil,
-        "year": year,
-        "actors": actors or [],
-        "director": director,
-    }
+    total = len(items) if isinstance(items, list) else None
+    results: dict[int, dict] = {}
     
-    print(f"\n🎬 Processing: {title} ({year})")
-    print(f"   URL: {url}")
+    def jobs():
+        for i, item in enumerate(items):
+            video_id = extract_video_id(item["url"])
+            if journal and not journal.should_run(video_id or item["url"], journal_mode):
+                entry = journal.get(video_id or item["url"]) or {"status": None, "outputs": {}}
+                print(f"⏭️  {item['title']}: {entry['status'] or 'not started'} — skipped ({journal_mode})")
+                results[i] = {"title": item["title"], "success": entry["status"] == "done",
+                              "segments": entry["outputs"].get("written", 0), "skipped": True}
+                continue
+            movie_info = {
+                "title": item["title"],
+                "title_tamil": item.get("title_tamil"),
+                "year": item["year"],
+                "actors": item.get("actors") or [],
+                "director": item.get("director"),
+            }
+            label = "" if total == 1 else f"[{i + 1}/{total}] " if total else f"[{i + 1}] "
+            yield ClipJob(i, item["url"], movie_info, label, video_id=video_id)
     
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # Step 1: Download audio
-        audio_path = download_audio(url, tmpdir)
-        if not audio_path:
-            print(f"  ❌ Skipping {title} — download failed")
-            return {"success": False, "segments": 0}
-        
-        # Step 2: Transcribe with Gemini
-        segments = transcribe_with_gemini(audio_path, api_key)
-        if not segments:
-            print(f"  ❌ Skipping {title} — transcription produced no output")
-            return {"success": False, "segments": 0}
-        
-        # Show sample output
-        print(f"\n  📋 Sample transcription (first 5 segments):")
-        for seg in segments[:5]:
-            print(f"     [{seg.get('start_seconds', 0):.1f}s → {seg.get('end_seconds', 0):.1f}s] {seg.get('text', '')}")
-        
-        if dry_run:
-            print(f"\n  🔍 Dry run complete — {len(segments)} segments, not saving to DB")
-            return {"success": True, "segments": len(segments), "dry_run": True}
-        
-        # Step 3: Save to Supabase
-        result = upsert_to_supabase(supabase, movie_info, url, segments)
-        return result
+    # Dry runs never write, so they must not mark anything done in the journal
+    pipeline = IngestPipeline(api_key, supabase, write, dry_run=dry_run, incremental=incremental,
+                              chunk_seconds=chunk_seconds, overlap_seconds=overlap_seconds, workers=workers,
+                              cache=cache, prep=prep, journal=None if dry_run else journal, dedup=deduper,
+                              compact=compact, embed=embed)
+    try:
+        for job in asyncio.run(pipeline.run(jobs())):
+            results[job.index] = {"title": job.movie_info["title"], **job.result}
+        return [results[i] for i in sorted(results)]
+    finally:
+        if cache is not None:
+            cache.close()
+        if journal is not None:
+            journal.close()
+
+
+def process_single(url: str, title: str, year: int, title_tamil: str = None,
+                   actors: list = None, director: str = None, **pipeline_opts):
+    """Process a single YouTube URL"""
+    item = {"url": url, "title": title, "year": year, "title_tamil": title_tamil,
+            "actors": actors, "director": director}
+    return run_pipeline([item], **pipeline_opts)[0]
 
 
-def run_seed_batch(dry_run: bool = False):
+def run_seed_batch(**pipeline_opts):
     """Run the approved 5-URL seed batch"""
-    print("🌱 Running Vasanam seed batch (5 YouTube scene clips)")
+    return run_batch(SEED_BATCH, "🌱 Running Vasanam seed batch (5 YouTube scene clips)", **pipeline_opts)
+
+
+def run_manifest(path: str, shard: tuple[int, int] | None = None, **pipeline_opts):
+    """Stream clips from a JSONL/CSV manifest (see vasanam.manifest) through the pipeline"""
+    items = load_manifest(path, require=("title", "year", "url"), shard=shard)
+    heading = f"📋 Running manifest {path}" + (f" (shard {shard[0]}/{shard[1]})" if shard else "")
+    return run_batch(items, heading, **pipeline_opts)
+
+
+def run_batch(items: Iterable[dict], heading: str, **pipeline_opts):
+    dry_run = pipeline_opts.get("dry_run", False)
+    print(heading)
     print(f"   Mode: {'DRY RUN — no DB writes' if dry_run else 'LIVE — writing to Supabase'}")
     print("=" * 60)
     
-    results = []
-    total_segments = 0
-    
-    for i, item in enumerate(SEED_BATCH):
-        print(f"\n[{i+1}/{len(SEED_BATCH)}] {item['title']}")
-        print(f"   {item['description']}")
-        
-        result = process_single(
-            url=item["url"],
-            title=item["title"],
-            year=item["year"],
-            title_tamil=item.get("title_tamil"),
-            actors=item.get("actors"),
-            director=item.get("director"),
-            dry_run=dry_run,
-        )
-        results.append({"title": item["title"], **result})
-        
-        if result.get("success"):
-            total_segments += result.get("segments", 0)
-        
-        # Rate limit between items
-        if i < len(SEED_BATCH) - 1:
-            print("  ⏳ Waiting 5s between clips...")
-            time.sleep(5)
+    # Stage worker limits pace the APIs — no fixed sleep between clips
+    results = run_pipeline(items, **pipeline_opts)
+    total_segments = sum(r.get("segments", 0) for r in results if r.get("success"))
     
     print("\n" + "=" * 60)
-    print("✅ Seed batch complete!")
-    print(f"   Processed: {sum(1 for r in results if r.get('success'))}/{len(SEED_BATCH)} videos")
+    print("✅ Batch complete!")
+    print(f"   Processed: {sum(1 for r in results if r.get('success'))}/{len(results)} videos")
     print(f"   Total segments: {total_segments:,}")
     print()
     for r in results:
-        status = "✅" if r.get("success") else "❌"
+        status = "⏭️ " if r.get("skipped") else "✅" if r.get("success") else "❌"
         segs = r.get("segments", 0)
         print(f"   {status} {r['title']}: {segs} segments")
     
@@ -500,6 +1165,10 @@ Examples:
                         help="Run the approved 5-URL seed batch")
     parser.add_argument("--url", type=str,
                         help="YouTube URL to process")
+    parser.add_argument("--manifest", type=str,
+                        help="JSONL/CSV list of clips (url or youtube_video_id, title, year, ...)")
+    parser.add_argument("--shard", type=str,
+                        help="With --manifest: only run shard i of N (0-based, e.g. 0/4)")
     parser.add_argument("--title", type=str,
                         help="Movie title (required with --url)")
     parser.add_argument("--year", type=int,
@@ -512,37 +1181,123 @@ Examples:
                         help="Director name (optional)")
     parser.add_argument("--dry-run", action="store_true",
                         help="Transcribe and show output, but don't write to Supabase")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only write new/changed segments and delete stale ones (needs migration 003)")
+    parser.add_argument("--writer", choices=["rest", "copy"], default="rest",
+                        help="Segment writer: Supabase REST batches, or Postgres COPY (default: rest)")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"),
+                        help="Direct Postgres connection string for --writer copy (default: $DATABASE_URL)")
+    parser.add_argument("--compact", action="store_true",
+                        help="Merge consecutive phrases into speaker-turn windows (needs migration 008)")
+    parser.add_argument("--embed", action="store_true",
+                        help="Compute vectors for each clip's new segments after writing (needs migration 009)")
+    parser.add_argument("--dedup", choices=DEDUP_MODES, default="off",
+                        help="Near-duplicates of other movies' segments: keep, skip, or link them (needs migration 007)")
+    parser.add_argument("--chunk-minutes", type=float, default=CHUNK_SECONDS / 60,
+                        help=f"Split audio longer than this into windows (default: {CHUNK_SECONDS // 60})")
+    parser.add_argument("--overlap-seconds", type=float, default=CHUNK_OVERLAP_SECONDS,
+                        help=f"Overlap between windows (default: {CHUNK_OVERLAP_SECONDS})")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_WORKERS["transcribe"],
+                        help=f"Gemini transcriptions in flight, across all clips/windows (default: {DEFAULT_WORKERS['transcribe']})")
+    parser.add_argument("--download-workers", type=int, default=DEFAULT_WORKERS["download"],
+                        help=f"Parallel yt-dlp downloads (default: {DEFAULT_WORKERS['download']})")
+    parser.add_argument("--upload-workers", type=int, default=DEFAULT_WORKERS["upload"],
+                        help=f"Parallel Gemini file uploads (default: {DEFAULT_WORKERS['upload']})")
+    parser.add_argument("--write-workers", type=int, default=DEFAULT_WORKERS["write"],
+                        help=f"Parallel Supabase writers (default: {DEFAULT_WORKERS['write']})")
+    parser.add_argument("--preprocess", choices=["opus", "flac", "off"], default="opus",
+                        help="Re-encode to 16 kHz mono before upload (default: opus)")
+    parser.add_argument("--bitrate", type=int, default=AudioPrep.bitrate_kbps,
+                        help=f"Opus bitrate in kbps (default: {AudioPrep.bitrate_kbps})")
+    parser.add_argument("--vad", action="store_true",
+                        help="Cut non-speech spans before upload; timestamps are mapped back to the video")
+    parser.add_argument("--vad-min-silence", type=float, default=AudioPrep.min_silence,
+                        help=f"Shortest quiet span to cut, in seconds (default: {AudioPrep.min_silence})")
+    parser.add_argument("--vad-noise-db", type=float, default=AudioPrep.noise_db,
+                        help=f"Level below which audio counts as silence (default: {AudioPrep.noise_db})")
+    parser.add_argument("--preprocess-workers", type=int, default=DEFAULT_WORKERS["preprocess"],
+                        help=f"Parallel ffmpeg preprocessing jobs (default: {DEFAULT_WORKERS['preprocess']})")
+    parser.add_argument("--journal", default=DEFAULT_JOURNAL_PATH,
+                        help=f"Job journal recording each clip's progress (default: {DEFAULT_JOURNAL_PATH})")
+    resume = parser.add_mutually_exclusive_group()
+    resume.add_argument("--resume", action="store_const", const="resume", dest="journal_mode",
+                        help="Skip clips the journal shows as already written")
+    resume.add_argument("--retry-failed", action="store_const", const="retry-failed", dest="journal_mode",
+                        help="Only re-run clips that failed or were interrupted last time")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always download and transcribe again; don't read or write the transcript cache")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help=f"Transcript cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--cache-max-mb", type=int, default=2048,
+                        help="Evict least-recently-used cache entries beyond this size (default: 2048)")
+    parser.add_argument("--metrics-json", help="Write a JSON run report (per-stage timings, counters) here")
+    parser.add_argument("--metrics-prom", help="Write Prometheus text-format metrics here")
+    parser.add_argument("--profile", action="store_true", help="Run under cProfile and print the top hot spots")
     
     args = parser.parse_args()
+    pipeline_opts = {
+        "dry_run": args.dry_run,
+        "incremental": args.incremental,
+        "writer": args.writer,
+        "database_url": args.database_url,
+        "dedup": args.dedup,
+        "compact": args.compact,
+        "embed": args.embed,
+        "chunk_seconds": args.chunk_minutes * 60,
+        "overlap_seconds": args.overlap_seconds,
+        "workers": {
+            "download": args.download_workers,
+            "preprocess": args.preprocess_workers,
+            "upload": args.upload_workers,
+            "transcribe": args.concurrency,
+            "write": args.write_workers,
+        },
+        "prep": AudioPrep(codec=args.preprocess, bitrate_kbps=args.bitrate, vad=args.vad,
+                          min_silence=args.vad_min_silence, noise_db=args.vad_noise_db),
+        "cache": None if args.no_cache else DiskCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024),
+        "journal": Journal(args.journal, script="gemini"),
+        "journal_mode": args.journal_mode,
+    }
     
-    if args.batch:
-        run_seed_batch(dry_run=args.dry_run)
-    elif args.url:
-        if not args.title or not args.year:
-            parser.error("--url requires --title and --year")
-        
-        actors = [a.strip() for a in args.actors.split(",")] if args.actors else []
-        
-        result = process_single(
-            url=args.url,
-            title=args.title,
-            year=args.year,
-            title_tamil=args.title_tamil,
-            actors=actors,
-            director=args.director,
-            dry_run=args.dry_run,
-        )
-        
-        if result.get("success"):
-            print(f"\n✅ Done! {result.get('segments', 0)} segments indexed")
-        else:
-            print(f"\n❌ Failed")
-            sys.exit(1)
-    else:
-        parser.print_help()
-        print("\nNeed --batch or --url")
-        sys.exit(1)
+    # Failed runs (sys.exit) still export what they timed
+    try:
+        with profiled(args.profile):
+            if args.manifest:
+                try:
+                    shard = parse_shard(args.shard) if args.shard else None
+                except ManifestError as e:
+                    parser.error(str(e))
+                run_manifest(args.manifest, shard, **pipeline_opts)
+            elif args.batch:
+                run_seed_batch(**pipeline_opts)
+            elif args.url:
+                if not args.title or not args.year:
+                    parser.error("--url requires --title and --year")
+                
+                actors = [a.strip() for a in args.actors.split(",")] if args.actors else []
+                
+                result = process_single(
+                    url=args.url,
+                    title=args.title,
+                    year=args.year,
+                    title_tamil=args.title_tamil,
+                    actors=actors,
+                    director=args.director,
+                    **pipeline_opts,
+                )
+                
+                if result.get("success"):
+                    print(f"\n✅ Done! {result.get('segments', 0)} segments indexed")
+                else:
+                    print(f"\n❌ Failed")
+                    sys.exit(1)
+            else:
+                parser.print_help()
+                print("\nNeed --batch, --manifest or --url")
+                sys.exit(1)
 
+    finally:
+        export(args.metrics_json, args.metrics_prom)
 
 if __name__ == "__main__":
     main()
@@ -5,6 +5,14 @@ Fetches Tamil/English subtitles for Tamil movies and indexes them in Supabase.
 
 Usage:
   python3 scripts/ingest-opensubtitles.py --username USER --password PASS [--movie "Baasha"]
+  python3 scripts/ingest-opensubtitles.py ... --concurrency 8 --rate 5   # parallel workers
+  python3 scripts/ingest-opensubtitles.py --offline                      # re-index from local cache only
+  python3 scripts/ingest-opensubtitles.py ... --resume                   # continue an interrupted run
+  python3 scripts/ingest-opensubtitles.py ... --manifest movies.jsonl --shard 0/4   # one of 4 machines
+  python3 scripts/ingest-opensubtitles.py ... --compact --dedup skip  # cue windows, drop copies of other movies
+
+Searches and downloaded SRTs are cached under ~/.cache/vasanam (VASANAM_CACHE_DIR),
+so re-runs don't spend the daily download quota. --refresh ignores cached entries.
 
 Requirements:
   pip install requests supabase python-dotenv
@@ -13,16 +21,33 @@ OpenSubtitles API: https://opensubtitles.stoplight.io/
 Register at: https://www.opensubtitles.com/en/consumers
 """
 
-import os, sys, re, time, json, gzip, io
+import os, sys, json, gzip
 import argparse
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 import requests
+from requests.adapters import HTTPAdapter
 from supabase import create_client
 
+from vasanam.cache import DiskCache, DEFAULT_CACHE_DIR
+from vasanam.journal import Journal, DEFAULT_JOURNAL_PATH
+from vasanam.metrics import METRICS, export, profiled
+from vasanam.manifest import load_manifest, parse_shard, in_shard, ManifestError
+from vasanam.compact import compact_cues
+from vasanam.dedup import MODES as DEDUP_MODES, Deduper, sign_row
+from vasanam.embed import embed_pending
+from vasanam.normalize import normalize_rows, with_context
+from vasanam.retry import Upstream, get_upstream
+from vasanam.lang import classify_languages, OPENSUBTITLES_ENGLISH_THRESHOLD
+from vasanam.segments import execute, make_segment_writer
+from vasanam.srt import parse_srt
+
 # ── Config ────────────────────────────────────────────────────────────────────
 SUPABASE_URL = os.environ.get("SUPABASE_URL") or os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")
 OS_BASE      = "https://api.opensubtitles.com/api/v1"
 OS_APP_NAME  = "Vasanam v1.0"
+OS_RATE      = 5.0   # OpenSubtitles allows ~5 API requests/second per client
+SEARCH_TTL   = 7 * 24 * 3600  # search results go stale; SRT files for a file_id never change
 
 # ── Movie list with IMDB IDs (for OpenSubtitles search) ───────────────────────
 MOVIES = [
@@ -106,76 +131,30 @@ MOVIES = [
     {"title": "Maaveeran",      "title_tamil": "மாவீரன்",      "year": 2023, "imdb_id": "tt21827178","youtube_video_id": "dScM-RA1P5E", "actors": ["Sivakarthikeyan","Aditi Shankar"],        "director": "Madonne Ashwin"},
 ]
 
-# ── SRT parser ────────────────────────────────────────────────────────────────
-def parse_srt(content: str) -> list[dict]:
-    """Parse SRT subtitle content into list of {text, start_ms, duration_ms}"""
-    segments = []
-    blocks = re.split(r'\n\n+', content.strip())
-    
-    for block in blocks:
-        lines = block.strip().split('\n')
-        if len(lines) < 3:
-            continue
-        
-        # Find timecode line (e.g., "00:01:23,456 --> 00:01:25,789")
-        timecode_line = None
-        text_lines = []
-        for i, line in enumerate(lines):
-            if '-->' in line:
-                timecode_line = line
-                text_lines = lines[i+1:]
-                break
-        
-        if not timecode_line or not text_lines:
-            continue
-        
-        # Parse timestamps
-        try:
-            parts = timecode_line.split(' --> ')
-            start_ms = srt_time_to_ms(parts[0].strip())
-            end_ms = srt_time_to_ms(parts[1].strip().split(' ')[0])
-            
-            text = ' '.join(text_lines).strip()
-            # Remove HTML tags
-            text = re.sub(r'<[^>]+>', '', text)
-            # Remove SDH markers like (Music), [Applause]
-            text = re.sub(r'\([^)]*\)|\[[^\]]*\]', '', text).strip()
-            
-            if text and len(text) > 2:
-                segments.append({
-                    'text': text,
-                    'start_ms': start_ms,
-                    'duration_ms': max(end_ms - start_ms, 1000),
-                })
-        except Exception:
-            continue
-    
-    return segments
-
-def srt_time_to_ms(time_str: str) -> int:
-    """Convert SRT time format (HH:MM:SS,mmm) to milliseconds"""
-    time_str = time_str.replace(',', '.')
-    parts = time_str.split(':')
-    hours = int(parts[0])
-    minutes = int(parts[1])
-    sec_ms = float(parts[2])
-    return int((hours * 3600 + minutes * 60 + sec_ms) * 1000)
-
-def detect_language(text: str) -> str:
-    tamil_re = re.compile(r'[\u0B80-\u0BFF]')
-    if tamil_re.search(text):
-        return 'tamil'
-    english_ratio = len(re.findall(r'[a-zA-Z]', text)) / max(len(text), 1)
-    return 'english' if english_ratio > 0.7 else 'tanglish'
-
 # ── OpenSubtitles client ──────────────────────────────────────────────────────
 class OpenSubtitlesClient:
-    def __init__(self, username: str, password: str, api_key: str):
+    def __init__(self, username: str, password: str, api_key: str,
+                 upstream: Upstream | None = None, pool_size: int = 8,
+                 cache: DiskCache | None = None, offline: bool = False, refresh: bool = False,
+                 search_ttl: float = SEARCH_TTL):
         self.username = username
         self.password = password
         self.api_key = api_key
         self.token = None
+        # The API has a fixed req/s quota; the file CDN only needs backoff
+        self.api = upstream or get_upstream("os", rate=OS_RATE, concurrency=pool_size)
+        self.cdn = get_upstream("os.cdn", concurrency=pool_size)
+        self.cache = cache
+        self.offline = offline    # serve from cache only, never touch the network
+        self.refresh = refresh    # ignore cached entries (but still write fresh ones)
+        self.search_ttl = search_ttl
+        # One keep-alive pool for the API and the file CDN, sized for every
+        # worker + in-flight search so connections are reused, not re-handshaked
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.pool = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="opensubs")
         self.session.headers.update({
             'Api-Key': api_key,
             'Content-Type': 'application/json',
@@ -183,7 +162,10 @@ class OpenSubtitlesClient:
         })
     
     def login(self):
-        resp = self.session.post(f"{OS_BASE}/login", json={
+        if self.offline:
+            print(f"  📦 Offline mode — using cached OpenSubtitles data only")
+            return
+        resp = self.api.call(self.session.post, f"{OS_BASE}/login", json={
             "username": self.username,
             "password": self.password,
         })
@@ -192,73 +174,133 @@ class OpenSubtitlesClient:
         self.session.headers.update({'Authorization': f'Bearer {self.token}'})
         print(f"  ✅ Logged in to OpenSubtitles")
     
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+    
     def search(self, imdb_id: str, languages: list[str] = ["ta", "en"]) -> list[dict]:
         """Search for subtitles by IMDB ID"""
+        return self.gather(self.search_async(imdb_id, languages))
+    
+    def search_async(self, imdb_id: str, languages: list[str] = ["ta", "en"]) -> list[Future]:
+        """Start one search per language at once; pass the result to gather()"""
+        return [self.pool.submit(self._search_language, imdb_id, lang) for lang in languages]
+    
+    @staticmethod
+    def gather(pending: list[Future]) -> list[dict]:
+        """Wait for search_async() futures and merge their results in language order"""
         results = []
-        for lang in languages:
-            try:
-                resp = self.session.get(f"{OS_BASE}/subtitles", params={
-                    "imdb_id": imdb_id.replace("tt", ""),
-                    "languages": lang,
-                    "type": "movie",
-                })
-                if resp.status_code == 200:
-                    data = resp.json()
-                    results.extend(data.get('data', []))
-            except Exception as e:
-                print(f"    Search error ({lang}): {e}")
+        for future in pending:
+            results.extend(future.result())
         return results
     
-    def download(self, file_id: int) -> str | None:
-        """Download subtitle content"""
-        try:
-            resp = self.session.post(f"{OS_BASE}/download", json={
+    def _cached(self, key: str) -> bytes | None:
+        if self.cache is None or self.refresh:
+            return None
+        return self.cache.get(key)
+    
+    def _search_language(self, imdb_id: str, lang: str) -> list[dict]:
+        key = f"search:{imdb_id}:{lang}"
+        cached = self._cached(key)
+        if cached is not None:
+            METRICS.count("os.cache_hits")
+            return json.loads(cached)
+        if self.offline:
+            return []
+        # Transient failures are retried; one that outlasts the retries raises,
+        # so the movie is journalled as failed instead of "no subtitles found"
+        with METRICS.timer("os.search"):
+            resp = self.api.call(self.session.get, f"{OS_BASE}/subtitles", params={
+                "imdb_id": imdb_id.replace("tt", ""),
+                "languages": lang,
+                "type": "movie",
+            })
+        METRICS.count(f"os.http_{resp.status_code}")
+        if resp.status_code != 200:
+            print(f"    Search error ({lang}): HTTP {resp.status_code}")
+            return []
+        data = resp.json().get('data', [])
+        if self.cache is not None:
+            self.cache.put_json(key, data, ttl=self.search_ttl)
+        return data
+    
+    def download(self, file_id: int) -> bytes | None:
+        """Download raw (gzip-decoded) subtitle bytes"""
+        key = f"srt:{file_id}"
+        cached = self._cached(key)
+        if cached is not None:
+            METRICS.count("os.cache_hits")
+            return cached
+        if self.offline:
+            return None
+        with METRICS.timer("os.download_link"):
+            resp = self.api.call(self.session.post, f"{OS_BASE}/download", json={
                 "file_id": file_id,
                 "sub_format": "srt",
             })
-            resp.raise_for_status()
-            data = resp.json()
-            
-            # Download the actual file
-            file_url = data.get('link')
-            if not file_url:
-                return None
-            
-            file_resp = requests.get(file_url)
+        METRICS.count(f"os.http_{resp.status_code}")
+        if resp.status_code != 200:
+            # 406 = daily download quota spent; not worth retrying today
+            METRICS.count("os.download.errors")
+            print(f"    Download error: HTTP {resp.status_code}")
+            return None
+        data = resp.json()
+        
+        # Download the actual file
+        file_url = data.get('link')
+        if not file_url:
+            return None
+        
+        # Same pooled session, but the CDN link is pre-signed — don't leak API credentials to it
+        with METRICS.timer("os.download_file"):
+            file_resp = self.cdn.call(self.session.get, file_url, headers={'Authorization': None, 'Api-Key': None})
+            file_resp.raise_for_status()
             content = file_resp.content
-            
-            # Handle gzip
-            if content[:2] == b'\x1f\x8b':
+        METRICS.count("os.download_bytes", len(content))
+        
+        # Handle gzip
+        if content[:2] == b'\x1f\x8b':
+            with METRICS.timer("os.gunzip"):
                 content = gzip.decompress(content)
-            
-            return content.decode('utf-8', errors='replace')
-        except Exception as e:
-            print(f"    Download error: {e}")
-            return None
+        
+        if self.cache is not None:
+            self.cache.put(key, content)
+        return content
 
 # ── Main ingestion ─────────────────────────────────────────────────────────────
-def ingest_movie(supabase, os_client: OpenSubtitlesClient, movie: dict) -> dict:
+def ingest_movie(supabase, os_client: OpenSubtitlesClient, movie: dict,
+                 pending_search: list[Future] | None = None, incremental: bool = False,
+                 write=None, journal: Journal | None = None, dedup: Deduper | None = None,
+                 compact: bool = False, embed: bool = False) -> dict:
     print(f"\n📽️  {movie['title']} ({movie['year']}) — IMDB: {movie['imdb_id']}")
     
+    # Searches run on the client's pool while the movie row is upserted
+    if pending_search is None:
+        pending_search = os_client.search_async(movie["imdb_id"], ["ta", "en"])
+    
     # Upsert movie record
-    result = supabase.table("vasanam_movies").upsert({
-        "title": movie["title"],
-        "title_tamil": movie.get("title_tamil"),
-        "year": movie["year"],
-        "youtube_video_id": movie["youtube_video_id"],
-        "actors": movie.get("actors", []),
-        "director": movie.get("director"),
-    }, on_conflict="youtube_video_id").execute()
+    with METRICS.timer("db.movie_upsert"):
+        result = execute(supabase.table("vasanam_movies").upsert({
+            "title": movie["title"],
+            "title_tamil": movie.get("title_tamil"),
+            "year": movie["year"],
+            "youtube_video_id": movie["youtube_video_id"],
+            "actors": movie.get("actors", []),
+            "director": movie.get("director"),
+        }, on_conflict="youtube_video_id"))
     
     movie_id = result.data[0]["id"]
     
-    # Search for subtitles
-    subs = os_client.search(movie["imdb_id"], ["ta", "en"])
+    # Search for subtitles (time left waiting after the upsert, not the search itself)
+    with METRICS.timer("os.search_wait"):
+        subs = os_client.gather(pending_search)
     if not subs:
-        print("  ⚠️  No subtitles found on OpenSubtitles")
-        return {"success": False, "segments": 0}
+        print(f"  ⚠️  {movie['title']}: no subtitles found on OpenSubtitles")
+        return {"success": False, "segments": 0, "error": "no subtitles found on OpenSubtitles"}
     
-    print(f"  📝 Found {len(subs)} subtitle files")
+    print(f"  📝 {movie['title']}: found {len(subs)} subtitle files")
     
     # Pick best subtitle (prefer Tamil, then English, highest download count)
     ta_subs = [s for s in subs if s.get("attributes", {}).get("language") == "ta"]
@@ -269,86 +311,224 @@ def ingest_movie(supabase, os_client: OpenSubtitlesClient, movie: dict) -> dict:
                    reverse=True)
     
     if not chosen:
-        print("  ⚠️  No usable subtitle file")
-        return {"success": False, "segments": 0}
+        print(f"  ⚠️  {movie['title']}: no usable subtitle file")
+        return {"success": False, "segments": 0, "error": "no usable subtitle file"}
     
     # Download
     file_id = chosen[0].get("attributes", {}).get("files", [{}])[0].get("file_id")
     if not file_id:
-        print("  ⚠️  No file_id in subtitle")
-        return {"success": False, "segments": 0}
+        print(f"  ⚠️  {movie['title']}: no file_id in subtitle")
+        return {"success": False, "segments": 0, "error": "no file_id in subtitle"}
     
-    content = os_client.download(file_id)
+    with METRICS.timer("os.download"):
+        content = os_client.download(file_id)
     if not content:
-        print("  ⚠️  Download failed")
-        return {"success": False, "segments": 0}
+        print(f"  ⚠️  {movie['title']}: download failed")
+        return {"success": False, "segments": 0, "error": "download failed"}
+    if journal:
+        journal.stage(movie["imdb_id"], "downloaded", movie_id=movie_id, file_id=file_id,
+                      language=chosen[0].get("attributes", {}).get("language"))
     
-    # Parse SRT
-    segments = parse_srt(content)
+    # Parse SRT (decoded line by line by the streaming parser)
+    with METRICS.timer("parse_srt"):
+        segments = parse_srt(content)
     if not segments:
-        print("  ⚠️  Could not parse SRT")
-        return {"success": False, "segments": 0}
-    
-    print(f"  🔤 Parsed {len(segments)} dialogue segments")
-    
-    # Detect language
-    lang = detect_language(segments[0]["text"] if segments else "")
-    
-    # Delete existing + batch insert
-    supabase.table("vasanam_segments").delete().eq("movie_id", movie_id).execute()
-    
-    BATCH = 500
-    total = 0
-    for i in range(0, len(segments), BATCH):
-        batch = [{
-            "movie_id": movie_id,
-            "text": s["text"],
-            "start_ms": s["start_ms"],
-            "duration_ms": s["duration_ms"],
-            "language": detect_language(s["text"]),
-        } for s in segments[i:i+BATCH]]
-        supabase.table("vasanam_segments").insert(batch).execute()
-        total += len(batch)
-    
-    print(f"  ✅ Indexed {total} segments ({lang})")
-    return {"success": True, "segments": total}
+        print(f"  ⚠️  {movie['title']}: could not parse SRT")
+        return {"success": False, "segments": 0, "error": "could not parse SRT"}
+    
+    print(f"  🔤 {movie['title']}: parsed {len(segments)} dialogue segments")
+    if journal:
+        journal.stage(movie["imdb_id"], "parsed", segments=len(segments))
+    
+    # Detect language — one pass over the whole movie
+    with METRICS.timer("detect_language"):
+        languages = classify_languages([s.text for s in segments], OPENSUBTITLES_ENGLISH_THRESHOLD)
+    lang = languages[0]
+    
+    rows = [{
+        "text": s.text,
+        "start_ms": s.start_ms,
+        "duration_ms": s.duration_ms,
+        "language": language,
+    } for s, language in zip(segments, languages)]
+    if compact:
+        rows = list(compact_cues(rows))
+        print(f"  🧱 {movie['title']}: {len(segments)} cues → {len(rows)} windows")
+    # Transliterated + phonetic search columns, plus each cue joined with the
+    # next for phrases split across subtitles — one batch per movie. The
+    # MinHash signature goes in too, so later ingests can spot copies of it
+    with METRICS.timer("normalize"):
+        rows = [sign_row(row) for row in with_context(normalize_rows(rows))]
+    if dedup:
+        rows = dedup.apply(movie_id, rows)
+    
+    # Full reload (delete + batch insert) or diff against what's already stored
+    write = write or make_segment_writer(supabase)
+    with METRICS.timer("db.write"):
+        written = write(movie_id, rows, incremental=incremental)
+    METRICS.count("segments", len(rows))
+    if embed:
+        # Only rows without a vector: what this write inserted
+        embed_pending(supabase, movie_id)
+    
+    if incremental:
+        print(f"  ✅ {movie['title']}: synced {len(rows)} segments ({lang}) — "
+              f"+{written['inserted']} / -{written['deleted']}, {written['unchanged']} unchanged")
+    else:
+        print(f"  ✅ {movie['title']}: indexed {written['inserted']} segments ({lang})")
+    if journal:
+        journal.done(movie["imdb_id"], inserted=written["inserted"], deleted=written.get("deleted"))
+    return {"success": True, "segments": len(rows)}
 
 def main():
     parser = argparse.ArgumentParser(description="Vasanam subtitle ingestion")
-    parser.add_argument("--username", required=True, help="OpenSubtitles username")
-    parser.add_argument("--password", required=True, help="OpenSubtitles password")
-    parser.add_argument("--api-key", required=True, help="OpenSubtitles API key")
+    parser.add_argument("--username", help="OpenSubtitles username")
+    parser.add_argument("--password", help="OpenSubtitles password")
+    parser.add_argument("--api-key", help="OpenSubtitles API key")
     parser.add_argument("--movie", help="Filter by movie title (partial match)")
+    parser.add_argument("--manifest", help="JSONL/CSV catalogue to ingest instead of the built-in MOVIES list")
+    parser.add_argument("--shard", help="Only ingest shard i of N (0-based, e.g. 0/4), split by a stable hash")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Movies ingested in parallel (default: 4)")
+    parser.add_argument("--rate", type=float, default=OS_RATE,
+                        help=f"Max OpenSubtitles requests/second across all workers (default: {OS_RATE:g})")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only write new/changed segments and delete stale ones (needs migration 003)")
+    parser.add_argument("--writer", choices=["rest", "copy"], default="rest",
+                        help="Segment writer: Supabase REST batches, or Postgres COPY (default: rest)")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"),
+                        help="Direct Postgres connection string for --writer copy (default: $DATABASE_URL)")
+    parser.add_argument("--compact", action="store_true",
+                        help="Merge adjacent cues into speaker-turn windows (needs migration 008)")
+    parser.add_argument("--embed", action="store_true",
+                        help="Compute vectors for the movie's new segments after writing (needs migration 009)")
+    parser.add_argument("--dedup", choices=DEDUP_MODES, default="off",
+                        help="Near-duplicates of other movies' segments: keep, skip, or link them (needs migration 007)")
+    parser.add_argument("--offline", action="store_true",
+                        help="Use cached searches/SRTs only; no OpenSubtitles requests")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Ignore cached searches/SRTs and fetch them again")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the local cache")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help=f"Cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--cache-max-mb", type=int, default=2048,
+                        help="Evict least-recently-used entries above this size (default: 2048)")
+    parser.add_argument("--journal", default=DEFAULT_JOURNAL_PATH,
+                        help=f"Job journal recording each movie's progress (default: {DEFAULT_JOURNAL_PATH})")
+    resume = parser.add_mutually_exclusive_group()
+    resume.add_argument("--resume", action="store_const", const="resume", dest="journal_mode",
+                        help="Skip movies the journal shows as already written")
+    resume.add_argument("--retry-failed", action="store_const", const="retry-failed", dest="journal_mode",
+                        help="Only re-run movies that failed or were interrupted last time")
+    parser.add_argument("--metrics-json", help="Write a JSON run report (per-stage timings, counters) here")
+    parser.add_argument("--metrics-prom", help="Write Prometheus text-format metrics here")
+    parser.add_argument("--profile", action="store_true", help="Run under cProfile and print the top hot spots")
+    parser.add_argument("--search-ttl-hours", type=float, default=SEARCH_TTL / 3600,
+                        help=f"How long cached search results stay fresh (default: {SEARCH_TTL // 3600})")
     args = parser.parse_args()
     
+    try:
+        shard = parse_shard(args.shard) if args.shard else None
+    except ManifestError as e:
+        parser.error(str(e))
+    if args.offline and (args.refresh or args.no_cache):
+        parser.error("--offline reads from the cache; it can't be combined with --refresh/--no-cache")
+    if not args.offline and not (args.username and args.password and args.api_key):
+        parser.error("--username, --password and --api-key are required (or use --offline)")
+    
     if not SUPABASE_URL or not SUPABASE_KEY:
         print("ERROR: Set SUPABASE_URL and SUPABASE_SERVICE_KEY env vars")
         sys.exit(1)
     
+    with profiled(args.profile):
+        run(args, shard)
+    export(args.metrics_json, args.metrics_prom)
+
+
+def run(args, shard: tuple[int, int] | None = None):
     supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-    os_client = OpenSubtitlesClient(args.username, args.password, args.api_key)
+    write = make_segment_writer(supabase, args.writer, args.database_url)
+    dedup = Deduper(supabase, args.dedup) if args.dedup != "off" else None
+    workers = max(args.concurrency, 1)
+    cache = None if args.no_cache else DiskCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024)
+    os_client = OpenSubtitlesClient(args.username, args.password, args.api_key,
+                                    upstream=get_upstream("os", rate=args.rate, concurrency=workers * 2),
+                                    pool_size=max(workers * 2, 4),
+                                    cache=cache, offline=args.offline, refresh=args.refresh,
+                                    search_ttl=args.search_ttl_hours * 3600)
     os_client.login()
     
-    movies = MOVIES
+    # Movies are consumed lazily, so a manifest of any size streams through
+    # the worker window without being loaded up front
+    if args.manifest:
+        movies = load_manifest(args.manifest, require=("title", "year", "imdb_id", "youtube_video_id"), shard=shard)
+    else:
+        movies = (m for m in MOVIES if in_shard(f"yt:{m['youtube_video_id']}", shard))
     if args.movie:
-        movies = [m for m in MOVIES if args.movie.lower() in m["title"].lower()]
-        print(f"Filtered to: {[m['title'] for m in movies]}")
+        movies = (m for m in movies if args.movie.lower() in m["title"].lower())
+    
+    journal = Journal(args.journal, script="opensubtitles")
+    if args.journal_mode:
+        movies = (m for m in movies if journal.should_run(m["imdb_id"], args.journal_mode))
     
     print(f"\n🎬 Vasanam Subtitle Ingestion")
-    print(f"   Movies: {len(movies)}")
+    print(f"   Movies: {args.manifest or 'built-in list'}"
+          + (f" (shard {args.shard})" if args.shard else "")
+          + (f" ({args.journal_mode})" if args.journal_mode else ""))
+    print(f"   Workers: {args.concurrency} ({args.rate:g} req/s)")
+    if dedup:
+        print(f"   Dedup: {args.dedup} near-duplicates of other movies")
     
+    total_queued = 0
     total_movies = 0
     total_segments = 0
     
-    for movie in movies:
-        result = ingest_movie(supabase, os_client, movie)
-        if result["success"]:
+    def record(movie: dict, future: Future):
+        nonlocal total_movies, total_segments
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"  ❌ {movie['title']} failed: {e}")
+            journal.fail(movie["imdb_id"], str(e))
+            METRICS.count("movies.failed")
+            return
+        if not result["success"]:
+            journal.fail(movie["imdb_id"], result.get("error", "failed"))
+            METRICS.count("movies.failed")
+        else:
+            METRICS.count("movies.ok")
             total_movies += 1
             total_segments += result["segments"]
-        time.sleep(1)  # Rate limit
+    
+    # Workers share the client's "os" upstream, so the API quota holds no matter
+    # how many movies are in flight. Searches for queued movies are started as
+    # soon as they enter the window, so their metadata is already arriving while
+    # the workers are still downloading earlier picks.
+    lookahead = workers * 2
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        in_flight: dict[Future, dict] = {}
+        for movie in movies:
+            if len(in_flight) >= lookahead:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record(in_flight.pop(future), future)
+            total_queued += 1
+            journal.begin(movie["imdb_id"])
+            pending_search = os_client.search_async(movie["imdb_id"], ["ta", "en"])
+            future = pool.submit(ingest_movie, supabase, os_client, movie, pending_search,
+                                 incremental=args.incremental, write=write, journal=journal, dedup=dedup,
+                                 compact=args.compact, embed=args.embed)
+            in_flight[future] = movie
+        for future in as_completed(in_flight):
+            record(in_flight[future], future)
+    os_client.close()
     
     print(f"\n{'='*50}")
-    print(f"✅ Done! {total_movies}/{len(movies)} movies, {total_segments:,} segments total")
+    print(f"✅ Done! {total_movies}/{total_queued} movies, {total_segments:,} segments total")
+    failed = journal.summary().get("failed", 0)
+    if failed:
+        print(f"   {failed} failed — re-run with --retry-failed")
+    journal.close()
 
 if __name__ == "__main__":
     main()
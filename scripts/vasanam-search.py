@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Vasanam — search from the command line, and benchmark search backends
+Runs queries against a local Postgres (any of the search RPCs from
+supabase/migrations) or a prebuilt index file (build-search-index.py), so
+ranking and latency can be checked before a change reaches the Next.js route.
+
+  query   print ranked results for one query
+  bench   replay a query log at a given concurrency; report p50/p95/p99
+          latency and throughput per backend and, with both backends,
+          recall@k of the index against Postgres (Postgres is the reference)
+
+A query log is one query per line, or JSONL with a "query" field; blank
+lines and lines starting with # are skipped. Without one, the queries from
+src/components/TrendingSearches.tsx are used.
+
+Usage:
+  python3 scripts/vasanam-search.py query "en vazhi thani vazhi" --index vasanam-search.vsix
+  python3 scripts/vasanam-search.py query "naan oru thadava" --database-url $DATABASE_URL --function search_dialogues
+  python3 scripts/vasanam-search.py bench --index vasanam-search.vsix --database-url $DATABASE_URL \\
+      --log queries.txt --concurrency 8 --repeat 5 --k 10 --json bench.json
+
+Requirements:
+  pip install "psycopg[binary]"     (only for --database-url)
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from vasanam.embed import embed_text, to_literal
+from vasanam.normalize import phonetic_key, transliterate
+from vasanam.searchindex import SearchIndex
+
+# Same list as src/components/TrendingSearches.tsx
+DEFAULT_QUERIES = [
+    "en vazhi thani vazhi", "naane varuvein", "rajini attitude dialogue", "vikram climax dialogue",
+    "kamal haasan speech", "vadivelu comedy", "master dialogue", "vijay speech", "ajith dialogue",
+    "mersal climax",
+]
+FUNCTIONS = ("search_dialogues", "search_dialogues_phrase", "search_dialogues_fuzzy", "search_dialogues_hybrid")
+COLUMNS = "segment_id, movie_id, text, start_ms, duration_ms, language, movie_title, movie_year, rank"
+
+
+class PostgresBackend:
+    name = "postgres"
+
+    def __init__(self, database_url: str, function: str = "search_dialogues"):
+        try:
+            import psycopg
+            from psycopg.rows import dict_row
+        except ImportError:
+            raise SystemExit('❌ --database-url needs psycopg 3: pip install "psycopg[binary]"')
+        self.connect = lambda: psycopg.connect(database_url, autocommit=True, row_factory=dict_row)
+        self.function = function
+        self.local = threading.local()  # one connection per bench thread
+        self.connections = []
+        self.lock = threading.Lock()
+
+    def search(self, query: str, limit: int = 20) -> list[dict]:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self.local.conn = self.connect()
+            with self.lock:
+                self.connections.append(conn)
+        latin = transliterate(query)
+        key = phonetic_key(latin)
+        if self.function == "search_dialogues_hybrid":
+            vec = embed_text(key)
+            return conn.execute(f"SELECT {COLUMNS} FROM {self.function}(%s, %s, 0, %s, %s, %s)",
+                                (query, limit, latin, key, to_literal(vec) if vec else None)).fetchall()
+        return conn.execute(f"SELECT {COLUMNS} FROM {self.function}(%s, %s, 0, %s, %s)",
+                            (query, limit, latin, key)).fetchall()
+
+    def close(self):
+        for conn in self.connections:
+            conn.close()
+
+
+class IndexBackend:
+    name = "index"
+
+    def __init__(self, path: str):
+        self.index = SearchIndex(path)
+
+    def search(self, query: str, limit: int = 20) -> list[dict]:
+        return self.index.search(query, limit=limit)
+
+    def close(self):
+        self.index.close()
+
+
+def load_queries(path: str | None) -> list[str]:
+    if not path:
+        return list(DEFAULT_QUERIES)
+    queries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            queries.append(str(json.loads(line)["query"]) if line.startswith("{") else line)
+    return queries
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+
+
+def replay(backend, queries: list[str], concurrency: int, k: int) -> tuple[dict, dict[str, list[str]]]:
+    """Run every query; returns (latency/throughput stats, query → top-k segment ids)"""
+    def one(query: str) -> tuple[str, float, list[str]]:
+        start = time.perf_counter()
+        results = backend.search(query, limit=k)
+        return query, time.perf_counter() - start, [str(r["segment_id"]) for r in results]
+
+    # One untimed pass per distinct query, so connection setup and the index's
+    # first page faults don't land in the percentiles
+    for query in dict.fromkeys(queries):
+        backend.search(query, limit=k)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as pool:
+        runs = list(pool.map(one, queries))
+    elapsed = time.perf_counter() - start
+    latencies = [t for _, t, _ in runs]
+    stats = {"backend": backend.name, "queries": len(runs), "concurrency": concurrency,
+             "qps": round(len(runs) / elapsed, 1) if elapsed else 0.0,
+             "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+             "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+             "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+             "empty": sum(1 for _, _, ids in runs if not ids)}
+    return stats, {q: ids for q, _, ids in runs}
+
+
+def recall_at_k(reference: dict[str, list[str]], candidate: dict[str, list[str]], k: int) -> float:
+    """Mean share of the reference's top k that the candidate's top k also holds"""
+    scores = [len(set(ids[:k]) & set(candidate.get(q, [])[:k])) / len(ids[:k])
+              for q, ids in reference.items() if ids]
+    return sum(scores) / len(scores) if scores else 0.0
+
+
+def backends(args) -> list:
+    found = []
+    if args.database_url:
+        found.append(PostgresBackend(args.database_url, args.function))
+    if args.index:
+        found.append(IndexBackend(args.index))
+    if not found:
+        print("ERROR: Pass --index FILE and/or --database-url (or set DATABASE_URL)")
+        sys.exit(1)
+    return found
+
+
+def cmd_query(args):
+    for backend in backends(args):
+        start = time.perf_counter()
+        results = backend.search(args.text, limit=args.limit)
+        print(f"\n🔎 {backend.name}: {len(results)} results in {(time.perf_counter() - start) * 1000:.2f} ms")
+        for r in results:
+            print(f"   {r['rank']:.3f}  {r['movie_title']} ({r['movie_year']}) "
+                  f"@{r['start_ms'] // 1000}s  {r['text'][:70]}")
+        backend.close()
+
+
+def cmd_bench(args):
+    queries = load_queries(args.log) * max(args.repeat, 1)
+    print(f"\n⏱️  {len(queries):,} queries ({args.log or 'trending list'}), "
+          f"concurrency {args.concurrency}, k={args.k}\n")
+    print(f"   {'backend':<10}{'qps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'empty':>7}")
+    report, top = {"runs": []}, {}
+    for backend in backends(args):
+        stats, top[backend.name] = replay(backend, queries, args.concurrency, args.k)
+        backend.close()
+        report["runs"].append(stats)
+        print(f"   {backend.name:<10}{stats['qps']:>9.1f}{stats['p50_ms']:>10.2f}"
+              f"{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}{stats['empty']:>7}")
+    if len(top) == 2:
+        report["recall_at_k"] = round(recall_at_k(top["postgres"], top["index"], args.k), 3)
+        print(f"\n   recall@{args.k} of the index against {args.function}: {report['recall_at_k']:.1%}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({**report, "k": args.k, "function": args.function}, f, indent=2)
+        print(f"\n📄 Results written to {args.json}")
+
+
+def main():
+    # Backend options go on every subcommand, so they can follow it
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--index", help="Prebuilt index file (scripts/build-search-index.py)")
+    common.add_argument("--database-url", default=os.environ.get("DATABASE_URL"),
+                        help="Postgres with the Vasanam schema (default: $DATABASE_URL)")
+    common.add_argument("--function", choices=FUNCTIONS, default="search_dialogues",
+                        help="Search RPC to call on Postgres (default: search_dialogues)")
+    parser = argparse.ArgumentParser(description="Query and benchmark Vasanam search backends")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    query = commands.add_parser("query", parents=[common], help="Print ranked results for one query")
+    query.add_argument("text", help="The search query")
+    query.add_argument("--limit", type=int, default=10, help="Results to show (default: 10)")
+    query.set_defaults(run=cmd_query)
+
+    bench = commands.add_parser("bench", parents=[common], help="Replay a query log and compare backends")
+    bench.add_argument("--log", help="Query log: one query per line, or JSONL with a \"query\" field")
+    bench.add_argument("--concurrency", type=int, default=4, help="Queries in flight (default: 4)")
+    bench.add_argument("--repeat", type=int, default=1, help="Replay the log this many times (default: 1)")
+    bench.add_argument("--k", type=int, default=10, help="Results per query, and k for recall@k (default: 10)")
+    bench.add_argument("--json", help="Also write the results as JSON here")
+    bench.set_defaults(run=cmd_bench)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
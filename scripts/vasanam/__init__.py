@@ -0,0 +1,6 @@
+"""
+Vasanam — shared helpers for the Python ingestion scripts.
+
+The scripts in scripts/ are run directly (python3 scripts/ingest-*.py), which
+puts this directory on sys.path, so modules here import as `vasanam.<module>`.
+"""
@@ -0,0 +1,132 @@
+"""
+Content-addressed on-disk cache for ingestion inputs.
+
+Blobs are stored once under blobs/<sha256[:2]>/<sha256>, and a small SQLite
+index maps cache keys (e.g. "search:tt0115147:ta", "srt:1234567") to blob
+digests. Entries carry their own TTL; the whole store is trimmed LRU-first
+when it grows past max_bytes, tracked as a running total so a put doesn't
+have to scan the index.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = os.environ.get("VASANAM_CACHE_DIR") or str(Path.home() / ".cache" / "vasanam")
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3  # 2 GB
+
+
+class DiskCache:
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.blobs = self.root / "blobs"
+        self.blobs.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.root / "index.sqlite", check_same_thread=False)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key      TEXT PRIMARY KEY,
+                digest   TEXT NOT NULL,
+                size     INTEGER NOT NULL,
+                expires  REAL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_entries_digest ON entries(digest)")
+        self.db.commit()
+        self.total = self._stored_bytes()  # kept current by put/_drop_orphan, so put needn't sum the table
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blobs / digest[:2] / digest
+
+    def get(self, key: str) -> bytes | None:
+        """Return the cached bytes for `key`, or None if missing or expired"""
+        with self.lock:
+            row = self.db.execute("SELECT digest, expires FROM entries WHERE key = ?", (key,)).fetchone()
+            if not row:
+                return None
+            digest, expires = row
+            if expires is not None and expires < time.time():
+                self._delete(key)
+                return None
+            try:
+                data = self._blob_path(digest).read_bytes()
+            except FileNotFoundError:
+                self._delete(key)
+                return None
+            self.db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+            self.db.commit()
+            return data
+
+    def put(self, key: str, data: bytes, ttl: float | None = None):
+        """Store `data` under `key`; identical content is only written once"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        now = time.time()
+        with self.lock:
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(f".{os.getpid()}.tmp")
+                tmp.write_bytes(data)
+                os.replace(tmp, path)
+            old = self.db.execute("SELECT digest, size FROM entries WHERE key = ?", (key,)).fetchone()
+            if not self.db.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone():
+                self.total += len(data)
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries (key, digest, size, expires, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, digest, len(data), now + ttl if ttl else None, now),
+            )
+            if old and old[0] != digest:
+                self._drop_orphan(*old)
+            self.db.commit()
+            self._evict()
+
+    def get_json(self, key: str):
+        data = self.get(key)
+        return json.loads(data) if data is not None else None
+
+    def put_json(self, key: str, value, ttl: float | None = None):
+        self.put(key, json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), ttl)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    # Callers below hold self.lock
+
+    def _delete(self, key: str):
+        row = self.db.execute("SELECT digest, size FROM entries WHERE key = ?", (key,)).fetchone()
+        self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+        if row:
+            self._drop_orphan(*row)
+        self.db.commit()
+
+    def _drop_orphan(self, digest: str, size: int):
+        if not self.db.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone():
+            self._blob_path(digest).unlink(missing_ok=True)
+            self.total -= size
+
+    def _stored_bytes(self) -> int:
+        # Blobs are shared between keys, so size is counted per distinct digest
+        return self.db.execute("SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM entries)").fetchone()[0]
+
+    def _evict(self):
+        """Once over max_bytes, drop expired entries, then least-recently-used blobs until under it"""
+        if self.total <= self.max_bytes:
+            return
+        # Another process sharing the directory may have added or removed entries
+        self.total = self._stored_bytes()
+        if self.total <= self.max_bytes:
+            return
+        now = time.time()
+        for (key,) in self.db.execute("SELECT key FROM entries WHERE expires IS NOT NULL AND expires < ?", (now,)).fetchall():
+            self._delete(key)
+        for (key,) in self.db.execute("SELECT key FROM entries ORDER BY accessed ASC").fetchall():
+            if self.total <= self.max_bytes:
+                break
+            self._delete(key)
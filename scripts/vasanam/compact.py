@@ -0,0 +1,72 @@
+"""
+Merge adjacent cues into speaker-turn windows before they are stored.
+
+Subtitle files split dialogue into cues of a line or two, and Gemini returns
+one row per phrase, so a movie is thousands of tiny segments and a sentence
+spoken across three cues lives in three rows. compact_cues() joins a run of
+cues into one segment while they follow each other closely, stopping at:
+
+  - a gap longer than max_gap_ms between one cue's end and the next's start
+  - a window longer than max_ms, or text longer than max_chars
+  - a speaker change: a cue starting with "-" (the SRT dual-speaker dash)
+  - a language change
+
+Each window keeps where its cues began — cue_offsets (ms from the window's
+start) and cue_chars (index into the window's text), both NULL for a
+single-cue window — so the scene page can still seek to the cue that matched
+(cueStartMs() in src/lib/search.ts). Windows are ordinary rows: hashing,
+normalization, context and dedup all work on them unchanged.
+
+Works on lists or streams; a window is yielded as soon as the cue after it
+closes it.
+"""
+
+from typing import Iterable, Iterator
+
+MAX_GAP_MS = 1000
+MAX_WINDOW_MS = 12_000
+MAX_WINDOW_CHARS = 240
+TURN_MARKS = ("-", "–", "—")
+
+
+def _window(cues: list[dict]) -> dict:
+    first = cues[0]
+    end = max(c["start_ms"] + c["duration_ms"] for c in cues)
+    texts = [c["text"] for c in cues]
+    row = {**first, "text": " ".join(texts), "duration_ms": end - first["start_ms"],
+           "cue_offsets": None, "cue_chars": None}
+    if len(cues) > 1:
+        chars, pos = [], 0
+        for text in texts:
+            chars.append(pos)
+            pos += len(text) + 1
+        row["cue_offsets"] = [c["start_ms"] - first["start_ms"] for c in cues]
+        row["cue_chars"] = chars
+    return row
+
+
+def compact_cues(rows: Iterable[dict], max_gap_ms: int = MAX_GAP_MS, max_ms: int = MAX_WINDOW_MS,
+                 max_chars: int = MAX_WINDOW_CHARS) -> Iterator[dict]:
+    """Yield windows of consecutive {text, start_ms, duration_ms, language} rows"""
+    cues: list[dict] = []
+    end = chars = 0
+    for row in rows:
+        if cues and (
+            row["start_ms"] - end > max_gap_ms
+            or row["start_ms"] < cues[-1]["start_ms"]  # out of order: keep offsets non-negative
+            or row["start_ms"] + row["duration_ms"] - cues[0]["start_ms"] > max_ms
+            or chars + 1 + len(row["text"]) > max_chars
+            or row["text"].startswith(TURN_MARKS)
+            or row.get("language") != cues[0].get("language")
+        ):
+            yield _window(cues)
+            cues = []
+        if not cues:
+            end = chars = 0
+        else:
+            chars += 1
+        cues.append(row)
+        end = max(end, row["start_ms"] + row["duration_ms"])
+        chars += len(row["text"])
+    if cues:
+        yield _window(cues)
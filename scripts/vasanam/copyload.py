@@ -0,0 +1,179 @@
+"""
+Bulk segment loader using Postgres COPY over a direct connection.
+
+An alternative to the PostgREST JSON batches in segments.py for large
+backfills. Rows are streamed with binary COPY FROM STDIN; search_vector and
+content_hash are generated columns, so Postgres computes them server-side.
+Each movie is written in one transaction, so search never sees it half-loaded
+— and a transaction cut off by a dropped connection or serialization failure
+rolls back, so it is simply retried on a fresh connection (retry.py "db").
+
+Batch size adapts: after each COPY the writer doubles or halves its batch
+size to keep one batch near target_seconds.
+
+Requires psycopg 3:  pip install "psycopg[binary]"
+Connection string: the Supabase "direct connection" URI (Settings → Database),
+passed as --database-url or DATABASE_URL.
+"""
+
+import threading
+import time
+from typing import Iterable
+
+from vasanam.metrics import METRICS
+from vasanam.retry import get_upstream
+
+SEGMENT_COLUMNS = ("movie_id", "text", "start_ms", "duration_ms", "language",
+                   "text_latin", "phonetic_key", "context_latin", "context_key",
+                   "minhash", "lsh_bands", "duplicate_of", "cue_offsets", "cue_chars")
+SEGMENT_TYPES = ("uuid", "text", "int4", "int4", "text", "text", "text", "text", "text",
+                 "int4[]", "int8[]", "uuid", "int4[]", "int4[]")
+
+
+class CopyWriter:
+    def __init__(self, database_url: str, target_seconds: float = 0.5,
+                 min_batch: int = 500, max_batch: int = 50_000):
+        try:
+            import psycopg
+        except ImportError:
+            raise SystemExit('❌ The COPY writer needs psycopg 3: pip install "psycopg[binary]"')
+        if not database_url:
+            raise SystemExit("❌ The COPY writer needs --database-url or DATABASE_URL")
+        self.psycopg = psycopg
+        self.database_url = database_url
+        self.target_seconds = target_seconds
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.batch_size = min_batch
+        self.lock = threading.Lock()
+        self.local = threading.local()  # one connection per worker thread
+        self.connections = []
+
+    def _connection(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None or conn.closed:
+            conn = self.psycopg.connect(self.database_url)
+            self.local.conn = conn
+            with self.lock:
+                self.connections.append(conn)
+        return conn
+
+    def _adapt(self, rows: int, elapsed: float):
+        """Grow or shrink the shared batch size toward target_seconds per COPY"""
+        with self.lock:
+            if elapsed < self.target_seconds / 2 and rows >= self.batch_size:
+                self.batch_size = min(self.batch_size * 2, self.max_batch)
+            elif elapsed > self.target_seconds * 2:
+                self.batch_size = max(self.batch_size // 2, self.min_batch)
+
+    def _copy(self, cur, table: str, movie_id: str, rows: list[dict]) -> int:
+        columns = ", ".join(SEGMENT_COLUMNS)
+        written = 0
+        while written < len(rows):
+            batch = rows[written:written + self.batch_size]
+            start = time.perf_counter()
+            with cur.copy(f"COPY {table} ({columns}) FROM STDIN (FORMAT BINARY)") as copy:
+                copy.set_types(SEGMENT_TYPES)
+                for row in batch:
+                    copy.write_row((movie_id, row["text"], row["start_ms"], row["duration_ms"], row.get("language"),
+                                    row.get("text_latin"), row.get("phonetic_key"),
+                                    row.get("context_latin"), row.get("context_key"),
+                                    row.get("minhash"), row.get("lsh_bands"), row.get("duplicate_of"),
+                                    row.get("cue_offsets"), row.get("cue_chars")))
+            elapsed = time.perf_counter() - start
+            METRICS.observe("db.copy", elapsed)
+            self._adapt(len(batch), elapsed)
+            written += len(batch)
+        return written
+
+    def write_segments(self, movie_id: str, rows: Iterable[dict], incremental: bool = False) -> dict:
+        """Same contract as segments.write_segments(), over COPY"""
+        rows = list(rows)  # COPY applies a movie in one transaction, so streams are collected first
+        if not rows:
+            return {"inserted": 0, "deleted": 0, "unchanged": 0}
+        return get_upstream("db").call(self._write, movie_id, rows, incremental)
+
+    def _write(self, movie_id: str, rows: list[dict], incremental: bool) -> dict:
+        conn = self._connection()
+        with conn.transaction(), conn.cursor() as cur:
+            if not incremental:
+                cur.execute("DELETE FROM vasanam_segments WHERE movie_id = %s", (movie_id,))
+                deleted = cur.rowcount
+                inserted = self._copy(cur, "vasanam_segments", movie_id, rows)
+                METRICS.count("db.rows_inserted", inserted)
+                METRICS.count("db.rows_deleted", deleted)
+                return {"inserted": inserted, "deleted": deleted, "unchanged": 0}
+
+            # Stage the new version, then apply only the difference
+            cur.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS vasanam_segments_stage (
+                  movie_id UUID, text TEXT, start_ms INT, duration_ms INT, language TEXT,
+                  text_latin TEXT, phonetic_key TEXT, context_latin TEXT, context_key TEXT,
+                  minhash INT[], lsh_bands BIGINT[], duplicate_of UUID, cue_offsets INT[], cue_chars INT[]
+                ) ON COMMIT DELETE ROWS
+            """)
+            self._copy(cur, "vasanam_segments_stage", movie_id, rows)
+            cur.execute("""
+                DELETE FROM vasanam_segments s
+                WHERE s.movie_id = %s
+                  AND NOT EXISTS (
+                    SELECT 1 FROM vasanam_segments_stage n
+                    WHERE md5(n.start_ms::text || '|' || n.text) = s.content_hash
+                  )
+            """, (movie_id,))
+            deleted = cur.rowcount
+            # Keep one row per hash, the lowest id as the REST path does; earlier
+            # full reloads may have left duplicates
+            cur.execute("""
+                DELETE FROM vasanam_segments s
+                USING (
+                  SELECT id, ROW_NUMBER() OVER (PARTITION BY content_hash ORDER BY id) AS n
+                  FROM vasanam_segments
+                  WHERE movie_id = %s
+                ) d
+                WHERE s.id = d.id AND d.n > 1
+            """, (movie_id,))
+            deleted += cur.rowcount
+            # Unchanged rows whose search columns are missing (pre-004/006/007) or whose
+            # context changed with the cue after them (see segments.norm_updates)
+            cur.execute("""
+                UPDATE vasanam_segments s
+                SET text_latin = n.text_latin, phonetic_key = n.phonetic_key,
+                    context_latin = n.context_latin, context_key = n.context_key,
+                    minhash = n.minhash, lsh_bands = n.lsh_bands
+                FROM vasanam_segments_stage n
+                WHERE s.movie_id = %s
+                  AND n.phonetic_key IS NOT NULL
+                  AND s.content_hash = md5(n.start_ms::text || '|' || n.text)
+                  AND (s.text_latin, s.phonetic_key, s.context_latin, s.context_key, s.minhash, s.lsh_bands)
+                      IS DISTINCT FROM (n.text_latin, n.phonetic_key, n.context_latin, n.context_key,
+                                        n.minhash, n.lsh_bands)
+            """, (movie_id,))
+            METRICS.count("db.rows_normalized", cur.rowcount)
+            cur.execute("""
+                INSERT INTO vasanam_segments (movie_id, text, start_ms, duration_ms, language,
+                                              text_latin, phonetic_key, context_latin, context_key,
+                                              minhash, lsh_bands, duplicate_of, cue_offsets, cue_chars)
+                SELECT DISTINCT ON (md5(n.start_ms::text || '|' || n.text))
+                       n.movie_id, n.text, n.start_ms, n.duration_ms, n.language,
+                       n.text_latin, n.phonetic_key, n.context_latin, n.context_key,
+                       n.minhash, n.lsh_bands, n.duplicate_of, n.cue_offsets, n.cue_chars
+                FROM vasanam_segments_stage n
+                WHERE NOT EXISTS (
+                  SELECT 1 FROM vasanam_segments s
+                  WHERE s.movie_id = n.movie_id
+                    AND s.content_hash = md5(n.start_ms::text || '|' || n.text)
+                )
+            """)
+            inserted = cur.rowcount
+            cur.execute("SELECT count(DISTINCT md5(start_ms::text || '|' || text)) FROM vasanam_segments_stage")
+            unchanged = cur.fetchone()[0] - inserted
+            METRICS.count("db.rows_inserted", inserted)
+            METRICS.count("db.rows_deleted", deleted)
+            return {"inserted": inserted, "deleted": deleted, "unchanged": unchanged}
+
+    def close(self):
+        with self.lock:
+            for conn in self.connections:
+                conn.close()
+            self.connections.clear()
@@ -0,0 +1,172 @@
+"""
+Cross-source near-duplicate detection for segments.
+
+The same film can arrive from OpenSubtitles, Gemini and the transcript
+importer under different youtube_video_ids — a full movie and a trailer
+clip cut from it, say — which puts identical lines in the index twice.
+
+Every segment gets a MinHash signature over character 3-grams of its
+phonetic_key (so Tamil script and Tanglish versions of a line agree), stored
+with its LSH band keys in vasanam_segments (migration 007). Looking up a
+movie is then a few RPCs: rows of other movies sharing a band key, found
+through a GIN index on lsh_bands — the work grows with the number of candidates, not
+with the size of the corpus.
+
+A candidate only counts when the similarity estimate clears SIMILARITY *and*
+at least MIN_RUN matches against the same other movie sit at a consistent
+time offset. Stock lines ("enna da", "vaa") recur in every film; a trailer
+cut from a film repeats a whole run of them at one fixed offset.
+
+  skip  drop duplicates before they are written
+  link  write them with duplicate_of set; search hides linked rows
+"""
+
+import zlib
+from collections import Counter
+from typing import Iterable, Iterator
+
+from vasanam.metrics import METRICS
+from vasanam.segments import PAGE_SIZE, execute
+
+NUM_PERM = 32
+BANDS, ROWS = 8, 4          # P(candidate) ≈ 1 - (1 - J^4)^8: 0.5 at J≈0.6, 0.98 at J=0.8
+SHINGLE = 3
+MIN_SHINGLES = 6            # lines shorter than this are too generic to call duplicates
+SIMILARITY = 0.75           # estimated Jaccard needed for a match
+MIN_RUN = 3                 # matches needed against one movie at one offset
+OFFSET_BUCKET_MS = 3000
+LOOKUP_BATCH = 400          # rows per apply() when filtering a stream
+KEY_BATCH = 1000            # band keys per candidate RPC
+MODES = ("off", "skip", "link")
+
+_PRIME = (1 << 31) - 1      # signatures fit Postgres INT
+_MASK64 = (1 << 64) - 1
+_COEFFS = [(1 + (0x9E3779B1 * (i + 1)) % (_PRIME - 1), (0x85EBCA77 * (i + 7)) % _PRIME)
+           for i in range(NUM_PERM)]
+
+
+def minhash(key: str | None) -> list[int] | None:
+    """MinHash signature of a phonetic key, or None if it is too short to judge"""
+    if not key:
+        return None
+    text = key.replace(" ", "_")
+    grams = {zlib.crc32(text[i:i + SHINGLE].encode()) for i in range(len(text) - SHINGLE + 1)}
+    if len(grams) < MIN_SHINGLES:
+        return None
+    return [min((a * x + b) % _PRIME for x in grams) for a, b in _COEFFS]
+
+
+def band_keys(signature: list[int]) -> list[int]:
+    """One signed 64-bit key per LSH band (the band index is mixed in)"""
+    keys = []
+    for band in range(BANDS):
+        h = band + 1
+        for value in signature[band * ROWS:(band + 1) * ROWS]:
+            h = ((h * 0x100000001B3) ^ value) & _MASK64
+        keys.append(h - (1 << 64) if h >= 1 << 63 else h)
+    return keys
+
+
+def similarity(a: list[int], b: list[int]) -> float:
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def sign_row(row: dict) -> dict:
+    """Add minhash and lsh_bands to a normalized row, in place"""
+    signature = minhash(row.get("phonetic_key"))
+    row["minhash"] = signature
+    row["lsh_bands"] = band_keys(signature) if signature else None
+    return row
+
+
+class Deduper:
+    def __init__(self, supabase, mode: str = "skip"):
+        if mode not in MODES:
+            raise ValueError(f"unknown dedup mode: {mode}")
+        self.supabase = supabase
+        self.mode = mode
+
+    def candidates(self, movie_id: str, keys: list[int]) -> Iterator[dict]:
+        """Other movies' segments sharing any of `keys`, each once
+
+        Keys go KEY_BATCH to a request and each result is paged, so neither
+        the request body nor PostgREST's max-rows cap truncates the lookup.
+        """
+        seen = set()
+        for i in range(0, len(keys), KEY_BATCH):
+            offset = 0
+            while True:
+                page = execute(self.supabase.rpc("find_segment_candidates", {
+                    "p_movie_id": movie_id, "p_bands": keys[i:i + KEY_BATCH],
+                }).range(offset, offset + PAGE_SIZE - 1)).data or []
+                for cand in page:
+                    if cand["id"] not in seen:
+                        seen.add(cand["id"])
+                        yield cand
+                if len(page) < PAGE_SIZE:
+                    break
+                offset += PAGE_SIZE
+
+    def find(self, movie_id: str, rows: list[dict]) -> dict[int, dict]:
+        """Map row index → the other movie's segment it duplicates"""
+        keys = sorted({k for row in rows for k in (row.get("lsh_bands") or ())})
+        if self.mode == "off" or not keys:
+            return {}
+        with METRICS.timer("dedup.lookup"):
+            candidates = list(self.candidates(movie_id, keys))
+        by_band: dict[int, list[dict]] = {}
+        for cand in candidates:
+            for k in cand["lsh_bands"]:
+                by_band.setdefault(k, []).append(cand)
+
+        matches: dict[int, dict] = {}
+        for i, row in enumerate(rows):
+            if not row.get("minhash"):
+                continue
+            best, best_sim = None, SIMILARITY
+            seen = set()
+            for k in row["lsh_bands"]:
+                for cand in by_band.get(k, ()):
+                    if cand["id"] in seen:
+                        continue
+                    seen.add(cand["id"])
+                    sim = similarity(row["minhash"], cand["minhash"])
+                    if sim >= best_sim:
+                        best, best_sim = cand, sim
+            if best is not None:
+                matches[i] = best
+
+        # Keep only runs of matches at one consistent offset into one movie
+        def run_key(i: int) -> tuple[str, int]:
+            return matches[i]["movie_id"], round((matches[i]["start_ms"] - rows[i]["start_ms"]) / OFFSET_BUCKET_MS)
+        runs = Counter(run_key(i) for i in matches)
+        confirmed = {i: m for i, m in matches.items() if runs[run_key(i)] >= MIN_RUN}
+        METRICS.count("dedup.candidates", len(candidates))
+        METRICS.count("dedup.duplicates", len(confirmed))
+        return confirmed
+
+    def apply(self, movie_id: str, rows: list[dict]) -> list[dict]:
+        """Drop (skip) or mark (link) the duplicates among `rows`"""
+        duplicates = self.find(movie_id, rows)
+        if not duplicates:
+            return rows
+        sources = Counter(d["movie_id"] for d in duplicates.values())
+        other, shared = sources.most_common(1)[0]
+        print(f"  🪞 {len(duplicates)}/{len(rows)} segments duplicate other movies "
+              f"({shared} from {other}) — {'skipped' if self.mode == 'skip' else 'linked'}")
+        if self.mode == "skip":
+            return [row for i, row in enumerate(rows) if i not in duplicates]
+        for i, dup in duplicates.items():
+            rows[i]["duplicate_of"] = dup["id"]
+        return rows
+
+    def filter(self, movie_id: str, rows: Iterable[dict]) -> Iterator[dict]:
+        """apply() over a stream, LOOKUP_BATCH rows at a time"""
+        batch: list[dict] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= LOOKUP_BATCH:
+                yield from self.apply(movie_id, batch)
+                batch = []
+        if batch:
+            yield from self.apply(movie_id, batch)
@@ -0,0 +1,116 @@
+"""
+CPU-only dense vectors for segments, stored in pgvector (migration 009).
+
+A segment's vector is built from its phonetic_key (normalize.py), so Tamil
+script and every Tanglish spelling of a line land in the same place: each
+word and its character 2-, 3- and 4-grams are feature-hashed (crc32, signed)
+into DIM buckets, weighted by sqrt term frequency, and L2-normalized. Lines
+that share most of their words and word-pieces end up close even when no
+whole word matches exactly ("thadava sonna" vs "thadavai sonnal"), which
+the simple tsvector misses. It needs no model download and no GPU; a small
+local sentence model could replace embed_text() as long as DIM matches the
+column.
+
+Queries go through the same embed_text() (search_dialogues_hybrid() takes
+the vector as query_embedding); NULL the column, so everything re-embeds,
+when the features or DIM change.
+
+Embedding is incremental: only rows whose embedding is NULL — new or
+changed segments, since a changed line is a new row — are fetched, through
+pending_segment_embeddings(), and written back with fill_segment_embeddings().
+Rows with an empty phonetic_key have no words to embed and are never fetched.
+"""
+
+import math
+import zlib
+from concurrent.futures import Executor
+from typing import Iterable
+
+from vasanam.metrics import METRICS
+from vasanam.normalize import phonetic_key, transliterate
+from vasanam.segments import PAGE_SIZE, execute
+
+DIM = 256
+NGRAMS = (2, 3, 4)
+WORD_WEIGHT, GRAM_WEIGHT = 1.0, 0.5
+BATCH_SIZE = 500        # rows per pending fetch / fill RPC, at most PAGE_SIZE
+
+
+def features(key: str) -> dict[str, float]:
+    weights: dict[str, float] = {}
+    for word in key.split():
+        weights["w:" + word] = weights.get("w:" + word, 0.0) + WORD_WEIGHT
+        padded = f"<{word}>"
+        for n in NGRAMS:
+            for i in range(len(padded) - n + 1):
+                gram = padded[i:i + n]
+                weights[gram] = weights.get(gram, 0.0) + GRAM_WEIGHT
+    return weights
+
+
+def embed_text(key: str) -> list[float] | None:
+    """Unit vector for a phonetic key, or None if it has no words"""
+    vec = [0.0] * DIM
+    for feature, weight in features(key).items():
+        h = zlib.crc32(feature.encode())
+        vec[h % DIM] += math.sqrt(weight) if h & 0x80000000 else -math.sqrt(weight)
+    norm = math.sqrt(sum(v * v for v in vec))
+    if not norm:
+        return None
+    return [v / norm for v in vec]
+
+
+def to_literal(vec: list[float]) -> str:
+    """pgvector text form"""
+    return "[" + ",".join(f"{v:.4f}" for v in vec) + "]"
+
+
+def embed_batch(rows: list[dict]) -> list[dict]:
+    """[{id, text, phonetic_key}] → [{id, embedding}]; top-level so a process pool can run it"""
+    out = []
+    for row in rows:
+        key = row.get("phonetic_key")
+        if key is None:
+            key = phonetic_key(transliterate(row["text"]))
+        vec = embed_text(key)
+        if vec is not None:
+            out.append({"id": row["id"], "embedding": to_literal(vec)})
+    return out
+
+
+def _chunks(rows: list[dict], n: int) -> Iterable[list[dict]]:
+    size = max(len(rows) // max(n, 1), 1)
+    return (rows[i:i + size] for i in range(0, len(rows), size))
+
+
+def embed_pending(supabase, movie_id: str | None = None, pool: Executor | None = None,
+                  workers: int = 1, limit: int | None = None, batch_size: int = BATCH_SIZE,
+                  progress=None) -> int:
+    """Embed segments that have no vector yet (one movie, or all); returns rows written"""
+    batch_size = min(batch_size, PAGE_SIZE)  # a short page must mean the end, not the max-rows cap
+    after, written, seen = None, 0, 0
+    while limit is None or seen < limit:
+        with METRICS.timer("db.fetch_pending"):
+            rows = execute(supabase.rpc("pending_segment_embeddings", {
+                "p_after": after, "p_limit": batch_size if limit is None else min(batch_size, limit - seen),
+                "p_movie_id": movie_id,
+            })).data or []
+        if not rows:
+            break
+        seen += len(rows)
+        after = rows[-1]["id"]
+        with METRICS.timer("embed"):
+            if pool is not None:
+                updates = [u for part in pool.map(embed_batch, _chunks(rows, workers)) for u in part]
+            else:
+                updates = embed_batch(rows)
+        if updates:
+            with METRICS.timer("db.fill_embeddings"):
+                execute(supabase.rpc("fill_segment_embeddings", {"p_rows": updates}))
+            written += len(updates)
+            METRICS.count("db.rows_embedded", len(updates))
+        if progress:
+            progress(seen, written)
+        if len(rows) < batch_size:
+            break
+    return written
@@ -0,0 +1,129 @@
+"""
+SQLite job journal for restartable batch runs.
+
+Each script records one row per job (a movie or URL) with the last stage it
+reached — e.g. downloaded → transcribed/parsed → written — and that stage's
+outputs. A crashed or interrupted run can then be resumed without redoing
+finished work:
+
+  resume        skip jobs already written; run everything else
+  retry-failed  run only jobs that failed (or were cut off mid-run)
+
+Jobs from different scripts share one file, keyed by (script, key).
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from vasanam.cache import DEFAULT_CACHE_DIR
+
+DEFAULT_JOURNAL_PATH = str(Path(DEFAULT_CACHE_DIR) / "journal.sqlite")
+
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Journal:
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH, script: str = "ingest"):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.script = script
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                script   TEXT NOT NULL,
+                key      TEXT NOT NULL,
+                stage    TEXT NOT NULL,
+                status   TEXT NOT NULL,
+                outputs  TEXT NOT NULL DEFAULT '{}',
+                error    TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                updated  REAL NOT NULL,
+                PRIMARY KEY (script, key)
+            )
+        """)
+        self.db.commit()
+
+    def get(self, key: str) -> dict | None:
+        with self.lock:
+            row = self.db.execute(
+                "SELECT stage, status, outputs, error, attempts FROM jobs WHERE script = ? AND key = ?",
+                (self.script, key),
+            ).fetchone()
+        if not row:
+            return None
+        stage, status, outputs, error, attempts = row
+        return {"stage": stage, "status": status, "outputs": json.loads(outputs),
+                "error": error, "attempts": attempts}
+
+    def should_run(self, key: str, mode: str | None = None) -> bool:
+        """Whether `key` belongs in this run for mode None, "resume" or "retry-failed"
+
+        A job left "running" means the process died mid-job, so it counts
+        as a failure.
+        """
+        if mode is None:
+            return True
+        job = self.get(key)
+        if mode == "resume":
+            return job is None or job["status"] != DONE
+        if mode == "retry-failed":
+            return job is not None and job["status"] != DONE
+        raise ValueError(f"unknown journal mode: {mode}")
+
+    def begin(self, key: str):
+        """Start (or restart) a job back at 'queued'; earlier outputs are kept until overwritten"""
+        with self.lock:
+            self.db.execute("""
+                INSERT INTO jobs (script, key, stage, status, attempts, updated)
+                VALUES (?, ?, 'queued', ?, 1, ?)
+                ON CONFLICT (script, key) DO UPDATE SET
+                    stage = excluded.stage, status = excluded.status, error = NULL,
+                    attempts = jobs.attempts + 1, updated = excluded.updated
+            """, (self.script, key, RUNNING, time.time()))
+            self.db.commit()
+
+    def stage(self, key: str, stage: str, **outputs):
+        """Record that `key` reached `stage`, merging `outputs` into what's stored"""
+        self._update(key, stage, RUNNING, outputs)
+
+    def done(self, key: str, stage: str = "written", **outputs):
+        self._update(key, stage, DONE, outputs)
+
+    def fail(self, key: str, error: str):
+        with self.lock:
+            self.db.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated = ? WHERE script = ? AND key = ?",
+                (FAILED, error, time.time(), self.script, key),
+            )
+            self.db.commit()
+
+    def summary(self) -> dict[str, int]:
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE script = ? GROUP BY status", (self.script,)
+            ).fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    def _update(self, key: str, stage: str, status: str, outputs: dict):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT outputs FROM jobs WHERE script = ? AND key = ?", (self.script, key)
+            ).fetchone()
+            merged = {**(json.loads(row[0]) if row else {}), **outputs}
+            self.db.execute("""
+                INSERT INTO jobs (script, key, stage, status, outputs, attempts, updated)
+                VALUES (?, ?, ?, ?, ?, 1, ?)
+                ON CONFLICT (script, key) DO UPDATE SET
+                    stage = excluded.stage, status = excluded.status,
+                    outputs = excluded.outputs, updated = excluded.updated
+            """, (self.script, key, stage, status, json.dumps(merged, ensure_ascii=False), time.time()))
+            self.db.commit()
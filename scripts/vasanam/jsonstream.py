@@ -0,0 +1,83 @@
+"""
+Incremental parser for a streamed JSON array of objects.
+
+Model responses arrive in chunks and are sometimes wrapped in ```json fences
+or cut off mid-array. JsonArrayStream.feed() takes each chunk as it arrives
+and returns every top-level object that has just been closed, so callers can
+act on segments before the response finishes — and a truncated response still
+yields every object that was complete.
+"""
+
+import json
+
+
+class JsonArrayStream:
+    def __init__(self):
+        self.started = False   # seen the opening "["
+        self.closed = False    # seen the closing "]"
+        self.depth = 0         # brace/bracket depth inside the current object
+        self.in_string = False
+        self.escape = False
+        self.parts: list[str] = []  # pieces of the object being read
+        self.skipped = 0       # objects that didn't parse
+
+    def feed(self, chunk: str) -> list[dict]:
+        """Consume the next chunk; return the objects it completed"""
+        out = []
+        i, n = 0, len(chunk)
+        while i < n and not self.closed:
+            if self.depth == 0:
+                # Between objects: skip fences, prose, commas and whitespace
+                c = chunk[i]
+                if c == "[" and not self.started:
+                    self.started = True
+                elif c == "{":
+                    self.started = True
+                    self.depth = 1
+                    self.parts = ["{"]
+                    i = self._scan(chunk, i + 1, out)
+                    continue
+                elif c == "]" and self.started:
+                    self.closed = True
+                i += 1
+            else:
+                i = self._scan(chunk, i, out)
+        return out
+
+    def _scan(self, chunk: str, i: int, out: list) -> int:
+        """Read object text from chunk[i:]; return where scanning stopped"""
+        start = i
+        n = len(chunk)
+        while i < n:
+            c = chunk[i]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == "\\":
+                    self.escape = True
+                elif c == '"':
+                    self.in_string = False
+            elif c == '"':
+                self.in_string = True
+            elif c in "{[":
+                self.depth += 1
+            elif c in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    self.parts.append(chunk[start:i + 1])
+                    self._emit(out)
+                    return i + 1
+            i += 1
+        self.parts.append(chunk[start:])
+        return n
+
+    def _emit(self, out: list):
+        text = "".join(self.parts)
+        self.parts = []
+        try:
+            obj = json.loads(text)
+        except json.JSONDecodeError:
+            self.skipped += 1
+            return
+        if isinstance(obj, dict):
+            out.append(obj)
@@ -0,0 +1,48 @@
+"""
+Segment language classification shared by the ingestion scripts.
+
+classify_languages() labels a whole movie's segments in one pass: the texts
+are joined and UTF-8 encoded once, ASCII letters are folded to b"a" with a
+256-entry bytes.translate table, and each segment is then scored with C-level
+byte scans instead of per-segment regex calls. In UTF-8 every Tamil-block
+codepoint (U+0B80–U+0BFF) starts with E0 AE or E0 AF, and no multi-byte
+sequence contains an ASCII byte, so both checks are exact.
+"""
+
+import re
+from typing import Sequence
+
+# Thresholds each source has always used for "mostly Latin letters → English"
+OPENSUBTITLES_ENGLISH_THRESHOLD = 0.7
+GEMINI_ENGLISH_THRESHOLD = 0.85
+
+_ASCII_LETTERS = b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_FOLD_LETTERS = bytes.maketrans(_ASCII_LETTERS, b"a" * len(_ASCII_LETTERS))
+_TAMIL_UTF8_RE = re.compile(rb"\xe0[\xae\xaf]")
+_SEP = "\x00"
+
+
+def classify_languages(texts: Sequence[str], english_threshold: float = OPENSUBTITLES_ENGLISH_THRESHOLD) -> list[str]:
+    """Label each text 'tamil', 'english' or 'tanglish'"""
+    if not texts:
+        return []
+    if len(texts) == 1:
+        encoded = [texts[0].encode("utf-8").translate(_FOLD_LETTERS)]
+    else:
+        encoded = _SEP.join(texts).encode("utf-8").translate(_FOLD_LETTERS).split(_SEP.encode())
+    if len(encoded) != len(texts):
+        # A text contained the separator itself; classify one by one instead
+        return [classify_languages([t], english_threshold)[0] for t in texts]
+    labels = []
+    for text, raw in zip(texts, encoded):
+        if _TAMIL_UTF8_RE.search(raw):
+            labels.append("tamil")
+        elif raw.count(b"a") / max(len(text), 1) > english_threshold:
+            labels.append("english")
+        else:
+            labels.append("tanglish")
+    return labels
+
+
+def detect_language(text: str, english_threshold: float = OPENSUBTITLES_ENGLISH_THRESHOLD) -> str:
+    return classify_languages([text], english_threshold)[0]
@@ -0,0 +1,149 @@
+"""
+Streaming loader for movie/clip manifests.
+
+A manifest is JSONL (one object per line) or CSV (header row) with the same
+fields as the hard-coded catalogues:
+
+  {"title": "Baasha", "year": 1995, "imdb_id": "tt0115147",
+   "youtube_video_id": "IfkZMODd0A0", "title_tamil": "பாஷா",
+   "actors": ["Rajinikanth", "Nagma"], "director": "Suresh Krissna"}
+
+In CSV, actors are separated by "|" or ";". A `url` may stand in for
+`youtube_video_id` (and vice versa). Rows are read lazily, validated,
+de-duplicated by youtube_video_id / imdb_id, and optionally sharded by a
+stable hash so N machines can split one manifest without coordinating.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import re
+import sys
+from typing import Iterable, Iterator
+
+VIDEO_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
+IMDB_ID_RE = re.compile(r"^tt\d{7,}$")
+URL_VIDEO_ID_RE = re.compile(r"(?:v=|youtu\.be/)([A-Za-z0-9_-]{11})")
+
+
+class ManifestError(ValueError):
+    pass
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """Parse "i/N" (0 <= i < N) into (i, N)"""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ManifestError(f"--shard must look like i/N, got {spec!r}")
+    if count < 1 or not 0 <= index < count:
+        raise ManifestError(f"--shard {spec}: need 0 <= i < N")
+    return index, count
+
+
+def in_shard(key: str, shard: tuple[int, int] | None) -> bool:
+    if shard is None:
+        return True
+    index, count = shard
+    return int(hashlib.sha1(key.encode("utf-8")).hexdigest()[:8], 16) % count == index
+
+
+def _open(path: str) -> io.TextIOBase:
+    if path == "-":
+        return sys.stdin
+    return open(path, encoding="utf-8-sig", newline="")
+
+
+def iter_rows(path: str) -> Iterator[tuple[int, dict]]:
+    """Yield (line_number, raw_row) from a JSONL or CSV manifest"""
+    f = _open(path)
+    try:
+        if path.lower().endswith(".csv"):
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, {k.strip(): v for k, v in row.items() if k and v not in (None, "")}
+            return
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ManifestError(f"{path}:{line_no}: invalid JSON ({e.msg})")
+            if not isinstance(row, dict):
+                raise ManifestError(f"{path}:{line_no}: expected an object")
+            yield line_no, row
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def normalize(row: dict, require: Iterable[str] = ("title", "year")) -> dict:
+    """Validate one row and fill in derived fields; raises ManifestError"""
+    movie = dict(row)
+    for key in ("title", "title_tamil", "director", "imdb_id", "youtube_video_id", "url"):
+        if isinstance(movie.get(key), str):
+            movie[key] = movie[key].strip() or None
+
+    if movie.get("url") and not movie.get("youtube_video_id"):
+        match = URL_VIDEO_ID_RE.search(movie["url"])
+        if match:
+            movie["youtube_video_id"] = match.group(1)
+    if movie.get("youtube_video_id") and not movie.get("url"):
+        movie["url"] = f"https://www.youtube.com/watch?v={movie['youtube_video_id']}"
+
+    missing = [key for key in require if movie.get(key) in (None, "", [])]
+    if missing:
+        raise ManifestError(f"missing {', '.join(missing)}")
+    if movie.get("year") is not None:
+        try:
+            movie["year"] = int(movie["year"])
+        except (TypeError, ValueError):
+            raise ManifestError(f"bad year {movie['year']!r}")
+    if movie.get("youtube_video_id") and not VIDEO_ID_RE.match(movie["youtube_video_id"]):
+        raise ManifestError(f"bad youtube_video_id {movie['youtube_video_id']!r}")
+    if movie.get("imdb_id") and not IMDB_ID_RE.match(movie["imdb_id"]):
+        raise ManifestError(f"bad imdb_id {movie['imdb_id']!r}")
+
+    actors = movie.get("actors") or []
+    if isinstance(actors, str):
+        actors = re.split(r"[|;]", actors)
+    movie["actors"] = [a.strip() for a in actors if str(a).strip()]
+    return movie
+
+
+def load_manifest(path: str, require: Iterable[str] = ("title", "year"),
+                  shard: tuple[int, int] | None = None) -> Iterator[dict]:
+    """Stream validated, de-duplicated rows from `path`, keeping only this shard
+
+    Invalid rows are reported and skipped; a row whose youtube_video_id or
+    imdb_id was already seen is dropped. Only the IDs are kept in memory.
+    """
+    require = tuple(require)
+    seen: set[str] = set()
+    skipped = duplicates = 0
+    for line_no, row in iter_rows(path):
+        try:
+            movie = normalize(row, require)
+        except ManifestError as e:
+            print(f"  ⚠️  {path}:{line_no}: {e} — skipped")
+            skipped += 1
+            continue
+        keys = [f"yt:{movie['youtube_video_id']}" if movie.get("youtube_video_id") else None,
+                f"imdb:{movie['imdb_id']}" if movie.get("imdb_id") else None]
+        keys = [k for k in keys if k]
+        if not keys:
+            print(f"  ⚠️  {path}:{line_no}: needs a youtube_video_id, url or imdb_id — skipped")
+            skipped += 1
+            continue
+        if any(k in seen for k in keys):
+            duplicates += 1
+            continue
+        seen.update(keys)
+        # Shard on the first key so every row of one title lands on the same shard
+        if in_shard(keys[0], shard):
+            yield movie
+    if skipped or duplicates:
+        print(f"  📋 Manifest {path}: {skipped} invalid, {duplicates} duplicate rows skipped")
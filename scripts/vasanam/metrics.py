@@ -0,0 +1,239 @@
+"""
+Per-stage timing and counters for ingestion runs.
+
+Code wraps each stage in `METRICS.timer("stage")` and bumps counters with
+`METRICS.count("name", n)`; both are thread-safe and cheap enough to leave
+on. At the end of a run the scripts print a short summary and can export:
+
+  --metrics-json PATH   full JSON run report (per-stage count/total/p50/p95/max)
+  --metrics-prom PATH   Prometheus text format, for a node_exporter textfile collector
+  --profile             run under cProfile and print the top hot spots
+
+Stage names are dotted by service ("os.search", "gemini.generate",
+"db.insert"), so a slow run shows at a glance where the wall-clock went.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+SAMPLE_SIZE = 2048  # per-stage reservoir for percentiles
+
+
+class StageStats:
+    __slots__ = ("count", "total", "max", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: list[float] = []
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.samples) < SAMPLE_SIZE:
+            self.samples.append(seconds)
+        else:
+            # Reservoir sampling keeps percentiles honest on long runs
+            i = random.randrange(self.count)
+            if i < SAMPLE_SIZE:
+                self.samples[i] = seconds
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.stages: dict[str, StageStats] = {}
+        self.counters: dict[str, float] = {}
+
+    def observe(self, stage: str, seconds: float):
+        with self.lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats()
+            stats.add(seconds)
+
+    def count(self, name: str, n: float = 1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def timer(self, stage: str):
+        """Time the enclosed block; an exception also bumps `<stage>.errors`"""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.count(f"{stage}.errors")
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def timed(self, stage: str):
+        """Decorator form of timer()"""
+        def decorate(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timer(stage):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.stages.clear()
+            self.counters.clear()
+
+    def report(self) -> dict:
+        with self.lock:
+            return {
+                "started": self.started,
+                "elapsed_s": round(time.time() - self.started, 3),
+                "stages": {
+                    name: {
+                        "count": s.count,
+                        "total_s": round(s.total, 4),
+                        "mean_s": round(s.total / s.count, 4) if s.count else 0.0,
+                        "p50_s": round(s.percentile(0.50), 4),
+                        "p95_s": round(s.percentile(0.95), 4),
+                        "max_s": round(s.max, 4),
+                    }
+                    for name, s in sorted(self.stages.items())
+                },
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def write_json(self, path: str):
+        _atomic_write(path, json.dumps(self.report(), indent=2) + "\n")
+
+    def write_prometheus(self, path: str, prefix: str = "vasanam"):
+        report = self.report()
+        lines = [
+            f"# HELP {prefix}_stage_seconds_total Wall-clock seconds spent per ingestion stage",
+            f"# TYPE {prefix}_stage_seconds_total counter",
+        ]
+        lines += [f'{prefix}_stage_seconds_total{{stage="{name}"}} {s["total_s"]}'
+                  for name, s in report["stages"].items()]
+        lines += [
+            f"# HELP {prefix}_stage_calls_total Times each ingestion stage ran",
+            f"# TYPE {prefix}_stage_calls_total counter",
+        ]
+        lines += [f'{prefix}_stage_calls_total{{stage="{name}"}} {s["count"]}'
+                  for name, s in report["stages"].items()]
+        lines += [
+            f"# HELP {prefix}_events_total Ingestion counters (bytes, rows, retries, errors)",
+            f"# TYPE {prefix}_events_total counter",
+        ]
+        lines += [f'{prefix}_events_total{{name="{name}"}} {value}'
+                  for name, value in report["counters"].items()]
+        lines.append(f"{prefix}_run_elapsed_seconds {report['elapsed_s']}")
+        _atomic_write(path, "\n".join(lines) + "\n")
+
+    def summary(self, top: int = 10) -> str:
+        report = self.report()
+        stages = sorted(report["stages"].items(), key=lambda kv: kv[1]["total_s"], reverse=True)[:top]
+        if not stages:
+            return ""
+        width = max(len(name) for name, _ in stages)
+        lines = [f"⏱️  Stage timings ({report['elapsed_s']:.1f}s wall-clock, stages may overlap):"]
+        for name, s in stages:
+            lines.append(f"   {name:<{width}}  {s['total_s']:>9.2f}s  ×{s['count']:<6} "
+                         f"p50 {s['p50_s'] * 1000:>8.1f}ms  p95 {s['p95_s'] * 1000:>8.1f}ms")
+        counters = [(k, v) for k, v in report["counters"].items()]
+        if counters:
+            lines.append("   " + ", ".join(f"{k}={_human(k, v)}" for k, v in counters))
+        return "\n".join(lines)
+
+
+def _human(name: str, value: float) -> str:
+    if name.endswith("bytes"):
+        return f"{value / (1024 * 1024):.1f}MB"
+    return f"{value:g}"
+
+
+def _atomic_write(path: str, text: str):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+METRICS = Metrics()
+
+
+@contextmanager
+def profiled(enabled: bool, top: int = 25):
+    """Run the block under cProfile and print its top cumulative hot spots
+
+    The ingest stages mostly run on worker threads, so those are covered
+    too. From Python 3.12 cProfile sits on sys.monitoring, which already
+    sees every thread (and allows only one active profiler), so a single
+    profiler is used. Before 3.12 each thread started inside the block
+    gets its own, and all of them are merged into one table.
+    """
+    if not enabled:
+        yield
+        return
+    profiles = [cProfile.Profile()]
+    per_thread = sys.version_info < (3, 12)
+
+    def profile_thread(frame, event, arg):
+        # Runs once per new thread: swap this hook for a real profiler
+        profile = cProfile.Profile()
+        profiles.append(profile)
+        profile.enable()
+
+    if per_thread:
+        threading.setprofile(profile_thread)
+    profiles[0].enable()
+    try:
+        yield
+    finally:
+        profiles[0].disable()
+        if per_thread:
+            threading.setprofile(None)
+        out = io.StringIO()
+        stats = pstats.Stats(profiles[0], stream=out)
+        for profile in profiles[1:]:
+            try:
+                stats.add(profile)
+            except TypeError:  # a thread that never recorded a call
+                pass
+        stats.sort_stats("cumulative").print_stats(top)
+        # Drop pstats' preamble so the table starts right away
+        text = re.sub(r"^.*?(?=\s+ncalls)", "", out.getvalue(), flags=re.S).strip("\n")
+        threads = f"{len(profiles)} threads" if per_thread else "all threads"
+        print(f"\n🔥 Top {top} hot spots (cumulative, {threads}):\n{text}")
+
+
+def export(metrics_json: str | None = None, metrics_prom: str | None = None, quiet: bool = False):
+    """End-of-run output shared by the ingest scripts"""
+    if not quiet:
+        summary = METRICS.summary()
+        if summary:
+            print(f"\n{summary}")
+    if metrics_json:
+        METRICS.write_json(metrics_json)
+        print(f"📊 Metrics report written to {metrics_json}")
+    if metrics_prom:
+        METRICS.write_prometheus(metrics_prom)
+        print(f"📊 Prometheus metrics written to {metrics_prom}")
@@ -0,0 +1,157 @@
+"""
+Ingest-time normalization of segment text for cross-script search.
+
+OpenSubtitles gives Tamil script ("நான் பாரு"), Gemini gives Tanglish
+("naan paaru"), and Tanglish itself is spelled every which way ("nan paru").
+to_tsvector('simple', text) can't match any of these against each other, so
+each segment also stores:
+
+  text_latin    Tamil script transliterated to Tanglish-style ASCII
+                (Latin text is just lower-cased)
+  phonetic_key  text_latin with spelling variants folded away: long vowels
+                collapsed (aa→a, ee→i, oo→u), aspirates and voicing merged
+                (th/dh/d→t, g→k, zh→l, ch/sh→s, …) and doubled letters
+                collapsed — "naan paaru", "nan paru" and "நான் பாரு" all
+                become "nan paru"
+
+Both are computed in Python per batch, memoized per word (subtitle
+vocabulary repeats heavily), and indexed by migration 004. The search side
+must fold the query the same way: src/lib/normalize.ts mirrors this module
+table for table, so change them together.
+
+with_context() adds context_latin / context_key: the same forms for a cue
+joined with the cue right after it (if it starts within CONTEXT_GAP_MS), so
+phrase search (migration 006) finds lines split across two subtitles.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Iterable, Iterator
+
+VOWELS = {
+    "அ": "a", "ஆ": "aa", "இ": "i", "ஈ": "ee", "உ": "u", "ஊ": "oo",
+    "எ": "e", "ஏ": "ae", "ஐ": "ai", "ஒ": "o", "ஓ": "o", "ஔ": "au",
+}
+CONSONANTS = {
+    "க": "k", "ங": "ng", "ச": "ch", "ஞ": "nj", "ட": "d", "ண": "n",
+    "த": "th", "ந": "n", "ப": "p", "ம": "m", "ய": "y", "ர": "r",
+    "ல": "l", "வ": "v", "ழ": "zh", "ள": "l", "ற": "r", "ன": "n",
+    # Grantha
+    "ஜ": "j", "ஷ": "sh", "ஸ": "s", "ஹ": "h", "ஶ": "sh",
+}
+VOWEL_SIGNS = {
+    "ா": "aa", "ி": "i", "ீ": "ee", "ு": "u", "ூ": "oo", "ெ": "e",
+    "ே": "ae", "ை": "ai", "ொ": "o", "ோ": "o", "ௌ": "au", "ௗ": "au",
+}
+PULLI = "்"  # virama: kills the consonant's inherent "a"
+# Clusters whose letter-by-letter spelling isn't how Tanglish writes them
+CLUSTERS = [("ngk", "ng"), ("njch", "nj"), ("dd", "tt"), ("rr", "tr")]
+OTHER = {"ஃ": "h", **{chr(0x0BE6 + d): str(d) for d in range(10)}}
+
+# Applied in order, before doubled letters are collapsed
+PHONETIC_FOLDS = [
+    ("ee", "i"), ("ii", "i"), ("oo", "u"), ("uu", "u"), ("aa", "a"), ("ae", "e"),
+    ("zh", "l"), ("th", "t"), ("dh", "t"), ("d", "t"),
+    ("sh", "s"), ("ch", "s"), ("z", "s"), ("c", "k"), ("q", "k"),
+    ("kh", "k"), ("gh", "k"), ("g", "k"), ("ph", "p"), ("bh", "p"), ("f", "p"), ("b", "p"),
+    ("w", "v"), ("x", "ks"),
+]
+CONTEXT_GAP_MS = 1500  # a longer pause than this ends the sentence
+
+_DOUBLED_RE = re.compile(r"(.)\1+")
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+_TAMIL_RE = re.compile(r"[஀-௿]")
+
+
+def _transliterate_word(word: str) -> str:
+    out = []
+    pending_a = False  # last char was a consonant still carrying its inherent vowel
+    for ch in word:
+        if ch in VOWEL_SIGNS:
+            out.append(VOWEL_SIGNS[ch])
+            pending_a = False
+            continue
+        if ch == PULLI:
+            pending_a = False
+            continue
+        if pending_a:
+            out.append("a")
+            pending_a = False
+        if ch in CONSONANTS:
+            out.append(CONSONANTS[ch])
+            pending_a = True
+        elif ch in VOWELS:
+            out.append(VOWELS[ch])
+        else:
+            out.append(OTHER.get(ch, ch.lower()))
+    if pending_a:
+        out.append("a")
+    latin = "".join(out)
+    for src, dst in CLUSTERS:
+        latin = latin.replace(src, dst)
+    return latin
+
+
+@lru_cache(maxsize=65536)
+def transliterate_word(word: str) -> str:
+    if not _TAMIL_RE.search(word):
+        return word.lower()
+    return _transliterate_word(unicodedata.normalize("NFC", word))
+
+
+@lru_cache(maxsize=65536)
+def phonetic_word(latin: str) -> str:
+    word = _NON_WORD_RE.sub("", latin.lower())
+    for src, dst in PHONETIC_FOLDS:
+        word = word.replace(src, dst)
+    return _DOUBLED_RE.sub(r"\1", word)
+
+
+def transliterate(text: str) -> str:
+    """Tamil script → Tanglish-style Latin; other text is lower-cased"""
+    return " ".join(transliterate_word(w) for w in text.split())
+
+
+def phonetic_key(text: str) -> str:
+    """Spelling-variant-insensitive key for (already transliterated) text"""
+    return " ".join(k for k in (phonetic_word(w) for w in text.split()) if k)
+
+
+def normalize_row(row: dict) -> dict:
+    """Add text_latin and phonetic_key to one segment row, in place"""
+    latin = transliterate(row["text"])
+    row["text_latin"] = latin
+    row["phonetic_key"] = phonetic_key(latin)
+    return row
+
+
+def normalize_rows(rows: Iterable[dict]) -> list[dict]:
+    """normalize_row() over a batch; returns the rows as a list"""
+    return [normalize_row(row) for row in rows]
+
+
+def _join_context(row: dict, following: dict | None, gap_ms: int):
+    end = row["start_ms"] + row.get("duration_ms", 0)
+    if following is None or not row["start_ms"] <= following["start_ms"] <= end + gap_ms:
+        row["context_latin"] = row["context_key"] = None
+        return
+    row["context_latin"] = f"{row['text_latin']} {following['text_latin']}"
+    row["context_key"] = f"{row['phonetic_key']} {following['phonetic_key']}"
+
+
+def with_context(rows: Iterable[dict], gap_ms: int = CONTEXT_GAP_MS) -> Iterator[dict]:
+    """Add context_latin / context_key to normalized rows, in stream order
+
+    Each row is held back until the next one arrives, so this works on a
+    live stream with a lookahead of one row.
+    """
+    previous = None
+    for row in rows:
+        if previous is not None:
+            _join_context(previous, row, gap_ms)
+            yield previous
+        previous = row
+    if previous is not None:
+        _join_context(previous, None, gap_ms)
+        yield previous
@@ -0,0 +1,275 @@
+"""
+Retry, backoff and adaptive throttling for every external call.
+
+Each upstream (OpenSubtitles, the subtitle CDN, Gemini, Supabase) gets one
+shared Upstream, looked up by name with get_upstream(). Calls go through
+Upstream.call(fn, ...), which:
+
+  - waits on an optional TokenBucket (fixed requests/second quota)
+  - holds one slot of an AIMD concurrency limit: +1/limit per success,
+    halved on a 429/503, never below min_concurrency
+  - retries transient failures (connection errors, 408/425/429/5xx) with
+    full-jitter exponential backoff, sleeping at least as long as any
+    Retry-After / X-RateLimit-Reset the server sent; a server-requested
+    pause applies to every caller of that upstream, not just the one hit
+  - returns responses for non-retryable statuses untouched, and raises
+    RetryError once max_attempts is spent (or after one try, with retry=False)
+
+fn may return a response-like object (anything with .status_code and
+.headers) or raise; both paths are classified the same way.
+"""
+
+import email.utils
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timezone
+
+from vasanam.metrics import METRICS
+
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+THROTTLE_STATUS = {429, 503}
+TRANSIENT_ERRORS = {
+    # requests / urllib3
+    "ConnectionError", "ConnectTimeout", "ReadTimeout", "Timeout", "ChunkedEncodingError",
+    "ProtocolError", "NewConnectionError",
+    # httpx (supabase, google-genai)
+    "ConnectError", "ReadError", "WriteError", "WriteTimeout", "PoolTimeout", "RemoteProtocolError",
+    # psycopg
+    "OperationalError", "SerializationFailure", "DeadlockDetected",
+    # stdlib
+    "TimeoutError", "ConnectionResetError", "ConnectionAbortedError", "BrokenPipeError",
+}
+
+
+class RetryError(Exception):
+    """An upstream call still failed after max_attempts"""
+
+    def __init__(self, upstream: str, attempts: int, last):
+        self.upstream = upstream
+        self.attempts = attempts
+        self.last = last
+        detail = f"HTTP {last.status_code}" if hasattr(last, "status_code") else repr(last)
+        super().__init__(f"{upstream}: gave up after {attempts} attempts ({detail})")
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every worker talking to one API"""
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = max(capacity or rate, 1.0)  # below 1 req/s it must still hold one token
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until `tokens` are available, then consume them"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class AIMDLimiter:
+    """Concurrency limit that grows additively on success and halves on throttling"""
+    def __init__(self, initial: float, minimum: float = 1, maximum: float = 64, cooldown: float = 1.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.cooldown = cooldown  # one decrease per burst of throttled responses
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self.cond = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        with self.cond:
+            while self.in_flight >= int(self.limit):
+                self.cond.wait()
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self.cond:
+                self.in_flight -= 1
+                self.cond.notify()
+
+    def succeeded(self):
+        with self.cond:
+            before = int(self.limit)
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            if int(self.limit) > before:
+                self.cond.notify()
+
+    def throttled(self):
+        with self.cond:
+            now = time.monotonic()
+            if now - self.last_decrease >= self.cooldown:
+                self.limit = max(self.minimum, self.limit / 2)
+                self.last_decrease = now
+
+
+def retry_after(headers) -> float | None:
+    """Seconds the server asked us to wait, from Retry-After or X-RateLimit-* headers"""
+    if not headers:
+        return None
+    get = headers.get
+    value = get("Retry-After") or get("retry-after")
+    if value:
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            try:
+                parsed = email.utils.parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None  # neither seconds nor an HTTP date
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)  # HTTP dates are GMT
+            return max(parsed.timestamp() - time.time(), 0.0)
+    remaining = get("X-RateLimit-Remaining") or get("x-ratelimit-remaining") or get("RateLimit-Remaining")
+    reset = get("X-RateLimit-Reset") or get("x-ratelimit-reset") or get("RateLimit-Reset")
+    if reset and remaining is not None and str(remaining).strip() in ("0", "0.0"):
+        try:
+            reset = float(reset)
+        except ValueError:
+            return None
+        # Either an epoch timestamp or a delta in seconds
+        return max(reset - time.time(), 0.0) if reset > 1e9 else reset
+    return None
+
+
+def status_of(outcome) -> int | None:
+    """HTTP status of a response or an SDK exception, if it carries one"""
+    for attr in ("status_code", "code", "status"):
+        value = getattr(outcome, attr, None)
+        if isinstance(value, int) or (isinstance(value, str) and value.isdigit()):
+            return int(value)
+    response = getattr(outcome, "response", None)
+    if response is not None and response is not outcome:
+        return status_of(response)
+    return None
+
+
+def headers_of(outcome):
+    headers = getattr(outcome, "headers", None)
+    if headers is None and getattr(outcome, "response", None) is not None:
+        headers = getattr(outcome.response, "headers", None)
+    return headers
+
+
+def is_transient(exc: BaseException) -> bool:
+    if status_of(exc) in RETRY_STATUS:
+        return True
+    return any(cls.__name__ in TRANSIENT_ERRORS for cls in type(exc).__mro__)
+
+
+class Upstream:
+    def __init__(self, name: str, rate: float | None = None, concurrency: int = 8,
+                 min_concurrency: int = 1, max_concurrency: int = 64, max_attempts: int = 5,
+                 base_delay: float = 0.5, max_delay: float = 60.0):
+        self.name = name
+        self.bucket = TokenBucket(rate) if rate else None
+        self.limiter = AIMDLimiter(concurrency, min_concurrency, max_concurrency)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, min(max_delay, base * 2^attempt)]"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def pause(self, seconds: float):
+        """Hold back every caller of this upstream for `seconds`"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + min(seconds, self.max_delay))
+
+    def _wait_turn(self):
+        while True:
+            with self.lock:
+                wait = self.paused_until - time.monotonic()
+            if wait <= 0:
+                break
+            time.sleep(wait)
+        if self.bucket:
+            with METRICS.timer(f"{self.name}.rate_wait"):
+                self.bucket.acquire()
+
+    def call(self, fn, *args, acquire: bool = True, retry: bool = True, **kwargs):
+        """Call fn(*args, **kwargs) with throttling and retries (see module docstring)
+
+        acquire=False skips the concurrency slot, for calls made while the
+        caller already holds one via slot(). retry=False makes a single
+        attempt, for calls that are not safe to repeat (an insert whose
+        response was lost may already have been applied).
+        """
+        last = None
+        attempts = self.max_attempts if retry else 1
+        for attempt in range(attempts):
+            if attempt:
+                delay = max(self.backoff(attempt), retry_after(headers_of(last)) or 0.0)
+                METRICS.count(f"{self.name}.retries")
+                time.sleep(delay)
+            self._wait_turn()
+            try:
+                with (self.limiter.slot() if acquire else _nothing()):
+                    outcome = fn(*args, **kwargs)
+            except Exception as e:
+                if not is_transient(e):
+                    raise
+                last = e
+                self._observe(status_of(e), headers_of(e))
+                continue
+            status = status_of(outcome) if hasattr(outcome, "status_code") else None
+            if status in RETRY_STATUS:
+                last = outcome
+                self._observe(status, headers_of(outcome))
+                continue
+            self.limiter.succeeded()
+            # Quota about to run out: slow everyone down before the 429 arrives
+            wait = retry_after(headers_of(outcome)) if status is not None else None
+            if wait:
+                self.pause(wait)
+            return outcome
+        METRICS.count(f"{self.name}.errors")
+        raise RetryError(self.name, attempts, last)
+
+    @contextmanager
+    def slot(self):
+        """Hold a concurrency slot for a longer exchange (e.g. a streamed response)"""
+        self._wait_turn()
+        with self.limiter.slot():
+            yield
+
+    def _observe(self, status: int | None, headers):
+        if status in THROTTLE_STATUS:
+            METRICS.count(f"{self.name}.throttled")
+            self.limiter.throttled()
+        wait = retry_after(headers)
+        if wait:
+            self.pause(wait)
+
+
+@contextmanager
+def _nothing():
+    yield
+
+
+_upstreams: dict[str, Upstream] = {}
+_registry_lock = threading.Lock()
+
+
+def get_upstream(name: str, **defaults) -> Upstream:
+    """The shared Upstream for `name`; `defaults` only apply on first use"""
+    with _registry_lock:
+        if name not in _upstreams:
+            _upstreams[name] = Upstream(name, **defaults)
+        return _upstreams[name]
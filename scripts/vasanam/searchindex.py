@@ -0,0 +1,280 @@
+"""
+Prebuilt, memory-mapped inverted index over segments and movies.
+
+scripts/build-search-index.py exports the catalogue into one file that
+SearchIndex answers ranked queries from with no database round-trip — for
+hot queries (trending searches) served from a local or edge-shipped copy.
+
+Terms are the words of each segment's phonetic_key (normalize.py), so
+"நான்", "naan" and "nan" are one term on both sides, as in the database.
+
+File layout (native byte order, recorded in the header):
+
+  header      magic, version, byte order, term/doc counts, then an
+              (offset, length) pair for each section below
+  meta        JSON: movies table, language names, build info
+  term_offs   uint32[n_terms + 1]   offsets into term_blob
+  term_blob   sorted UTF-8 terms, concatenated
+  post_offs   uint64[n_terms + 1]   offsets into postings
+  postings    per term: varint (doc-id delta, term frequency) pairs
+  docs        DOC struct per doc: segment uuid, movie, start, duration,
+              length in terms, language
+  text_offs   uint64[n_docs + 1]    offsets into text_blob
+  text_blob   segment texts, UTF-8
+
+Ranking mirrors search_dialogues_phrase() tiers: the query as a phrase in
+one segment, then all its words, then any of them; BM25 orders each tier.
+"""
+
+import json
+import math
+import mmap
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from uuid import UUID
+
+from vasanam.normalize import phonetic_key, transliterate
+
+MAGIC = b"VSIX"
+VERSION = 1
+HEADER = struct.Struct("<4sHBxQQ")     # magic, version, big-endian?, n_terms, n_docs
+SECTIONS = ("meta", "term_offs", "term_blob", "post_offs", "postings", "docs", "text_offs", "text_blob")
+SECTION = struct.Struct("<QQ")
+DOC = struct.Struct("=16sIIIHBx")      # segment id, movie, start_ms, duration_ms, length, language
+K1, B = 1.2, 0.75
+CANDIDATES = 200                       # docs reranked for the phrase tier, like candidate_limit
+POSTINGS_CACHE = 4096                  # decoded posting lists kept per open index
+
+
+def segment_terms(row: dict) -> list[str]:
+    key = row.get("phonetic_key")
+    if key is None:
+        key = phonetic_key(transliterate(row["text"]))
+    return key.split()
+
+
+def encode_varints(values) -> bytes:
+    out = bytearray()
+    for v in values:
+        while v >= 0x80:
+            out.append((v & 0x7F) | 0x80)
+            v >>= 7
+        out.append(v)
+    return bytes(out)
+
+
+def decode_varints(data) -> list[int]:
+    values, v, shift = [], 0, 0
+    for byte in data:
+        v |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(v)
+            v = shift = 0
+    return values
+
+
+class IndexWriter:
+    """Collect movies and segments, then write() the index file"""
+
+    def __init__(self):
+        self.movies: list[dict] = []
+        self.movie_index: dict[str, int] = {}
+        self.languages: list[str] = []
+        self.postings: dict[str, array] = {}   # term → flat (doc, tf) pairs
+        self.docs = bytearray()
+        self.text_offs = array("Q", [0])
+        self.texts = bytearray()
+        self.n_docs = 0
+
+    def add_movie(self, movie: dict):
+        self.movie_index[movie["id"]] = len(self.movies)
+        self.movies.append({k: movie.get(k) for k in
+                            ("id", "title", "year", "youtube_video_id", "poster_url", "actors", "director")})
+
+    def add_segment(self, row: dict):
+        """row: {id, movie_id, text, start_ms, duration_ms, language[, phonetic_key]}"""
+        doc = self.n_docs
+        terms = segment_terms(row)
+        counts: dict[str, int] = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        for term, tf in counts.items():
+            self.postings.setdefault(term, array("I")).extend((doc, tf))
+        language = row.get("language") or "unknown"
+        if language not in self.languages:
+            self.languages.append(language)
+        self.docs += DOC.pack(UUID(row["id"]).bytes, self.movie_index[row["movie_id"]], row["start_ms"],
+                              row["duration_ms"] or 0, min(len(terms), 0xFFFF), self.languages.index(language))
+        self.texts += row["text"].encode()
+        self.text_offs.append(len(self.texts))
+        self.n_docs += 1
+
+    def write(self, path: str) -> int:
+        """Write the index; returns its size in bytes"""
+        terms = sorted(self.postings)
+        term_offs, term_blob = array("I", [0]), bytearray()
+        post_offs, postings = array("Q", [0]), bytearray()
+        for term in terms:
+            term_blob += term.encode()
+            term_offs.append(len(term_blob))
+            pairs, prev, deltas = self.postings[term], 0, []
+            for i in range(0, len(pairs), 2):
+                deltas += (pairs[i] - prev, pairs[i + 1])
+                prev = pairs[i]
+            postings += encode_varints(deltas)
+            post_offs.append(len(postings))
+        meta = json.dumps({"movies": self.movies, "languages": self.languages,
+                           "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                           "avg_length": sum(DOC.unpack_from(self.docs, i * DOC.size)[4]
+                                             for i in range(self.n_docs)) / max(self.n_docs, 1)},
+                          ensure_ascii=False).encode()
+        sections = [meta, term_offs.tobytes(), bytes(term_blob), post_offs.tobytes(), bytes(postings),
+                    bytes(self.docs), self.text_offs.tobytes(), bytes(self.texts)]
+
+        offset = HEADER.size + SECTION.size * len(SECTIONS)
+        table = []
+        for data in sections:
+            offset += -offset % 8  # keep the typed arrays aligned for memoryview.cast
+            table.append((offset, len(data)))
+            offset += len(data)
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, sys.byteorder == "big", len(terms), self.n_docs))
+            for entry in table:
+                f.write(SECTION.pack(*entry))
+            for (start, _), data in zip(table, sections):
+                f.write(b"\0" * (start - f.tell()))
+                f.write(data)
+            return f.tell()
+
+
+class SearchIndex:
+    """Read-only view of an index file; safe to share across threads"""
+
+    def __init__(self, path: str):
+        self.file = open(path, "rb")
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, big_endian, self.n_terms, self.n_docs = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a version-{VERSION} Vasanam search index")
+        if big_endian != (sys.byteorder == "big"):
+            raise ValueError(f"{path}: built on a machine with the other byte order")
+        view = memoryview(self.mm)
+        s = {}
+        for i, name in enumerate(SECTIONS):
+            start, length = SECTION.unpack_from(self.mm, HEADER.size + i * SECTION.size)
+            s[name] = view[start:start + length]
+        self.meta = json.loads(bytes(s["meta"]))
+        self.movies = self.meta["movies"]
+        self.languages = self.meta["languages"]
+        self.avg_length = self.meta["avg_length"] or 1.0
+        self.term_offs = s["term_offs"].cast("I")
+        self.term_blob = s["term_blob"]
+        self.post_offs = s["post_offs"].cast("Q")
+        self.postings_blob = s["postings"]
+        self.docs = s["docs"]
+        self.text_offs = s["text_offs"].cast("Q")
+        self.text_blob = s["text_blob"]
+        self._views = s
+        self.postings = lru_cache(maxsize=POSTINGS_CACHE)(self._postings)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.postings.cache_clear()
+        for v in (self.term_offs, self.post_offs, self.text_offs, *self._views.values()):
+            v.release()
+        self.mm.close()
+        self.file.close()
+
+    def _term(self, i: int) -> bytes:
+        return bytes(self.term_blob[self.term_offs[i]:self.term_offs[i + 1]])
+
+    def term_id(self, term: str) -> int | None:
+        """Binary search of the sorted term dictionary"""
+        key = term.encode()
+        lo = bisect_left(range(self.n_terms), key, key=self._term)
+        return lo if lo < self.n_terms and self._term(lo) == key else None
+
+    def _postings(self, term: str) -> dict[int, int]:
+        """doc → term frequency for one term (cached)"""
+        t = self.term_id(term)
+        if t is None:
+            return {}
+        values = decode_varints(self.postings_blob[self.post_offs[t]:self.post_offs[t + 1]])
+        docs, doc = {}, 0
+        for i in range(0, len(values), 2):
+            doc += values[i]
+            docs[doc] = values[i + 1]
+        return docs
+
+    def text(self, doc: int) -> str:
+        return bytes(self.text_blob[self.text_offs[doc]:self.text_offs[doc + 1]]).decode()
+
+    def result(self, doc: int, rank: float) -> dict:
+        """One row shaped like search_dialogues_phrase()'s"""
+        seg, movie, start_ms, duration_ms, _, language = DOC.unpack_from(self.docs, doc * DOC.size)
+        m = self.movies[movie]
+        return {"segment_id": str(UUID(bytes=seg)), "movie_id": m["id"], "text": self.text(doc),
+                "start_ms": start_ms, "duration_ms": duration_ms, "language": self.languages[language],
+                "movie_title": m["title"], "movie_year": m["year"], "youtube_video_id": m["youtube_video_id"],
+                "poster_url": m["poster_url"], "actors": m["actors"] or [], "director": m["director"],
+                "rank": rank}
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> list[dict]:
+        key = phonetic_key(transliterate(query))
+        words = list(dict.fromkeys(key.split()))
+        if not words:
+            return []
+        lists = [(w, self.postings(w)) for w in words]
+        lists = [(w, p) for w, p in lists if p]
+        if not lists:
+            return []
+        lists.sort(key=lambda wp: len(wp[1]))
+
+        # BM25 over the documents holding every query word, else any of them
+        everything = len(lists) == len(words)
+        if everything:
+            docs = [d for d in lists[0][1] if all(d in p for _, p in lists[1:])]
+        if not everything or not docs:
+            everything = False
+            docs = {d for _, p in lists for d in p}
+        scores = {}
+        for doc in docs:
+            length = DOC.unpack_from(self.docs, doc * DOC.size)[4] or 1
+            norm = K1 * (1 - B + B * length / self.avg_length)
+            score = 0.0
+            for _, p in lists:
+                tf = p.get(doc)
+                if tf:
+                    idf = _idf(self.n_docs, len(p))
+                    score += idf * tf * (K1 + 1) / (tf + norm)
+            scores[doc] = score
+
+        cap = max(CANDIDATES, offset + limit)
+        top = sorted(scores, key=scores.__getitem__, reverse=True)[:cap]
+        phrase = f" {key} "
+        ranked = []
+        for doc in top:
+            if everything and len(words) > 1 and phrase in f" {phonetic_key(transliterate(self.text(doc)))} ":
+                tier = 3
+            else:
+                tier = 2 if everything else 1
+            # Tiers stay in order, as in search_dialogues_phrase(): tier 3 lands in [2, 3)
+            ranked.append((tier - 1 / (1 + scores[doc]), doc))
+        ranked.sort(key=lambda rd: (-rd[0], DOC.unpack_from(self.docs, rd[1] * DOC.size)[2]))
+        return [self.result(doc, round(rank, 4)) for rank, doc in ranked[offset:offset + limit]]
+
+
+@lru_cache(maxsize=65536)
+def _idf(n_docs: int, df: int) -> float:
+    return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
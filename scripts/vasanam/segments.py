@@ -0,0 +1,254 @@
+"""
+Writing a movie's segments to vasanam_segments.
+
+write_segments() has two modes:
+  full         delete every existing row for the movie, then batch insert
+  incremental  diff by content_hash (md5 of "start_ms|text", mirrored by the
+               generated column from migration 003) and apply only the
+               difference through the sync_movie_segments RPC, in one
+               transaction — an unchanged movie writes nothing
+
+Rows may also arrive as a lazy iterable (e.g. segments parsed out of a
+streaming model response). Those are inserted batch by batch as they arrive,
+and the movie's superseded rows are deleted once the stream ends — the movie
+is never left without searchable segments, at the cost of the single
+transaction.
+
+make_segment_writer() picks between this PostgREST path and the bulk COPY
+path in copyload.py; both return the same counts. Every request goes through
+the shared "db" upstream (retry.py), so a 503 or dropped connection from
+Supabase is retried with backoff instead of failing the movie. Inserts are
+the exception: they are tried once, since repeating one that did land would
+duplicate its rows.
+"""
+
+import hashlib
+import os
+import time
+from contextlib import nullcontext
+from functools import partial
+from typing import Callable, Iterable, Iterator
+
+from vasanam.metrics import METRICS
+from vasanam.retry import get_upstream
+
+BATCH_SIZE = 500
+NORM_COLUMNS = ("text_latin", "phonetic_key", "context_latin", "context_key",  # see normalize.py
+                "minhash", "lsh_bands")                                      # and dedup.py
+PAGE_SIZE = 1000  # PostgREST's default max rows per request
+
+
+def make_segment_writer(supabase, backend: str = "rest", database_url: str | None = None) -> Callable:
+    """Return write(movie_id, rows, incremental=False) -> counts for the chosen backend.
+
+    "rest" goes through the Supabase client; "copy" streams over a direct
+    Postgres connection (see copyload.py).
+    """
+    if backend == "copy":
+        from vasanam.copyload import CopyWriter
+        return CopyWriter(database_url or os.environ.get("DATABASE_URL")).write_segments
+    return partial(write_segments, supabase)
+
+
+def execute(query, retry: bool = True):
+    """Run a PostgREST query builder through the "db" upstream's retries
+
+    Pass retry=False for writes that are not idempotent (inserts): a retry
+    after a lost response would store the rows twice.
+    """
+    return get_upstream("db").call(query.execute, retry=retry)
+
+
+def paged(query_for_range, timer: str | None = None) -> Iterator[dict]:
+    """Yield rows from a PostgREST query, PAGE_SIZE at a time
+
+    query_for_range(lo, hi) builds the query for one page; it needs a
+    stable .order() so pages don't overlap. With `timer`, each page's
+    request is timed under that METRICS name.
+    """
+    offset = 0
+    while True:
+        with METRICS.timer(timer) if timer else nullcontext():
+            rows = execute(query_for_range(offset, offset + PAGE_SIZE - 1)).data
+        yield from rows
+        if len(rows) < PAGE_SIZE:
+            return
+        offset += PAGE_SIZE
+
+
+def segment_hash(start_ms: int, text: str) -> str:
+    """Same value as the vasanam_segments.content_hash generated column"""
+    return hashlib.md5(f"{start_ms}|{text}".encode("utf-8")).hexdigest()
+
+
+def fetch_existing_hashes(supabase, movie_id: str, stored: dict[str, dict] | None = None) -> dict[str, list[str]]:
+    """Map content_hash → segment ids for every stored segment of a movie
+
+    If `stored` is given, it also receives id → {content_hash, *NORM_COLUMNS}
+    so callers can spot rows whose search columns are missing or stale.
+    """
+    existing: dict[str, list[str]] = {}
+    columns = "id,content_hash" + ("," + ",".join(NORM_COLUMNS) if stored is not None else "")
+    for row in paged(lambda lo, hi: supabase.table("vasanam_segments")
+                     .select(columns)
+                     .eq("movie_id", movie_id)
+                     .order("id")
+                     .range(lo, hi), timer="db.fetch_hashes"):
+        existing.setdefault(row["content_hash"], []).append(row["id"])
+        if stored is not None:
+            stored[row["id"]] = row
+    return existing
+
+
+def fill_normalized(supabase, updates: list[dict]) -> int:
+    """Set the NORM_COLUMNS of existing rows ({id, text_latin, phonetic_key, ...})"""
+    filled = 0
+    for i in range(0, len(updates), BATCH_SIZE):
+        with METRICS.timer("db.fill_norm"):
+            result = execute(supabase.rpc("fill_segment_norm", {"p_rows": updates[i:i + BATCH_SIZE]}))
+        filled += result.data if isinstance(result.data, int) else len(updates[i:i + BATCH_SIZE])
+    METRICS.count("db.rows_normalized", filled)
+    return filled
+
+
+def norm_updates(stored: dict[str, dict], rows_by_hash: dict[str, dict], skip: set = frozenset()) -> list[dict]:
+    """Updates for unchanged rows whose search columns are missing or out of date
+
+    Rows from before migrations 004/006/007 have NULLs; a row's context also goes
+    stale when the cue after it changes, even though its own hash doesn't.
+    """
+    updates = []
+    for seg_id, row in stored.items():
+        wanted = rows_by_hash.get(row["content_hash"])
+        if seg_id in skip or wanted is None or wanted.get("phonetic_key") is None:
+            continue
+        if any(row.get(c) != wanted.get(c) for c in NORM_COLUMNS):
+            updates.append({"id": seg_id, **{c: wanted.get(c) for c in NORM_COLUMNS}})
+    return updates
+
+
+def write_segments(supabase, movie_id: str, rows: Iterable[dict], incremental: bool = False) -> dict:
+    """Store `rows` ({text, start_ms, duration_ms, language} + NORM_COLUMNS) as the
+    movie's segments.
+
+    Returns {"inserted", "deleted", "unchanged"} row counts; a full reload
+    doesn't count what it deleted, so "deleted" is None there. Lists are
+    written as described above; any other iterable goes to stream_segments().
+    """
+    if not isinstance(rows, list):
+        return stream_segments(supabase, movie_id, rows, incremental=incremental)
+    if not rows:
+        # Never wipe a movie because an upstream step came back empty
+        return {"inserted": 0, "deleted": 0, "unchanged": 0}
+    if incremental:
+        return _sync_segments(supabase, movie_id, rows)
+
+    with METRICS.timer("db.delete"):
+        execute(supabase.table("vasanam_segments").delete().eq("movie_id", movie_id))
+    inserted = 0
+    for i in range(0, len(rows), BATCH_SIZE):
+        batch = [{"movie_id": movie_id, **row} for row in rows[i:i + BATCH_SIZE]]
+        with METRICS.timer("db.insert"):
+            execute(supabase.table("vasanam_segments").insert(batch), retry=False)
+        inserted += len(batch)
+    METRICS.count("db.rows_inserted", inserted)
+    return {"inserted": inserted, "deleted": None, "unchanged": 0}
+
+
+def _sync_segments(supabase, movie_id: str, rows: list[dict]) -> dict:
+    wanted: dict[str, dict] = {}
+    for row in rows:
+        wanted.setdefault(segment_hash(row["start_ms"], row["text"]), row)
+
+    stored: dict[str, dict] = {}
+    existing = fetch_existing_hashes(supabase, movie_id, stored)
+    to_insert = [row for h, row in wanted.items() if h not in existing]
+    stale = []
+    for h, ids in existing.items():
+        # Keep one row per wanted hash; earlier full reloads may have left duplicates
+        stale.extend(ids if h not in wanted else ids[1:])
+    unchanged = len(wanted) - len(to_insert)
+    fill_normalized(supabase, norm_updates(stored, wanted, set(stale)))
+
+    if not to_insert and not stale:
+        return {"inserted": 0, "deleted": 0, "unchanged": unchanged}
+
+    with METRICS.timer("db.sync_rpc"):
+        result = execute(supabase.rpc("sync_movie_segments", {
+            "p_movie_id": movie_id,
+            "p_insert": to_insert,
+            "p_stale": stale,
+        }), retry=False)
+    counts = result.data[0] if result.data else {"inserted": len(to_insert), "deleted": len(stale)}
+    METRICS.count("db.rows_inserted", counts["inserted"])
+    METRICS.count("db.rows_deleted", counts["deleted"])
+    return {"inserted": counts["inserted"], "deleted": counts["deleted"], "unchanged": unchanged}
+
+
+def stream_segments(supabase, movie_id: str, rows: Iterable[dict], incremental: bool = False,
+                    flush_seconds: float = 2.0) -> dict:
+    """Insert rows as they arrive, then delete the rows they supersede.
+
+    A partial batch is flushed once it has waited flush_seconds, so the first
+    segments become searchable without waiting for the whole stream. If the
+    stream yields nothing, existing rows are left untouched; if it raises,
+    the rows already inserted are deleted again before the error propagates.
+    """
+    stored: dict[str, dict] = {}
+    existing = fetch_existing_hashes(supabase, movie_id, stored)
+    kept: dict[str, dict] = {}  # unchanged rows, by hash
+    seen: set[str] = set()
+    pending: list[dict] = []
+    inserted_ids: list[str] = []
+    unchanged = 0
+    last_flush = time.monotonic()
+
+    def flush():
+        nonlocal last_flush
+        if pending:
+            with METRICS.timer("db.insert"):
+                result = execute(supabase.table("vasanam_segments")
+                                 .insert([{"movie_id": movie_id, **row} for row in pending]), retry=False)
+            inserted_ids.extend(row["id"] for row in result.data)
+            METRICS.count("db.rows_inserted", len(pending))
+            pending.clear()
+        last_flush = time.monotonic()
+
+    try:
+        for row in rows:
+            h = segment_hash(row["start_ms"], row["text"])
+            if h in seen:
+                continue
+            seen.add(h)
+            if incremental and h in existing:
+                unchanged += 1
+                kept[h] = row
+                continue
+            pending.append(row)
+            if len(pending) >= BATCH_SIZE or time.monotonic() - last_flush >= flush_seconds:
+                flush()
+        flush()
+    except Exception:
+        # Leave the movie as it was rather than holding old and partial new rows
+        for i in range(0, len(inserted_ids), BATCH_SIZE):
+            with METRICS.timer("db.delete"):
+                execute(supabase.table("vasanam_segments").delete().in_("id", inserted_ids[i:i + BATCH_SIZE]))
+        METRICS.count("db.rows_rolled_back", len(inserted_ids))
+        raise
+    inserted = len(inserted_ids)
+
+    if not seen:
+        return {"inserted": 0, "deleted": 0, "unchanged": 0}
+
+    stale = []
+    for h, ids in existing.items():
+        if incremental and h in seen:
+            stale.extend(ids[1:])
+        else:
+            stale.extend(ids)
+    fill_normalized(supabase, norm_updates(stored, kept, set(stale)))
+    for i in range(0, len(stale), BATCH_SIZE):
+        with METRICS.timer("db.delete"):
+            execute(supabase.table("vasanam_segments").delete().in_("id", stale[i:i + BATCH_SIZE]))
+    METRICS.count("db.rows_deleted", len(stale))
+    return {"inserted": inserted, "deleted": len(stale), "unchanged": unchanged}
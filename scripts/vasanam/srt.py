@@ -0,0 +1,94 @@
+"""
+Streaming SRT parser.
+
+iter_srt() walks subtitle lines once with a small state machine and yields
+Cue records as each cue completes, so memory stays flat regardless of file
+length. It accepts str or bytes lines, strips a UTF-8 BOM, tolerates CRLF/CR
+line endings, and starts a new cue on every timecode line even when the blank
+separator line is missing.
+"""
+
+import io
+import re
+from itertools import chain
+from typing import Iterable, Iterator, NamedTuple
+
+# "00:01:23,456 --> 00:01:25,789 X1:..." — ms part optional, "." accepted for ","
+TIMECODE_RE = re.compile(
+    r'^\s*(\d+):(\d{1,2}):(\d{1,2})(?:[,.](\d{1,3}))?\s*-->\s*(\d+):(\d{1,2}):(\d{1,2})(?:[,.](\d{1,3}))?'
+)
+# HTML tags and SDH markers like (Music), [Applause], removed in one pass
+NOISE_RE = re.compile(r'<[^>]+>|\([^)]*\)|\[[^\]]*\]')
+MIN_DURATION_MS = 1000
+
+
+class Cue(NamedTuple):
+    start_ms: int
+    duration_ms: int
+    text: str
+
+
+def _ms(h: str, m: str, s: str, frac: str | None) -> int:
+    ms = int(frac.ljust(3, '0')) if frac else 0
+    return (int(h) * 3600 + int(m) * 60 + int(s)) * 1000 + ms
+
+
+def _finish(start_ms: int, end_ms: int, lines: list[str]) -> Cue | None:
+    text = NOISE_RE.sub('', ' '.join(lines)).strip()
+    if len(text) <= 2:
+        return None
+    return Cue(start_ms, max(end_ms - start_ms, MIN_DURATION_MS), text)
+
+
+def iter_srt(lines: Iterable[str | bytes]) -> Iterator[Cue]:
+    """Yield a Cue for every usable subtitle block in `lines`"""
+    it = iter(lines)
+    first = next(it, None)
+    if first is None:
+        return
+    if isinstance(first, bytes):
+        first = first.decode('utf-8', errors='replace')
+        it = (line.decode('utf-8', errors='replace') for line in it)
+
+    start_ms = end_ms = None
+    text_lines: list[str] = []
+
+    for line in chain((first.lstrip('\ufeff'),), it):
+        line = line.strip()  # also drops \r from CRLF files
+
+        match = TIMECODE_RE.match(line) if '-->' in line else None
+        if match:
+            if start_ms is not None:
+                # No blank line before this cue: its index ended up as our last text line
+                if text_lines and text_lines[-1].isdigit():
+                    text_lines.pop()
+                cue = _finish(start_ms, end_ms, text_lines)
+                if cue:
+                    yield cue
+            g = match.groups()
+            start_ms, end_ms = _ms(*g[:4]), _ms(*g[4:])
+            text_lines = []
+        elif not line:
+            if start_ms is not None:
+                cue = _finish(start_ms, end_ms, text_lines)
+                if cue:
+                    yield cue
+                start_ms = None
+                text_lines = []
+        elif start_ms is not None:
+            text_lines.append(line)
+        # else: cue index or stray text outside a cue
+
+    if start_ms is not None:
+        cue = _finish(start_ms, end_ms, text_lines)
+        if cue:
+            yield cue
+
+
+def parse_srt(content: str | bytes) -> list[Cue]:
+    """Parse a whole SRT document (str or raw UTF-8 bytes) into Cues"""
+    if isinstance(content, bytes):
+        stream = io.TextIOWrapper(io.BytesIO(content), encoding='utf-8-sig', errors='replace', newline=None)
+    else:
+        stream = io.StringIO(content, newline=None)
+    return list(iter_srt(stream))
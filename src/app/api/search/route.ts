@@ -1,6 +1,7 @@
 import { NextRequest, NextResponse } from "next/server";
 import { createServiceClient } from "@/lib/supabase";
 import { checkRateLimit } from "@/lib/rate-limit";
+import { normalizedQueryParams } from "@/lib/normalize";
 
 // Node.js runtime (NOT edge) — required for in-memory rate limiter to persist
 // across requests on the same warm instance. Edge isolates get fresh memory per
@@ -27,10 +28,11 @@ export async function GET(request: NextRequest) {
   }
 
   const supabase = createServiceClient();
-  const { data, error } = await supabase.rpc("search_dialogues", {
+  const { data, error } = await supabase.rpc("search_dialogues_fuzzy", {
     search_query: query,
     result_limit: limit,
     result_offset: offset,
+    ...normalizedQueryParams(query),
   });
 
   if (error) {
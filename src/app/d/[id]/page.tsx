@@ -2,6 +2,7 @@ import type { Metadata } from "next";
 import { notFound } from "next/navigation";
 import { createServiceClient } from "@/lib/supabase";
 import {
+  cueStartMs,
   getYouTubeEmbedUrl,
   formatTimestamp,
   getWhatsAppShareText,
@@ -13,6 +14,7 @@ import SearchBox from "@/components/SearchBox";
 
 interface Props {
   params: Promise<{ id: string }>;
+  searchParams: Promise<{ q?: string }>;
 }
 
 async function getScene(id: string) {
@@ -72,15 +74,17 @@ export async function generateMetadata({ params }: Props): Promise<Metadata> {
   };
 }
 
-export default async function ScenePage({ params }: Props) {
+export default async function ScenePage({ params, searchParams }: Props) {
   const { id } = await params;
+  const { q } = await searchParams;
   const scene = await getScene(id);
   if (!scene) notFound();
 
   const movie = scene.movie as { id: string; title: string; title_tamil: string | null; year: number; youtube_video_id: string; actors: string[]; director: string | null; poster_url: string | null };
   const moreFromMovie = await getMoreFromMovie(movie.id, id);
   const shareUrl = getSceneShareUrl(id);
-  const embedUrl = getYouTubeEmbedUrl(movie.youtube_video_id, scene.start_ms);
+  // Coming from a search, start at the cue inside the segment that matched
+  const embedUrl = getYouTubeEmbedUrl(movie.youtube_video_id, cueStartMs(scene, q));
 
   const movieSlug = movie.title.toLowerCase().replace(/[^a-z0-9]+/g, "-") + "-" + movie.year;
   const whatsappText = getWhatsAppShareText(scene.text, movie.title, movie.year, shareUrl);
@@ -5,6 +5,7 @@ import { checkRateLimit } from "@/lib/rate-limit";
 import SearchBox from "@/components/SearchBox";
 import SearchResults from "@/components/SearchResults";
 import Link from "next/link";
+import { normalizedQueryParams } from "@/lib/normalize";
 
 interface Props {
   searchParams: Promise<{ q?: string; page?: string }>;
@@ -37,10 +38,11 @@ async function getSearchResults(query: string, page: number) {
   const limit = 20;
   const offset = (page - 1) * limit;
 
-  const { data, error } = await supabase.rpc("search_dialogues", {
+  const { data, error } = await supabase.rpc("search_dialogues_fuzzy", {
     search_query: query,
     result_limit: limit,
     result_offset: offset,
+    ...normalizedQueryParams(query),
   });
 
   if (error) {
@@ -91,7 +93,7 @@ export default async function SearchPage({ searchParams }: Props) {
                 ? `Found ${results.length} scenes for "${query}"`
                 : `No results for "${query}"`}
             </p>
-            <SearchResults results={results} />
+            <SearchResults results={results} query={query} />
 
             {results.length === 0 && (
               <div className="text-center py-16">
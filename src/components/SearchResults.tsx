@@ -5,9 +5,11 @@ import { formatTimestamp, getYouTubeThumbnail } from "@/lib/search";
 
 interface Props {
   results: SearchResult[];
+  // Passed on to the scene page so it can seek to the matching cue
+  query?: string;
 }
 
-export default function SearchResults({ results }: Props) {
+export default function SearchResults({ results, query }: Props) {
   if (!results.length) return null;
 
   return (
@@ -15,7 +17,7 @@ export default function SearchResults({ results }: Props) {
       {results.map((result) => (
         <Link
           key={result.segment_id}
-          href={`/d/${result.segment_id}`}
+          href={query ? `/d/${result.segment_id}?q=${encodeURIComponent(query)}` : `/d/${result.segment_id}`}
           className="block bg-[#1A1A1A] border border-[#2A2A2A] rounded-xl p-4 hover:border-[#E63946] transition-all group"
         >
           <div className="flex gap-4">
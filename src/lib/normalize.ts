@@ -0,0 +1,95 @@
+/**
+ * Query-side text normalization for cross-script dialogue search.
+ *
+ * Mirrors scripts/vasanam/normalize.py table for table: segments are
+ * normalized at ingest time, so a query must be folded the same way before
+ * it is matched against text_latin / phonetic_key (migration 004).
+ * Change both files together.
+ *
+ * Example: "நான் பாரு", "naan paaru" and "nan paru" all have the
+ * phonetic key "nan paru".
+ */
+
+const VOWELS: Record<string, string> = {
+  "அ": "a", "ஆ": "aa", "இ": "i", "ஈ": "ee", "உ": "u", "ஊ": "oo",
+  "எ": "e", "ஏ": "ae", "ஐ": "ai", "ஒ": "o", "ஓ": "o", "ஔ": "au",
+};
+const CONSONANTS: Record<string, string> = {
+  "க": "k", "ங": "ng", "ச": "ch", "ஞ": "nj", "ட": "d", "ண": "n",
+  "த": "th", "ந": "n", "ப": "p", "ம": "m", "ய": "y", "ர": "r",
+  "ல": "l", "வ": "v", "ழ": "zh", "ள": "l", "ற": "r", "ன": "n",
+  // Grantha
+  "ஜ": "j", "ஷ": "sh", "ஸ": "s", "ஹ": "h", "ஶ": "sh",
+};
+const VOWEL_SIGNS: Record<string, string> = {
+  "ா": "aa", "ி": "i", "ீ": "ee", "ு": "u", "ூ": "oo", "ெ": "e",
+  "ே": "ae", "ை": "ai", "ொ": "o", "ோ": "o", "ௌ": "au", "ௗ": "au",
+};
+const PULLI = "்";
+const CLUSTERS: [string, string][] = [["ngk", "ng"], ["njch", "nj"], ["dd", "tt"], ["rr", "tr"]];
+const OTHER: Record<string, string> = { "ஃ": "h" };
+for (let d = 0; d < 10; d++) OTHER[String.fromCharCode(0x0be6 + d)] = String(d);
+
+const PHONETIC_FOLDS: [string, string][] = [
+  ["ee", "i"], ["ii", "i"], ["oo", "u"], ["uu", "u"], ["aa", "a"], ["ae", "e"],
+  ["zh", "l"], ["th", "t"], ["dh", "t"], ["d", "t"],
+  ["sh", "s"], ["ch", "s"], ["z", "s"], ["c", "k"], ["q", "k"],
+  ["kh", "k"], ["gh", "k"], ["g", "k"], ["ph", "p"], ["bh", "p"], ["f", "p"], ["b", "p"],
+  ["w", "v"], ["x", "ks"],
+];
+const TAMIL_RE = /[஀-௿]/;
+
+function transliterateWord(word: string): string {
+  if (!TAMIL_RE.test(word)) return word.toLowerCase();
+  const out: string[] = [];
+  let pendingA = false; // last char was a consonant still carrying its inherent vowel
+  for (const ch of word.normalize("NFC")) {
+    if (ch in VOWEL_SIGNS) {
+      out.push(VOWEL_SIGNS[ch]);
+      pendingA = false;
+      continue;
+    }
+    if (ch === PULLI) {
+      pendingA = false;
+      continue;
+    }
+    if (pendingA) {
+      out.push("a");
+      pendingA = false;
+    }
+    if (ch in CONSONANTS) {
+      out.push(CONSONANTS[ch]);
+      pendingA = true;
+    } else if (ch in VOWELS) {
+      out.push(VOWELS[ch]);
+    } else {
+      out.push(OTHER[ch] ?? ch.toLowerCase());
+    }
+  }
+  if (pendingA) out.push("a");
+  let latin = out.join("");
+  for (const [src, dst] of CLUSTERS) latin = latin.split(src).join(dst);
+  return latin;
+}
+
+function phoneticWord(latin: string): string {
+  let word = latin.toLowerCase().replace(/[^a-z0-9]+/g, "");
+  for (const [src, dst] of PHONETIC_FOLDS) word = word.split(src).join(dst);
+  return word.replace(/(.)\1+/g, "$1");
+}
+
+/** Tamil script → Tanglish-style Latin; other text is lower-cased */
+export function transliterate(text: string): string {
+  return text.split(/\s+/).filter(Boolean).map(transliterateWord).join(" ");
+}
+
+/** Spelling-variant-insensitive key for (already transliterated) text */
+export function phoneticKey(text: string): string {
+  return text.split(/\s+/).filter(Boolean).map(phoneticWord).filter(Boolean).join(" ");
+}
+
+/** The extra search_dialogues() arguments for a raw user query */
+export function normalizedQueryParams(query: string): { search_latin: string; search_key: string } {
+  const latin = transliterate(query);
+  return { search_latin: latin, search_key: phoneticKey(latin) };
+}
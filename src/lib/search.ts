@@ -1,4 +1,5 @@
-import { getSupabase, SearchResult } from "./supabase";
+import { getSupabase, SearchResult, Segment } from "./supabase";
+import { normalizedQueryParams, phoneticKey, transliterate } from "./normalize";
 
 export async function searchDialogues(
   query: string,
@@ -8,11 +9,15 @@ export async function searchDialogues(
   if (!query.trim()) return { results: [], total: 0 };
 
   // Postgres full-text search across Tamil + Tanglish + English segments
-  // Uses simple dictionary (language-agnostic) for Tamil/Tanglish support
-  const { data, error, count } = await getSupabase().rpc("search_dialogues", {
+  // Uses simple dictionary (language-agnostic) for Tamil/Tanglish support;
+  // the transliterated + phonetic forms let "naan", "nan" and "நான்" match.
+  // Whole phrases (even split across two subtitles) rank above scattered
+  // words, and a trigram fallback catches partial lines and typos
+  const { data, error, count } = await getSupabase().rpc("search_dialogues_fuzzy", {
     search_query: query.trim(),
     result_limit: limit,
     result_offset: offset,
+    ...normalizedQueryParams(query.trim()),
   });
 
   if (error) {
@@ -26,6 +31,30 @@ export async function searchDialogues(
   };
 }
 
+// A compacted segment spans several cues; start the player at the cue that
+// shares the most words with the query (compared by phonetic key, so a
+// Tanglish query finds its Tamil-script cue), or at the segment's start
+export function cueStartMs(
+  segment: Pick<Segment, "text" | "start_ms" | "cue_offsets" | "cue_chars">,
+  query?: string
+): number {
+  const { cue_offsets: offsets, cue_chars: chars } = segment;
+  if (!query?.trim() || !offsets?.length || !chars?.length) return segment.start_ms;
+
+  const wanted = new Set(phoneticKey(transliterate(query)).split(" ").filter(Boolean));
+  let best = 0;
+  let bestScore = 0;
+  chars.forEach((from, i) => {
+    const cue = segment.text.slice(from, chars[i + 1]);
+    const score = phoneticKey(transliterate(cue)).split(" ").filter((w) => wanted.has(w)).length;
+    if (score > bestScore) {
+      best = i;
+      bestScore = score;
+    }
+  });
+  return segment.start_ms + (offsets[best] ?? 0);
+}
+
 export function getYouTubeEmbedUrl(
   videoId: string,
   startMs: number
@@ -52,6 +52,9 @@ export interface Segment {
   start_ms: number;
   duration_ms: number;
   language: string;
+  // Cue windows (migration 008): where each merged cue starts; null for one cue
+  cue_offsets: number[] | null;
+  cue_chars: number[] | null;
   created_at: string;
   // Joined
   movie?: Movie;
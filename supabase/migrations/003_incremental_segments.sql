@@ -0,0 +1,48 @@
+-- Vasanam: Tamil movie dialogue search
+-- Migration 003: Incremental segment sync
+--
+-- Re-ingesting a movie used to delete every segment and insert them all again,
+-- rewriting each row's GIN search_vector entry and leaving the movie with no
+-- searchable segments until the last insert batch landed.
+--
+-- content_hash identifies a segment by (start_ms, text). The ingest scripts
+-- compute the same md5 locally, fetch the movie's existing hashes, and send
+-- only the difference to sync_movie_segments(), which applies it in a single
+-- transaction. An unchanged movie produces no writes at all.
+
+ALTER TABLE vasanam_segments
+ADD COLUMN IF NOT EXISTS content_hash TEXT GENERATED ALWAYS AS (
+  md5(start_ms::text || '|' || text)
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_vasanam_segments_movie_hash ON vasanam_segments(movie_id, content_hash);
+
+-- Insert new rows and delete stale ones atomically
+CREATE OR REPLACE FUNCTION sync_movie_segments(
+  p_movie_id UUID,
+  p_insert JSONB,     -- [{text, start_ms, duration_ms, language}, ...]
+  p_stale UUID[]      -- segment ids to remove
+)
+RETURNS TABLE (inserted INT, deleted INT)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  n_inserted INT;
+  n_deleted INT;
+BEGIN
+  INSERT INTO vasanam_segments (movie_id, text, start_ms, duration_ms, language)
+  SELECT p_movie_id, r.text, r.start_ms, r.duration_ms, r.language
+  FROM jsonb_to_recordset(COALESCE(p_insert, '[]'::jsonb))
+    AS r(text TEXT, start_ms INT, duration_ms INT, language TEXT);
+  GET DIAGNOSTICS n_inserted = ROW_COUNT;
+
+  DELETE FROM vasanam_segments
+  WHERE movie_id = p_movie_id AND id = ANY(COALESCE(p_stale, '{}'));
+  GET DIAGNOSTICS n_deleted = ROW_COUNT;
+
+  RETURN QUERY SELECT n_inserted, n_deleted;
+END;
+$$;
+
+-- Writes are for the ingest scripts (service role) only
+REVOKE EXECUTE ON FUNCTION sync_movie_segments(UUID, JSONB, UUID[]) FROM PUBLIC, anon, authenticated;
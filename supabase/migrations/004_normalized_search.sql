@@ -0,0 +1,120 @@
+-- Vasanam: Tamil movie dialogue search
+-- Migration 004: Transliterated + phonetic search columns
+--
+-- search_vector is to_tsvector('simple', text), so Tamil-script subtitles
+-- (OpenSubtitles) and Tanglish transcripts (Gemini) never match each other,
+-- and neither matches a differently spelled query ("naan" vs "nan").
+--
+-- The ingest scripts now store two normalized forms of every segment,
+-- computed in Python by scripts/vasanam/normalize.py:
+--   text_latin    Tamil script transliterated to Tanglish-style Latin
+--   phonetic_key  text_latin with long vowels, doubled consonants and
+--                 common spelling variants folded away
+-- norm_vector indexes both, and search_dialogues() matches the query's own
+-- normalized forms (computed by src/lib/normalize.ts) against it, so
+-- cross-script and spelling-variant queries stay on a GIN index.
+--
+-- Rows ingested before this migration have NULLs here until the movie is
+-- re-ingested with a full reload.
+
+ALTER TABLE vasanam_segments
+ADD COLUMN IF NOT EXISTS text_latin TEXT,
+ADD COLUMN IF NOT EXISTS phonetic_key TEXT;
+
+ALTER TABLE vasanam_segments
+ADD COLUMN IF NOT EXISTS norm_vector tsvector GENERATED ALWAYS AS (
+  setweight(to_tsvector('simple', COALESCE(text_latin, '')), 'A') ||
+  setweight(to_tsvector('simple', COALESCE(phonetic_key, '')), 'B')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_vasanam_segments_norm ON vasanam_segments USING GIN(norm_vector);
+
+-- Incremental sync carries the normalized columns too
+CREATE OR REPLACE FUNCTION sync_movie_segments(
+  p_movie_id UUID,
+  p_insert JSONB,     -- [{text, start_ms, duration_ms, language, text_latin, phonetic_key}, ...]
+  p_stale UUID[]      -- segment ids to remove
+)
+RETURNS TABLE (inserted INT, deleted INT)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  n_inserted INT;
+  n_deleted INT;
+BEGIN
+  INSERT INTO vasanam_segments (movie_id, text, start_ms, duration_ms, language, text_latin, phonetic_key)
+  SELECT p_movie_id, r.text, r.start_ms, r.duration_ms, r.language, r.text_latin, r.phonetic_key
+  FROM jsonb_to_recordset(COALESCE(p_insert, '[]'::jsonb))
+    AS r(text TEXT, start_ms INT, duration_ms INT, language TEXT, text_latin TEXT, phonetic_key TEXT);
+  GET DIAGNOSTICS n_inserted = ROW_COUNT;
+
+  DELETE FROM vasanam_segments
+  WHERE movie_id = p_movie_id AND id = ANY(COALESCE(p_stale, '{}'));
+  GET DIAGNOSTICS n_deleted = ROW_COUNT;
+
+  RETURN QUERY SELECT n_inserted, n_deleted;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION sync_movie_segments(UUID, JSONB, UUID[]) FROM PUBLIC, anon, authenticated;
+
+-- search_dialogues gains the query's normalized forms. Exact matches on the
+-- original text still rank first; transliterated and phonetic matches follow.
+DROP FUNCTION IF EXISTS search_dialogues(TEXT, INT, INT);
+
+CREATE OR REPLACE FUNCTION search_dialogues(
+  search_query TEXT,
+  result_limit INT DEFAULT 20,
+  result_offset INT DEFAULT 0,
+  search_latin TEXT DEFAULT NULL,   -- normalize.transliterate(search_query)
+  search_key TEXT DEFAULT NULL      -- normalize.phonetic_key(search_latin)
+)
+RETURNS TABLE (
+  segment_id UUID,
+  movie_id UUID,
+  text TEXT,
+  start_ms INT,
+  duration_ms INT,
+  language TEXT,
+  movie_title TEXT,
+  movie_year INT,
+  youtube_video_id TEXT,
+  poster_url TEXT,
+  actors TEXT[],
+  director TEXT,
+  rank FLOAT4
+)
+LANGUAGE SQL
+STABLE
+AS $$
+  WITH q AS (
+    SELECT
+      plainto_tsquery('simple', search_query) AS exact,
+      plainto_tsquery('simple', COALESCE(search_latin, lower(search_query))) AS latin,
+      plainto_tsquery('simple', COALESCE(search_key, '')) AS phonetic
+  )
+  SELECT
+    s.id AS segment_id,
+    s.movie_id,
+    s.text,
+    s.start_ms,
+    s.duration_ms,
+    s.language,
+    m.title AS movie_title,
+    m.year AS movie_year,
+    m.youtube_video_id,
+    m.poster_url,
+    m.actors,
+    m.director,
+    (2 * ts_rank(s.search_vector, q.exact)
+       + ts_rank(s.norm_vector, q.latin)
+       + 0.5 * ts_rank(s.norm_vector, q.phonetic))::FLOAT4 AS rank
+  FROM q, vasanam_segments s
+  JOIN vasanam_movies m ON s.movie_id = m.id
+  WHERE s.search_vector @@ q.exact
+     OR s.norm_vector @@ q.latin
+     OR s.norm_vector @@ q.phonetic
+  ORDER BY rank DESC, s.start_ms ASC
+  LIMIT result_limit
+  OFFSET result_offset;
+$$;
@@ -0,0 +1,125 @@
+-- Vasanam: Tamil movie dialogue search
+-- Migration 005: Trigram search for partial and misspelled queries
+--
+-- search_dialogues() matches whole tokens only, so half a punch line
+-- ("thadava sonn") or a typo ("thadvai") finds nothing, and ILIKE '%...%'
+-- scans every segment. pg_trgm GIN indexes on the normalized columns from
+-- migration 004 answer both from the index:
+--
+--   text_latin    substring / typo matches, in either script
+--   phonetic_key  the same after spelling-variant folding
+--
+-- search_dialogues_fuzzy() takes the tsvector path first (cheap, exact) and
+-- falls back to trigram word_similarity only when that finds nothing,
+-- ranking by similarity above min_similarity.
+--
+-- Segments ingested before migration 004 have no normalized columns and are
+-- invisible to the trigram path until filled in — see
+-- scripts/backfill-normalized.py and fill_segment_norm() below.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_vasanam_segments_latin_trgm
+  ON vasanam_segments USING GIN (text_latin gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_vasanam_segments_phonetic_trgm
+  ON vasanam_segments USING GIN (phonetic_key gin_trgm_ops);
+
+-- Partial index so the backfill finds what's left without a scan
+CREATE INDEX IF NOT EXISTS idx_vasanam_segments_unnormalized
+  ON vasanam_segments (id) WHERE phonetic_key IS NULL;
+
+CREATE OR REPLACE FUNCTION search_dialogues_fuzzy(
+  search_query TEXT,
+  result_limit INT DEFAULT 20,
+  result_offset INT DEFAULT 0,
+  search_latin TEXT DEFAULT NULL,
+  search_key TEXT DEFAULT NULL,
+  min_similarity REAL DEFAULT 0.45
+)
+RETURNS TABLE (
+  segment_id UUID,
+  movie_id UUID,
+  text TEXT,
+  start_ms INT,
+  duration_ms INT,
+  language TEXT,
+  movie_title TEXT,
+  movie_year INT,
+  youtube_video_id TEXT,
+  poster_url TEXT,
+  actors TEXT[],
+  director TEXT,
+  rank FLOAT4
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+  q_latin TEXT := COALESCE(search_latin, lower(search_query));
+  q_key TEXT := COALESCE(search_key, '');
+BEGIN
+  -- Fast path: any whole-token match at all means the tsvector ranking is
+  -- the one to page through
+  IF EXISTS (
+    SELECT 1 FROM vasanam_segments s
+    WHERE s.search_vector @@ plainto_tsquery('simple', search_query)
+       OR s.norm_vector @@ plainto_tsquery('simple', q_latin)
+       OR s.norm_vector @@ plainto_tsquery('simple', q_key)
+  ) THEN
+    RETURN QUERY
+    SELECT * FROM search_dialogues(search_query, result_limit, result_offset, search_latin, search_key);
+    RETURN;
+  END IF;
+
+  -- <% is "query is similar to some part of the column", and uses the
+  -- trigram indexes; the threshold is scoped to this transaction
+  PERFORM set_config('pg_trgm.word_similarity_threshold', min_similarity::TEXT, true);
+
+  RETURN QUERY
+  SELECT
+    s.id,
+    s.movie_id,
+    s.text,
+    s.start_ms,
+    s.duration_ms,
+    s.language,
+    m.title,
+    m.year,
+    m.youtube_video_id,
+    m.poster_url,
+    m.actors,
+    m.director,
+    GREATEST(
+      word_similarity(q_latin, s.text_latin),
+      CASE WHEN q_key <> '' THEN word_similarity(q_key, s.phonetic_key) ELSE 0 END
+    )::FLOAT4 AS rank
+  FROM vasanam_segments s
+  JOIN vasanam_movies m ON s.movie_id = m.id
+  WHERE q_latin <% s.text_latin
+     OR (q_key <> '' AND q_key <% s.phonetic_key)
+  ORDER BY 13 DESC, s.start_ms ASC  -- rank (the OUT parameter shadows the alias)
+  LIMIT result_limit
+  OFFSET result_offset;
+END;
+$$;
+
+-- Fill in text_latin / phonetic_key for rows that predate migration 004, or
+-- that an incremental sync left unchanged: [{id, text_latin, phonetic_key}, ...]
+CREATE OR REPLACE FUNCTION fill_segment_norm(p_rows JSONB)
+RETURNS INT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  n_updated INT;
+BEGIN
+  UPDATE vasanam_segments s
+  SET text_latin = r.text_latin, phonetic_key = r.phonetic_key
+  FROM jsonb_to_recordset(COALESCE(p_rows, '[]'::jsonb))
+    AS r(id UUID, text_latin TEXT, phonetic_key TEXT)
+  WHERE s.id = r.id;
+  GET DIAGNOSTICS n_updated = ROW_COUNT;
+  RETURN n_updated;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION fill_segment_norm(JSONB) FROM PUBLIC, anon, authenticated;
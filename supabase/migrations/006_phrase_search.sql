@@ -0,0 +1,269 @@
+-- Vasanam: Tamil movie dialogue search
+-- Migration 006: Phrase search across adjacent cues, with a capped ranking
+--
+-- plainto_tsquery ANDs the query's words, so "en vazhi thani vazhi" matches
+-- any segment containing those words in any order, and search_dialogues()
+-- ranks and sorts the entire match set before LIMIT/OFFSET.
+--
+-- search_dialogues_phrase() instead tries, in tiers:
+--   1  the exact phrase inside one segment (original text, transliterated
+--      or phonetic form)
+--   2  the phrase across a cue boundary, via context_latin / context_key:
+--      each cue joined with the one right after it, precomputed at ingest
+--      by normalize.with_context()
+--   3  all words anywhere in one segment (the old behaviour)
+-- Matches are scored by ts_rank_cd (cover density, so closer words rank
+-- higher); min_rank drops weak ones, and each tier keeps only its
+-- candidate_limit best. The cap doesn't move with result_offset, so every
+-- page is cut from the same ranking; raise candidate_limit to page deeper.
+--
+-- A query containing quotes, "or" or a leading "-" is read with
+-- websearch_to_tsquery, so users can still ask for "exact phrase" -other.
+--
+-- Existing rows get context columns from scripts/backfill-normalized.py or
+-- on their next incremental re-ingest.
+
+ALTER TABLE vasanam_segments
+ADD COLUMN IF NOT EXISTS context_latin TEXT,
+ADD COLUMN IF NOT EXISTS context_key TEXT;
+
+-- Two lexeme runs, so a phrase can't straddle the latin/phonetic seam
+ALTER TABLE vasanam_segments
+ADD COLUMN IF NOT EXISTS context_vector tsvector GENERATED ALWAYS AS (
+  setweight(to_tsvector('simple', COALESCE(context_latin, '')), 'A') ||
+  setweight(to_tsvector('simple', COALESCE(context_key, '')), 'B')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_vasanam_segments_context ON vasanam_segments USING GIN(context_vector);
+
+CREATE OR REPLACE FUNCTION sync_movie_segments(
+  p_movie_id UUID,
+  p_insert JSONB,     -- [{text, start_ms, duration_ms, language, text_latin, phonetic_key, context_latin, context_key}, ...]
+  p_stale UUID[]      -- segment ids to remove
+)
+RETURNS TABLE (inserted INT, deleted INT)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  n_inserted INT;
+  n_deleted INT;
+BEGIN
+  INSERT INTO vasanam_segments (movie_id, text, start_ms, duration_ms, language,
+                                text_latin, phonetic_key, context_latin, context_key)
+  SELECT p_movie_id, r.text, r.start_ms, r.duration_ms, r.language,
+         r.text_latin, r.phonetic_key, r.context_latin, r.context_key
+  FROM jsonb_to_recordset(COALESCE(p_insert, '[]'::jsonb))
+    AS r(text TEXT, start_ms INT, duration_ms INT, language TEXT,
+         text_latin TEXT, phonetic_key TEXT, context_latin TEXT, context_key TEXT);
+  GET DIAGNOSTICS n_inserted = ROW_COUNT;
+
+  DELETE FROM vasanam_segments
+  WHERE movie_id = p_movie_id AND id = ANY(COALESCE(p_stale, '{}'));
+  GET DIAGNOSTICS n_deleted = ROW_COUNT;
+
+  RETURN QUERY SELECT n_inserted, n_deleted;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION sync_movie_segments(UUID, JSONB, UUID[]) FROM PUBLIC, anon, authenticated;
+
+-- [{id, text_latin, phonetic_key, context_latin, context_key}, ...]
+CREATE OR REPLACE FUNCTION fill_segment_norm(p_rows JSONB)
+RETURNS INT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  n_updated INT;
+BEGIN
+  UPDATE vasanam_segments s
+  SET text_latin = r.text_latin, phonetic_key = r.phonetic_key,
+      context_latin = r.context_latin, context_key = r.context_key
+  FROM jsonb_to_recordset(COALESCE(p_rows, '[]'::jsonb))
+    AS r(id UUID, text_latin TEXT, phonetic_key TEXT, context_latin TEXT, context_key TEXT)
+  WHERE s.id = r.id;
+  GET DIAGNOSTICS n_updated = ROW_COUNT;
+  RETURN n_updated;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION fill_segment_norm(JSONB) FROM PUBLIC, anon, authenticated;
+
+CREATE OR REPLACE FUNCTION vasanam_phrase_query(q TEXT)
+RETURNS tsquery
+LANGUAGE SQL
+IMMUTABLE
+AS $$
+  SELECT CASE
+    WHEN q ~* '"|(^|\s)or(\s|$)|(^|\s)-\S' THEN websearch_to_tsquery('simple', q)
+    ELSE phraseto_tsquery('simple', q)
+  END;
+$$;
+
+CREATE OR REPLACE FUNCTION search_dialogues_phrase(
+  search_query TEXT,
+  result_limit INT DEFAULT 20,
+  result_offset INT DEFAULT 0,
+  search_latin TEXT DEFAULT NULL,
+  search_key TEXT DEFAULT NULL,
+  candidate_limit INT DEFAULT 200,  -- per tier; raise it to page deeper
+  min_rank REAL DEFAULT 0
+)
+RETURNS TABLE (
+  segment_id UUID,
+  movie_id UUID,
+  text TEXT,
+  start_ms INT,
+  duration_ms INT,
+  language TEXT,
+  movie_title TEXT,
+  movie_year INT,
+  youtube_video_id TEXT,
+  poster_url TEXT,
+  actors TEXT[],
+  director TEXT,
+  rank FLOAT4
+)
+LANGUAGE SQL
+STABLE
+AS $$
+  WITH q AS (
+    SELECT
+      vasanam_phrase_query(search_query) AS exact,
+      vasanam_phrase_query(COALESCE(search_latin, lower(search_query))) AS latin,
+      vasanam_phrase_query(COALESCE(search_key, '')) AS phonetic,
+      plainto_tsquery('simple', search_query) AS words,
+      plainto_tsquery('simple', COALESCE(search_latin, lower(search_query))) AS latin_words,
+      plainto_tsquery('simple', COALESCE(search_key, '')) AS phonetic_words
+  ),
+  candidates AS (
+    -- Each tier keeps its candidate_limit best matches, the same set on every page
+    (SELECT t.id, 1 AS tier, t.score
+     FROM (SELECT s.id,
+                  GREATEST(ts_rank_cd(s.search_vector, q.exact), ts_rank_cd(s.norm_vector, q.latin),
+                           ts_rank_cd(s.norm_vector, q.phonetic)) AS score
+           FROM q, vasanam_segments s
+           WHERE s.search_vector @@ q.exact OR s.norm_vector @@ q.latin OR s.norm_vector @@ q.phonetic) t
+     WHERE t.score >= min_rank
+     ORDER BY t.score DESC, t.id
+     LIMIT candidate_limit)
+    UNION ALL
+    (SELECT t.id, 2, t.score
+     FROM (SELECT s.id,
+                  GREATEST(ts_rank_cd(s.context_vector, q.latin), ts_rank_cd(s.context_vector, q.phonetic)) AS score
+           FROM q, vasanam_segments s
+           WHERE s.context_vector @@ q.latin OR s.context_vector @@ q.phonetic) t
+     WHERE t.score >= min_rank
+     ORDER BY t.score DESC, t.id
+     LIMIT candidate_limit)
+    UNION ALL
+    (SELECT t.id, 3, t.score
+     FROM (SELECT s.id,
+                  GREATEST(ts_rank_cd(s.search_vector, q.words), ts_rank_cd(s.norm_vector, q.latin_words),
+                           ts_rank_cd(s.norm_vector, q.phonetic_words)) AS score
+           FROM q, vasanam_segments s
+           WHERE s.search_vector @@ q.words OR s.norm_vector @@ q.latin_words OR s.norm_vector @@ q.phonetic_words) t
+     WHERE t.score >= min_rank
+     ORDER BY t.score DESC, t.id
+     LIMIT candidate_limit)
+  ),
+  best AS (
+    -- A segment found by several tiers keeps its best one
+    SELECT DISTINCT ON (c.id) c.id, c.tier, c.score
+    FROM candidates c
+    ORDER BY c.id, c.tier, c.score DESC
+  )
+  SELECT
+    s.id AS segment_id,
+    s.movie_id,
+    s.text,
+    s.start_ms,
+    s.duration_ms,
+    s.language,
+    m.title AS movie_title,
+    m.year AS movie_year,
+    m.youtube_video_id,
+    m.poster_url,
+    m.actors,
+    m.director,
+    -- Tiers stay in order: tier 1 lands in [2, 3), tier 2 in [1, 2), tier 3 in [0, 1)
+    ((4 - b.tier) - 1 / (1 + b.score))::FLOAT4 AS rank
+  FROM best b
+  JOIN vasanam_segments s ON s.id = b.id
+  JOIN vasanam_movies m ON s.movie_id = m.id
+  ORDER BY rank DESC, s.start_ms ASC, s.id
+  LIMIT result_limit
+  OFFSET result_offset;
+$$;
+
+-- The fuzzy search's fast path now goes through the phrase search
+CREATE OR REPLACE FUNCTION search_dialogues_fuzzy(
+  search_query TEXT,
+  result_limit INT DEFAULT 20,
+  result_offset INT DEFAULT 0,
+  search_latin TEXT DEFAULT NULL,
+  search_key TEXT DEFAULT NULL,
+  min_similarity REAL DEFAULT 0.45
+)
+RETURNS TABLE (
+  segment_id UUID,
+  movie_id UUID,
+  text TEXT,
+  start_ms INT,
+  duration_ms INT,
+  language TEXT,
+  movie_title TEXT,
+  movie_year INT,
+  youtube_video_id TEXT,
+  poster_url TEXT,
+  actors TEXT[],
+  director TEXT,
+  rank FLOAT4
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+  q_latin TEXT := COALESCE(search_latin, lower(search_query));
+  q_key TEXT := COALESCE(search_key, '');
+BEGIN
+  IF EXISTS (
+    SELECT 1 FROM vasanam_segments s
+    WHERE s.search_vector @@ plainto_tsquery('simple', search_query)
+       OR s.norm_vector @@ plainto_tsquery('simple', q_latin)
+       OR s.norm_vector @@ plainto_tsquery('simple', q_key)
+       OR s.context_vector @@ phraseto_tsquery('simple', q_latin)
+  ) THEN
+    RETURN QUERY
+    SELECT * FROM search_dialogues_phrase(search_query, result_limit, result_offset, search_latin, search_key);
+    RETURN;
+  END IF;
+
+  PERFORM set_config('pg_trgm.word_similarity_threshold', min_similarity::TEXT, true);
+
+  RETURN QUERY
+  SELECT
+    s.id,
+    s.movie_id,
+    s.text,
+    s.start_ms,
+    s.duration_ms,
+    s.language,
+    m.title,
+    m.year,
+    m.youtube_video_id,
+    m.poster_url,
+    m.actors,
+    m.director,
+    GREATEST(
+      word_similarity(q_latin, s.text_latin),
+      CASE WHEN q_key <> '' THEN word_similarity(q_key, s.phonetic_key) ELSE 0 END
+    )::FLOAT4 AS rank
+  FROM vasanam_segments s
+  JOIN vasanam_movies m ON s.movie_id = m.id
+  WHERE q_latin <% s.text_latin
+     OR (q_key <> '' AND q_key <% s.phonetic_key)
+  ORDER BY 13 DESC, s.start_ms ASC  -- rank (the OUT parameter shadows the alias)
+  LIMIT result_limit
+  OFFSET result_offset;
+END;
+$$;
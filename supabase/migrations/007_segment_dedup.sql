@@ -0,0 +1,337 @@
+-- Vasanam: Tamil movie dialogue search
+-- Migration 007: Cross-source near-duplicate segments
+--
+-- One film can be ingested several times under different youtube_video_ids
+-- (OpenSubtitles, Gemini, a trailer clip of the same film). Each segment now
+-- carries a MinHash signature of its phonetic_key and the LSH band keys
+-- derived from it (scripts/vasanam/dedup.py). At ingest,
+-- find_segment_candidates() returns the other movies' segments that share a
+-- band key with the incoming batch — a GIN lookup, so its cost follows the
+-- number of candidates rather than the size of the table.
+--
+-- Duplicates ingested with --dedup link keep their row but point at the
+-- segment they copy through duplicate_of; the search functions skip them.
+-- If that segment is deleted (e.g. its movie is re-ingested from scratch)
+-- the link is cleared and the row becomes searchable again.
+--
+-- Existing rows get signatures from scripts/backfill-normalized.py or on
+-- their next incremental re-ingest.
+
+ALTER TABLE vasanam_segments
+ADD COLUMN IF NOT EXISTS minhash INT[],
+ADD COLUMN IF NOT EXISTS lsh_bands BIGINT[],
+ADD COLUMN IF NOT EXISTS duplicate_of UUID REFERENCES vasanam_segments(id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS idx_vasanam_segments_lsh ON vasanam_segments USING GIN(lsh_bands);
+CREATE INDEX IF NOT EXISTS idx_vasanam_segments_duplicate_of ON vasanam_segments(duplicate_of)
+  WHERE duplicate_of IS NOT NULL;
+
+CREATE OR REPLACE FUNCTION find_segment_candidates(
+  p_movie_id UUID,    -- the movie being ingested; its own rows are never candidates
+  p_bands BIGINT[],
+  p_limit INT DEFAULT 50000
+)
+RETURNS TABLE (id UUID, movie_id UUID, start_ms INT, minhash INT[], lsh_bands BIGINT[])
+LANGUAGE SQL
+STABLE
+AS $$
+  SELECT s.id, s.movie_id, s.start_ms, s.minhash, s.lsh_bands
+  FROM vasanam_segments s
+  WHERE s.lsh_bands && p_bands
+    AND s.movie_id <> p_movie_id
+    AND s.duplicate_of IS NULL
+  ORDER BY s.id  -- stable pages for .range()
+  LIMIT p_limit;
+$$;
+
+REVOKE EXECUTE ON FUNCTION find_segment_candidates(UUID, BIGINT[], INT) FROM PUBLIC, anon, authenticated;
+
+CREATE OR REPLACE FUNCTION sync_movie_segments(
+  p_movie_id UUID,
+  p_insert JSONB,     -- [{text, start_ms, duration_ms, language, text_latin, phonetic_key, context_latin, context_key,
+                      --   minhash, lsh_bands, duplicate_of}, ...]
+  p_stale UUID[]      -- segment ids to remove
+)
+RETURNS TABLE (inserted INT, deleted INT)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  n_inserted INT;
+  n_deleted INT;
+BEGIN
+  INSERT INTO vasanam_segments (movie_id, text, start_ms, duration_ms, language,
+                                text_latin, phonetic_key, context_latin, context_key,
+                                minhash, lsh_bands, duplicate_of)
+  SELECT p_movie_id, r.text, r.start_ms, r.duration_ms, r.language,
+         r.text_latin, r.phonetic_key, r.context_latin, r.context_key,
+         r.minhash, r.lsh_bands, r.duplicate_of
+  FROM jsonb_to_recordset(COALESCE(p_insert, '[]'::jsonb))
+    AS r(text TEXT, start_ms INT, duration_ms INT, language TEXT,
+         text_latin TEXT, phonetic_key TEXT, context_latin TEXT, context_key TEXT,
+         minhash INT[], lsh_bands BIGINT[], duplicate_of UUID);
+  GET DIAGNOSTICS n_inserted = ROW_COUNT;
+
+  DELETE FROM vasanam_segments
+  WHERE movie_id = p_movie_id AND id = ANY(COALESCE(p_stale, '{}'));
+  GET DIAGNOSTICS n_deleted = ROW_COUNT;
+
+  RETURN QUERY SELECT n_inserted, n_deleted;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION sync_movie_segments(UUID, JSONB, UUID[]) FROM PUBLIC, anon, authenticated;
+
+-- [{id, text_latin, phonetic_key, context_latin, context_key, minhash, lsh_bands}, ...]
+CREATE OR REPLACE FUNCTION fill_segment_norm(p_rows JSONB)
+RETURNS INT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  n_updated INT;
+BEGIN
+  UPDATE vasanam_segments s
+  SET text_latin = r.text_latin, phonetic_key = r.phonetic_key,
+      context_latin = r.context_latin, context_key = r.context_key,
+      minhash = r.minhash, lsh_bands = r.lsh_bands
+  FROM jsonb_to_recordset(COALESCE(p_rows, '[]'::jsonb))
+    AS r(id UUID, text_latin TEXT, phonetic_key TEXT, context_latin TEXT, context_key TEXT,
+         minhash INT[], lsh_bands BIGINT[])
+  WHERE s.id = r.id;
+  GET DIAGNOSTICS n_updated = ROW_COUNT;
+  RETURN n_updated;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION fill_segment_norm(JSONB) FROM PUBLIC, anon, authenticated;
+
+-- Search skips linked duplicates; bodies are otherwise unchanged from 004-006
+CREATE OR REPLACE FUNCTION search_dialogues(
+  search_query TEXT,
+  result_limit INT DEFAULT 20,
+  result_offset INT DEFAULT 0,
+  search_latin TEXT DEFAULT NULL,
+  search_key TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+  segment_id UUID,
+  movie_id UUID,
+  text TEXT,
+  start_ms INT,
+  duration_ms INT,
+  language TEXT,
+  movie_title TEXT,
+  movie_year INT,
+  youtube_video_id TEXT,
+  poster_url TEXT,
+  actors TEXT[],
+  director TEXT,
+  rank FLOAT4
+)
+LANGUAGE SQL
+STABLE
+AS $$
+  WITH q AS (
+    SELECT
+      plainto_tsquery('simple', search_query) AS exact,
+      plainto_tsquery('simple', COALESCE(search_latin, lower(search_query))) AS latin,
+      plainto_tsquery('simple', COALESCE(search_key, '')) AS phonetic
+  )
+  SELECT
+    s.id AS segment_id,
+    s.movie_id,
+    s.text,
+    s.start_ms,
+    s.duration_ms,
+    s.language,
+    m.title AS movie_title,
+    m.year AS movie_year,
+    m.youtube_video_id,
+    m.poster_url,
+    m.actors,
+    m.director,
+    (2 * ts_rank(s.search_vector, q.exact)
+       + ts_rank(s.norm_vector, q.latin)
+       + 0.5 * ts_rank(s.norm_vector, q.phonetic))::FLOAT4 AS rank
+  FROM q, vasanam_segments s
+  JOIN vasanam_movies m ON s.movie_id = m.id
+  WHERE (s.search_vector @@ q.exact
+     OR s.norm_vector @@ q.latin
+     OR s.norm_vector @@ q.phonetic)
+    AND s.duplicate_of IS NULL
+  ORDER BY rank DESC, s.start_ms ASC
+  LIMIT result_limit
+  OFFSET result_offset;
+$$;
+
+CREATE OR REPLACE FUNCTION search_dialogues_phrase(
+  search_query TEXT,
+  result_limit INT DEFAULT 20,
+  result_offset INT DEFAULT 0,
+  search_latin TEXT DEFAULT NULL,
+  search_key TEXT DEFAULT NULL,
+  candidate_limit INT DEFAULT 200,  -- per tier; raise it to page deeper
+  min_rank REAL DEFAULT 0
+)
+RETURNS TABLE (
+  segment_id UUID,
+  movie_id UUID,
+  text TEXT,
+  start_ms INT,
+  duration_ms INT,
+  language TEXT,
+  movie_title TEXT,
+  movie_year INT,
+  youtube_video_id TEXT,
+  poster_url TEXT,
+  actors TEXT[],
+  director TEXT,
+  rank FLOAT4
+)
+LANGUAGE SQL
+STABLE
+AS $$
+  WITH q AS (
+    SELECT
+      vasanam_phrase_query(search_query) AS exact,
+      vasanam_phrase_query(COALESCE(search_latin, lower(search_query))) AS latin,
+      vasanam_phrase_query(COALESCE(search_key, '')) AS phonetic,
+      plainto_tsquery('simple', search_query) AS words,
+      plainto_tsquery('simple', COALESCE(search_latin, lower(search_query))) AS latin_words,
+      plainto_tsquery('simple', COALESCE(search_key, '')) AS phonetic_words
+  ),
+  candidates AS (
+    -- Each tier keeps its candidate_limit best matches, the same set on every page
+    (SELECT t.id, 1 AS tier, t.score
+     FROM (SELECT s.id,
+                  GREATEST(ts_rank_cd(s.search_vector, q.exact), ts_rank_cd(s.norm_vector, q.latin),
+                           ts_rank_cd(s.norm_vector, q.phonetic)) AS score
+           FROM q, vasanam_segments s
+           WHERE (s.search_vector @@ q.exact OR s.norm_vector @@ q.latin OR s.norm_vector @@ q.phonetic)
+             AND s.duplicate_of IS NULL) t
+     WHERE t.score >= min_rank
+     ORDER BY t.score DESC, t.id
+     LIMIT candidate_limit)
+    UNION ALL
+    (SELECT t.id, 2, t.score
+     FROM (SELECT s.id,
+                  GREATEST(ts_rank_cd(s.context_vector, q.latin), ts_rank_cd(s.context_vector, q.phonetic)) AS score
+           FROM q, vasanam_segments s
+           WHERE (s.context_vector @@ q.latin OR s.context_vector @@ q.phonetic)
+             AND s.duplicate_of IS NULL) t
+     WHERE t.score >= min_rank
+     ORDER BY t.score DESC, t.id
+     LIMIT candidate_limit)
+    UNION ALL
+    (SELECT t.id, 3, t.score
+     FROM (SELECT s.id,
+                  GREATEST(ts_rank_cd(s.search_vector, q.words), ts_rank_cd(s.norm_vector, q.latin_words),
+                           ts_rank_cd(s.norm_vector, q.phonetic_words)) AS score
+           FROM q, vasanam_segments s
+           WHERE (s.search_vector @@ q.words OR s.norm_vector @@ q.latin_words OR s.norm_vector @@ q.phonetic_words)
+             AND s.duplicate_of IS NULL) t
+     WHERE t.score >= min_rank
+     ORDER BY t.score DESC, t.id
+     LIMIT candidate_limit)
+  ),
+  best AS (
+    -- A segment found by several tiers keeps its best one
+    SELECT DISTINCT ON (c.id) c.id, c.tier, c.score
+    FROM candidates c
+    ORDER BY c.id, c.tier, c.score DESC
+  )
+  SELECT
+    s.id AS segment_id,
+    s.movie_id,
+    s.text,
+    s.start_ms,
+    s.duration_ms,
+    s.language,
+    m.title AS movie_title,
+    m.year AS movie_year,
+    m.youtube_video_id,
+    m.poster_url,
+    m.actors,
+    m.director,
+    -- Tiers stay in order: tier 1 lands in [2, 3), tier 2 in [1, 2), tier 3 in [0, 1)
+    ((4 - b.tier) - 1 / (1 + b.score))::FLOAT4 AS rank
+  FROM best b
+  JOIN vasanam_segments s ON s.id = b.id
+  JOIN vasanam_movies m ON s.movie_id = m.id
+  ORDER BY rank DESC, s.start_ms ASC, s.id
+  LIMIT result_limit
+  OFFSET result_offset;
+$$;
+
+CREATE OR REPLACE FUNCTION search_dialogues_fuzzy(
+  search_query TEXT,
+  result_limit INT DEFAULT 20,
+  result_offset INT DEFAULT 0,
+  search_latin TEXT DEFAULT NULL,
+  search_key TEXT DEFAULT NULL,
+  min_similarity REAL DEFAULT 0.45
+)
+RETURNS TABLE (
+  segment_id UUID,
+  movie_id UUID,
+  text TEXT,
+  start_ms INT,
+  duration_ms INT,
+  language TEXT,
+  movie_title TEXT,
+  movie_year INT,
+  youtube_video_id TEXT,
+  poster_url TEXT,
+  actors TEXT[],
+  director TEXT,
+  rank FLOAT4
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+  q_latin TEXT := COALESCE(search_latin, lower(search_query));
+  q_key TEXT := COALESCE(search_key, '');
+BEGIN
+  IF EXISTS (
+    SELECT 1 FROM vasanam_segments s
+    WHERE (s.search_vector @@ plainto_tsquery('simple', search_query)
+       OR s.norm_vector @@ plainto_tsquery('simple', q_latin)
+       OR s.norm_vector @@ plainto_tsquery('simple', q_key)
+       OR s.context_vector @@ phraseto_tsquery('simple', q_latin))
+      AND s.duplicate_of IS NULL
+  ) THEN
+    RETURN QUERY
+    SELECT * FROM search_dialogues_phrase(search_query, result_limit, result_offset, search_latin, search_key);
+    RETURN;
+  END IF;
+
+  PERFORM set_config('pg_trgm.word_similarity_threshold', min_similarity::TEXT, true);
+
+  RETURN QUERY
+  SELECT
+    s.id,
+    s.movie_id,
+    s.text,
+    s.start_ms,
+    s.duration_ms,
+    s.language,
+    m.title,
+    m.year,
+    m.youtube_video_id,
+    m.poster_url,
+    m.actors,
+    m.director,
+    GREATEST(
+      word_similarity(q_latin, s.text_latin),
+      CASE WHEN q_key <> '' THEN word_similarity(q_key, s.phonetic_key) ELSE 0 END
+    )::FLOAT4 AS rank
+  FROM vasanam_segments s
+  JOIN vasanam_movies m ON s.movie_id = m.id
+  WHERE (q_latin <% s.text_latin
+     OR (q_key <> '' AND q_key <% s.phonetic_key))
+    AND s.duplicate_of IS NULL
+  ORDER BY 13 DESC, s.start_ms ASC  -- rank (the OUT parameter shadows the alias)
+  LIMIT result_limit
+  OFFSET result_offset;
+END;
+$$;
@@ -0,0 +1,50 @@
+-- Vasanam: Tamil movie dialogue search
+-- Migration 008: Cue windows
+--
+-- With --compact, the ingest scripts merge adjacent cues into one segment
+-- per speaker turn (scripts/vasanam/compact.py): several times fewer rows
+-- and GIN entries, and a line spoken across cues is found in a single row.
+-- A window remembers where its cues start, so the player can still seek to
+-- the cue that matched:
+--   cue_offsets  ms from the segment's start_ms, one per cue
+--   cue_chars    index into text where each cue begins
+-- Both are NULL for a segment holding one cue (every pre-008 row).
+
+ALTER TABLE vasanam_segments
+ADD COLUMN IF NOT EXISTS cue_offsets INT[],
+ADD COLUMN IF NOT EXISTS cue_chars INT[];
+
+CREATE OR REPLACE FUNCTION sync_movie_segments(
+  p_movie_id UUID,
+  p_insert JSONB,     -- [{text, start_ms, duration_ms, language, text_latin, phonetic_key, context_latin, context_key,
+                      --   minhash, lsh_bands, duplicate_of, cue_offsets, cue_chars}, ...]
+  p_stale UUID[]      -- segment ids to remove
+)
+RETURNS TABLE (inserted INT, deleted INT)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  n_inserted INT;
+  n_deleted INT;
+BEGIN
+  INSERT INTO vasanam_segments (movie_id, text, start_ms, duration_ms, language,
+                                text_latin, phonetic_key, context_latin, context_key,
+                                minhash, lsh_bands, duplicate_of, cue_offsets, cue_chars)
+  SELECT p_movie_id, r.text, r.start_ms, r.duration_ms, r.language,
+         r.text_latin, r.phonetic_key, r.context_latin, r.context_key,
+         r.minhash, r.lsh_bands, r.duplicate_of, r.cue_offsets, r.cue_chars
+  FROM jsonb_to_recordset(COALESCE(p_insert, '[]'::jsonb))
+    AS r(text TEXT, start_ms INT, duration_ms INT, language TEXT,
+         text_latin TEXT, phonetic_key TEXT, context_latin TEXT, context_key TEXT,
+         minhash INT[], lsh_bands BIGINT[], duplicate_of UUID, cue_offsets INT[], cue_chars INT[]);
+  GET DIAGNOSTICS n_inserted = ROW_COUNT;
+
+  DELETE FROM vasanam_segments
+  WHERE movie_id = p_movie_id AND id = ANY(COALESCE(p_stale, '{}'));
+  GET DIAGNOSTICS n_deleted = ROW_COUNT;
+
+  RETURN QUERY SELECT n_inserted, n_deleted;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION sync_movie_segments(UUID, JSONB, UUID[]) FROM PUBLIC, anon, authenticated;
@@ -0,0 +1,145 @@
+-- Vasanam: Tamil movie dialogue search
+-- Migration 009: Segment vectors (pgvector) and hybrid search
+--
+-- People often remember the gist of a line, not its words. Each segment
+-- gets a 256-d vector (scripts/vasanam/embed.py: feature-hashed words and
+-- character n-grams of its phonetic_key, computed on CPU) with an HNSW
+-- index. search_dialogues_hybrid() merges the phrase search's ranking with
+-- the nearest vectors by reciprocal rank fusion:
+--   score = Σ 1 / (rrf_k + rank in each list)
+-- so a row near the top of either list surfaces, and one near the top of
+-- both wins. The caller computes query_embedding the same way
+-- (embed_text() in scripts/vasanam/embed.py).
+--
+-- Embedding is incremental: new and changed segments are new rows with a
+-- NULL embedding; scripts/embed-segments.py (or --embed on the ingest
+-- scripts) fills only those. To re-embed everything after changing the
+-- features, set the column back to NULL.
+
+CREATE EXTENSION IF NOT EXISTS vector;
+
+ALTER TABLE vasanam_segments
+ADD COLUMN IF NOT EXISTS embedding vector(256);
+
+CREATE INDEX IF NOT EXISTS idx_vasanam_segments_embedding ON vasanam_segments
+  USING hnsw (embedding vector_cosine_ops);
+-- Keyset walk over the rows still waiting for a vector
+CREATE INDEX IF NOT EXISTS idx_vasanam_segments_embedding_pending ON vasanam_segments(id)
+  WHERE embedding IS NULL;
+
+CREATE OR REPLACE FUNCTION pending_segment_embeddings(
+  p_after UUID DEFAULT NULL,
+  p_limit INT DEFAULT 500,
+  p_movie_id UUID DEFAULT NULL
+)
+RETURNS TABLE (id UUID, text TEXT, phonetic_key TEXT)
+LANGUAGE SQL
+STABLE
+AS $$
+  SELECT s.id, s.text, s.phonetic_key
+  FROM vasanam_segments s
+  WHERE s.embedding IS NULL
+    AND s.phonetic_key IS DISTINCT FROM ''  -- wordless: nothing to embed, don't refetch every run
+    AND (p_after IS NULL OR s.id > p_after)
+    AND (p_movie_id IS NULL OR s.movie_id = p_movie_id)
+  ORDER BY s.id
+  LIMIT p_limit;
+$$;
+
+REVOKE EXECUTE ON FUNCTION pending_segment_embeddings(UUID, INT, UUID) FROM PUBLIC, anon, authenticated;
+
+-- [{id, embedding: "[0.1,...]"}, ...]
+CREATE OR REPLACE FUNCTION fill_segment_embeddings(p_rows JSONB)
+RETURNS INT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  n_updated INT;
+BEGIN
+  UPDATE vasanam_segments s
+  SET embedding = r.embedding::vector
+  FROM jsonb_to_recordset(COALESCE(p_rows, '[]'::jsonb)) AS r(id UUID, embedding TEXT)
+  WHERE s.id = r.id;
+  GET DIAGNOSTICS n_updated = ROW_COUNT;
+  RETURN n_updated;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION fill_segment_embeddings(JSONB) FROM PUBLIC, anon, authenticated;
+
+CREATE OR REPLACE FUNCTION search_dialogues_hybrid(
+  search_query TEXT,
+  result_limit INT DEFAULT 20,
+  result_offset INT DEFAULT 0,
+  search_latin TEXT DEFAULT NULL,
+  search_key TEXT DEFAULT NULL,
+  query_embedding TEXT DEFAULT NULL,  -- pgvector text form; NULL = phrase search only
+  candidate_limit INT DEFAULT 100,    -- per list; raised to cover deep pages
+  rrf_k INT DEFAULT 60
+)
+RETURNS TABLE (
+  segment_id UUID,
+  movie_id UUID,
+  text TEXT,
+  start_ms INT,
+  duration_ms INT,
+  language TEXT,
+  movie_title TEXT,
+  movie_year INT,
+  youtube_video_id TEXT,
+  poster_url TEXT,
+  actors TEXT[],
+  director TEXT,
+  rank FLOAT4
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+  cap INT := GREATEST(candidate_limit, result_offset + result_limit);
+BEGIN
+  -- HNSW returns at most ef_search rows per scan
+  PERFORM set_config('hnsw.ef_search', GREATEST(cap, 40)::TEXT, true);
+
+  RETURN QUERY
+  WITH fts AS (
+    SELECT p.segment_id AS id, row_number() OVER (ORDER BY p.rank DESC, p.start_ms) AS pos
+    FROM search_dialogues_phrase(search_query, cap, 0, search_latin, search_key, cap) p
+  ),
+  ann AS (
+    SELECT a.id, row_number() OVER (ORDER BY a.distance) AS pos
+    FROM (
+      SELECT s.id, s.embedding <=> query_embedding::vector AS distance
+      FROM vasanam_segments s
+      WHERE query_embedding IS NOT NULL AND s.embedding IS NOT NULL AND s.duplicate_of IS NULL
+      ORDER BY distance
+      LIMIT cap
+    ) a
+  ),
+  fused AS (
+    SELECT c.id, SUM(1.0 / (rrf_k + c.pos)) AS score
+    FROM (SELECT * FROM fts UNION ALL SELECT * FROM ann) c
+    GROUP BY c.id
+  )
+  SELECT
+    s.id,
+    s.movie_id,
+    s.text,
+    s.start_ms,
+    s.duration_ms,
+    s.language,
+    m.title,
+    m.year,
+    m.youtube_video_id,
+    m.poster_url,
+    m.actors,
+    m.director,
+    f.score::FLOAT4
+  FROM fused f
+  JOIN vasanam_segments s ON s.id = f.id
+  JOIN vasanam_movies m ON s.movie_id = m.id
+  ORDER BY 13 DESC, s.start_ms ASC  -- rank (the OUT parameter shadows the alias)
+  LIMIT result_limit
+  OFFSET result_offset;
+END;
+$$;